@@ -0,0 +1,83 @@
+import logging
+from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+
+from analyzer.indicator_calculator import calculate_indicators, calculate_threat_probability, THREAT_WEIGHTS
+from analyzer.report_generator import generate_ai_report
+from scraper.news_scraper import DEFAULT_NEWS_KEYWORDS, assemble_news_data
+from utils.sampling_profiler import propagate
+from utils.models import (
+    AnalysisProfile, ProfileResult, Indicators, SourceError,
+    ModelValidationError, parse_source
+)
+
+# 單次批次請求允許的設定檔數量上限
+MAX_PROFILES = 10
+
+# 並行產生報告的最大數量
+REPORT_CONCURRENCY = 4
+
+def parse_profiles(payload: Any) -> List[AnalysisProfile]:
+    """驗證批次請求內容，回傳設定檔列表；格式錯誤時拋出 ModelValidationError"""
+    if not isinstance(payload, dict) or not isinstance(payload.get('profiles'), list):
+        raise ModelValidationError("請求內容需包含 profiles 列表")
+    raw_profiles = payload['profiles']
+    if not raw_profiles:
+        raise ModelValidationError("profiles 不可為空")
+    if len(raw_profiles) > MAX_PROFILES:
+        raise ModelValidationError(f"profiles 最多 {MAX_PROFILES} 個")
+
+    profiles = [AnalysisProfile.from_dict(p, DEFAULT_NEWS_KEYWORDS, THREAT_WEIGHTS) for p in raw_profiles]
+    names = [profile.name for profile in profiles]
+    if len(set(names)) != len(names):
+        raise ModelValidationError("profiles 的 name 不可重複")
+    return profiles
+
+def distinct_news_queries(profiles: List[AnalysisProfile]) -> List[str]:
+    """所有設定檔需要的新聞關鍵字（去除重複），每個關鍵字只會搜尋一次"""
+    queries = (
+        keyword
+        for profile in profiles
+        for keywords in profile.news_keywords.values()
+        for keyword in keywords
+    )
+    return list(dict.fromkeys(queries))
+
+def analyze_profiles(profiles: List[AnalysisProfile], shared: Dict[str, Any],
+                     news_results: Dict[str, List[Dict[str, str]]]) -> List[ProfileResult]:
+    """在共用的爬蟲資料上為每個設定檔計算新聞資料、指標與威脅等級"""
+    results = []
+    for profile in profiles:
+        try:
+            news = parse_source('news', assemble_news_data(profile.news_keywords, news_results))
+        except ModelValidationError as exc:
+            logging.error(f"[{profile.name}] News data failed validation: {exc}")
+            news = SourceError(str(exc))
+
+        indicators = calculate_indicators(
+            shared.get('military', {}), news, shared.get('gold', {}), shared.get('food', {})
+        )
+        results.append(ProfileResult(
+            profile=profile,
+            indicators=Indicators.from_dict(indicators),
+            threat_level=calculate_threat_probability(indicators, profile.weights),
+            news=news
+        ))
+    return results
+
+def generate_profile_reports(results: List[ProfileResult], shared: Dict[str, Any]) -> None:
+    """並行為每個設定檔產生報告，結果直接寫回 ProfileResult.report"""
+    def generate(result: ProfileResult) -> str:
+        return generate_ai_report(
+            military_data=shared.get('military', {}),
+            news_data=result.news,
+            gold_data=shared.get('gold', {}),
+            food_data=shared.get('food', {}),
+            military_indicator=result.indicators.military,
+            economic_indicator=result.indicators.economic,
+            overall_threat_level=result.threat_level
+        )
+
+    with ThreadPoolExecutor(max_workers=min(REPORT_CONCURRENCY, len(results))) as executor:
+        for result, report in zip(results, executor.map(propagate(generate), results)):
+            result.report = report
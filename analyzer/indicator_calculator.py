@@ -1,5 +1,23 @@
+import math
 import random
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from analyzer.volatility import intraday_economic_score
+from utils.keyword_matcher import threat_matcher
+
+# 總體威脅等級的各項權重
+THREAT_WEIGHTS = {
+    'military': 0.4,
+    'economic': 0.3,
+    'news': 0.3
+}
+
+# 軍事公告中的威脅詞條：以每則公告的平均加權命中計算，每 1 分加 2 分，最多加 30 分
+MILITARY_KEYWORD_FACTOR = 2.0
+MILITARY_KEYWORD_MAX_BONUS = 30.0
+
+# 新聞威脅詞條以飽和曲線換算為 0-100 分，加權命中達 NEWS_KEYWORD_SCALE 時約 63 分
+NEWS_KEYWORD_SCALE = 40.0
 
 def calculate_indicators(military_data: Dict[str, Any], news_data: Dict[str, Any], 
                         gold_data: Dict[str, Any], food_data: Dict[str, Any]) -> Dict[str, float]:
@@ -15,25 +33,47 @@ def calculate_indicators(military_data: Dict[str, Any], news_data: Dict[str, Any
         latest_aircrafts = military_data.get('latest_aircrafts', 0)
         latest_ships = military_data.get('latest_ships', 0)
         
-        # 計算軍事威脅分數
-        military_score = min(100, (total_incursions * 2) + (latest_aircrafts * 3) + (latest_ships * 5))
+        # 計算軍事威脅分數，公告內文的威脅詞條（演習、實彈、聯合戰備警巡等）另外加分；
+        # 取每則公告的平均，一週的例行公告不會因數量累積而達到上限；
+        # 負權重詞條（例如「岸置飛彈」）只用來抵銷，不會讓加分變成扣分
+        keyword_reports = max(1, military_data.get('keyword_reports') or 0)
+        keyword_bonus = max(0, MILITARY_KEYWORD_FACTOR * threat_matcher().weighted_score(
+            military_data.get('keyword_hits') or {}
+        ) / keyword_reports)
+        military_score = min(100, (total_incursions * 2) + (latest_aircrafts * 3) + (latest_ships * 5)
+                             + min(MILITARY_KEYWORD_MAX_BONUS, keyword_bonus))
     
     # 經濟威脅指標 (0-100)
     economic_score = 0.0
     if gold_data and food_data:
-        # 基於價格變動計算經濟不穩定性
-        gold_change = gold_data.get('daily_change_percent', 0)
-        food_change = food_data.get('daily_change_percent', 0)
+        intraday = {
+            kind: data.get('intraday')
+            for kind, data in (('gold', gold_data), ('food', food_data))
+            if data.get('intraday')
+        }
+        if len(intraday) == 2:
+            # 有日內K線時，以實現波動度、最大回撤與跳空次數計算
+            economic_score = min(100, intraday_economic_score(intraday))
+        else:
+            # 基於價格變動計算經濟不穩定性
+            gold_change = gold_data.get('daily_change_percent', 0)
+            food_change = food_data.get('daily_change_percent', 0)
 
-        # 價格波動越大，經濟威脅越高
-        economic_score = min(100, abs(gold_change) * 10 + abs(food_change) * 15)
+            # 價格波動越大，經濟威脅越高
+            economic_score = min(100, abs(gold_change) * 10 + abs(food_change) * 15)
     
     # 新聞輿情指標 (0-100)
     news_score = 0.0
     if news_data:
-        total_articles = news_data.get('total_articles', 0)
-        # 基於新聞數量和類型計算輿情分數
-        news_score = min(100, total_articles * 5)
+        keyword_hits = news_data.get('keyword_hits')
+        if keyword_hits is not None and not news_data.get('error'):
+            # 基於標題與摘要中威脅詞條的加權命中次數
+            weighted_hits = max(0, threat_matcher().weighted_score(keyword_hits))
+            news_score = 100 * (1 - math.exp(-weighted_hits / NEWS_KEYWORD_SCALE))
+        else:
+            # 沒有詞條統計（備用資料）時退回以新聞數量計算
+            total_articles = news_data.get('total_articles', 0)
+            news_score = min(100, total_articles * 5)
     
     return {
         'military': round(military_score, 2),
@@ -41,18 +81,14 @@ def calculate_indicators(military_data: Dict[str, Any], news_data: Dict[str, Any
         'news': round(news_score, 2)
     }
 
-def calculate_threat_probability(indicators: Dict[str, float]) -> float:
+def calculate_threat_probability(indicators: Dict[str, float],
+                                 weights: Optional[Dict[str, float]] = None) -> float:
     """
-    根據各項指標計算總體威脅等級
+    根據各項指標計算總體威脅等級，weights 未指定時使用 THREAT_WEIGHTS
     """
-    military_weight = 0.4
-    economic_weight = 0.3
-    news_weight = 0.3
-    
-    weighted_score = (
-        indicators.get('military', 0) * military_weight +
-        indicators.get('economic', 0) * economic_weight +
-        indicators.get('news', 0) * news_weight
+    weights = weights or THREAT_WEIGHTS
+    weighted_score = sum(
+        indicators.get(name, 0) * weight for name, weight in weights.items()
     )
     
     return round(min(100, weighted_score), 2)
@@ -0,0 +1,160 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from xml.sax.saxutils import escape
+from concurrent.futures import ThreadPoolExecutor, Future
+
+# reportlab 為選用套件，未安裝時停用 PDF 匯出
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+    logging.warning("reportlab 未安裝，PDF 報告匯出功能停用。")
+
+# PDF 快取目錄
+PDF_CACHE_DIR = Path(os.getenv("PDF_CACHE_DIR", "reports_cache"))
+
+# 內建的繁體中文 CID 字型，無需額外字型檔
+CJK_FONT_NAME = 'MSung-Light'
+
+# 渲染中標記檔的有效時間（秒）；worker 在渲染途中被終止時，過期的標記不再視為渲染中
+PDF_PENDING_MAX_AGE = float(os.getenv("PDF_PENDING_MAX_AGE", "300"))
+
+# 背景渲染用的執行緒池，避免佔用請求執行緒
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='pdf-render')
+_pending: Dict[str, Future] = {}
+_lock = threading.Lock()
+
+SECTION_TITLES = {
+    'zh': '中文報告',
+    'en': 'English Report'
+}
+
+def report_digest(reports: Dict[str, str]) -> str:
+    """根據報告內容計算快取用的雜湊值"""
+    hasher = hashlib.sha256()
+    for language in sorted(reports):
+        hasher.update(language.encode('utf-8'))
+        hasher.update(b'\0')
+        hasher.update(reports[language].encode('utf-8'))
+        hasher.update(b'\0')
+    return hasher.hexdigest()
+
+def cached_pdf_path(digest: str) -> Path:
+    """回傳指定雜湊值對應的 PDF 路徑（不保證存在）"""
+    return PDF_CACHE_DIR / f"{digest}.pdf"
+
+def get_cached_pdf(digest: str) -> Optional[Path]:
+    """若 PDF 已渲染完成則回傳其路徑"""
+    path = cached_pdf_path(digest)
+    return path if path.exists() else None
+
+def pending_marker_path(digest: str) -> Path:
+    """渲染中標記檔：放在共用的快取目錄，其他 worker 也能得知 PDF 正在渲染"""
+    return PDF_CACHE_DIR / f"{digest}.pending"
+
+def _mark_pending(digest: str) -> None:
+    try:
+        PDF_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        pending_marker_path(digest).touch()
+    except OSError as e:
+        logging.warning(f"無法建立 PDF 渲染標記 ({digest[:12]}): {e}")
+
+def _clear_pending(digest: str) -> None:
+    try:
+        pending_marker_path(digest).unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logging.warning(f"無法移除 PDF 渲染標記 ({digest[:12]}): {e}")
+
+def is_render_pending(digest: str) -> bool:
+    """檢查 PDF 是否仍在背景渲染中（本程序或共用快取目錄中的其他 worker）"""
+    with _lock:
+        if digest in _pending:
+            return True
+    try:
+        return time.time() - pending_marker_path(digest).stat().st_mtime < PDF_PENDING_MAX_AGE
+    except OSError:
+        return False
+
+def submit_pdf_render(reports: Dict[str, str]) -> Optional[str]:
+    """
+    將雙語報告排入背景渲染，回傳內容雜湊值。
+    相同內容若已有快取或正在渲染則不會重複處理。
+    """
+    if not REPORTLAB_AVAILABLE:
+        return None
+
+    digest = report_digest(reports)
+    if get_cached_pdf(digest):
+        return digest
+
+    with _lock:
+        if digest not in _pending:
+            _mark_pending(digest)
+            future = _executor.submit(render_pdf, reports, cached_pdf_path(digest))
+            _pending[digest] = future
+            future.add_done_callback(lambda f, d=digest: _on_render_done(d, f))
+    return digest
+
+def _on_render_done(digest: str, future: Future) -> None:
+    with _lock:
+        _pending.pop(digest, None)
+    _clear_pending(digest)
+    exc = future.exception()
+    if exc:
+        logging.error(f"PDF 報告渲染失敗 ({digest[:12]}): {exc}")
+    else:
+        logging.info(f"PDF 報告渲染完成 ({digest[:12]})")
+
+def render_pdf(reports: Dict[str, str], output_path: Path) -> Path:
+    """
+    將中英雙語報告渲染為 PDF，先寫入暫存檔再原子性替換
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    pdfmetrics.registerFont(UnicodeCIDFont(CJK_FONT_NAME))
+
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'ReportTitle', parent=styles['Title'], fontName=CJK_FONT_NAME
+    )
+    body_style = ParagraphStyle(
+        'ReportBody', parent=styles['BodyText'], fontName=CJK_FONT_NAME,
+        fontSize=10.5, leading=16, wordWrap='CJK'
+    )
+
+    story = []
+    for index, language in enumerate(reports):
+        if index:
+            story.append(PageBreak())
+        story.append(Paragraph(escape(SECTION_TITLES.get(language, language)), title_style))
+        story.append(Spacer(1, 0.4 * cm))
+        for paragraph in reports[language].split('\n'):
+            if paragraph.strip():
+                story.append(Paragraph(escape(paragraph.strip()), body_style))
+                story.append(Spacer(1, 0.2 * cm))
+
+    tmp_path = output_path.with_suffix(f".{threading.get_ident()}.tmp")
+    doc = SimpleDocTemplate(
+        str(tmp_path), pagesize=A4,
+        leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm,
+        title='Taiwan Strait Threat Assessment'
+    )
+    try:
+        doc.build(story)
+        os.replace(tmp_path, output_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return output_path
@@ -0,0 +1,147 @@
+"""
+不依賴 Flask 的分析流程：並行爬取資料來源（可設截止時間）、計算指標，
+以及同步串流模式的事件產生器。背景任務、串流端點與命令列工具共用這些函數。
+"""
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from scraper.military_scraper import scrape_military_data
+from scraper.news_scraper import scrape_news_data
+from scraper.gold_scraper import scrape_gold_prices
+from scraper.food_scraper import scrape_food_prices
+from analyzer.indicator_calculator import calculate_indicators, calculate_threat_probability
+from analyzer.report_generator import stream_ai_report, generate_fallback_report
+from analyzer.threat_simulation import simulate_threat_distribution
+from utils.models import Indicators, SourceError, ModelValidationError, SOURCE_PARSERS, parse_source
+from utils.sampling_profiler import propagate
+
+# 標準資料來源與對應的爬蟲
+SOURCE_SCRAPERS: Dict[str, Callable[[], Any]] = {
+    'military': scrape_military_data,
+    'news': scrape_news_data,
+    'gold': scrape_gold_prices,
+    'food': scrape_food_prices
+}
+
+# 逾時未完成的資料來源使用的錯誤訊息
+SOURCE_TIMEOUT_ERROR = 'timeout'
+
+# 串流模式：爬蟲最多使用時間預算的比例，其餘留給報告生成
+STREAM_SCRAPE_SHARE = 0.6
+# 剩餘時間少於此秒數時不呼叫 OpenAI，直接使用預設報告
+STREAM_MIN_REPORT_SECONDS = 2.0
+
+def iter_sources(jobs: Dict[str, Callable[[], Any]], label: str = '',
+                 deadline: Optional[float] = None,
+                 max_workers: Optional[int] = None) -> Iterator[Tuple[str, Any]]:
+    """
+    並行執行爬蟲，依完成順序產出 (資料類型, 結果)，並在邊界驗證結構。
+    deadline 為 time.monotonic() 的截止時間，屆時仍未完成的來源以 SourceError('timeout') 產出，
+    不等待其執行緒結束。非標準資料來源（例如批次分析的新聞搜尋結果）原樣回傳。
+
+    Python 無法中止執行中的執行緒：逾時的爬蟲會在背景繼續執行，直到它自己的請求逾時為止
+    （各請求的 timeout 為 10–20 秒；國防部爬蟲最多循序送出列表加 7 個詳情頁請求，最壞約 160 秒）。
+    結果會被丟棄，但仍佔用連線與執行緒，因此大量逾時的串流請求會暫時累積背景執行緒；
+    需要立即結束程序的命令列工具（analyzer.snapshot）在有來源逾時時以 os._exit 結束。
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(jobs))
+    futures = {executor.submit(propagate(job)): data_type for data_type, job in jobs.items()}
+    pending = set(futures)
+    try:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        for future in as_completed(futures, timeout=timeout):
+            pending.discard(future)
+            data_type = futures[future]
+            try:
+                result = future.result()
+                # 在爬蟲邊界驗證結構並轉為精簡模型
+                data = parse_source(data_type, result) if data_type in SOURCE_PARSERS else result
+                logging.info(f"[{label}] {data_type.title()} data collected successfully")
+            except ModelValidationError as exc:
+                logging.error(f"[{label}] {data_type.title()} data failed validation: {exc}")
+                data = SourceError(str(exc))
+            except Exception as exc:
+                logging.error(f"[{label}] {data_type.title()} data collection failed: {exc}")
+                data = SourceError(str(exc))
+            yield data_type, data
+    except FuturesTimeoutError:
+        for future in pending:
+            logging.warning(f"[{label}] {futures[future].title()} data collection timed out")
+            yield futures[future], SourceError(SOURCE_TIMEOUT_ERROR)
+    finally:
+        executor.shutdown(wait=deadline is None, cancel_futures=True)
+
+def collect_sources(label: str, jobs: Dict[str, Callable[[], Any]],
+                    deadline: Optional[float] = None,
+                    max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """收集所有資料來源的結果為 {資料類型: 結果}"""
+    return dict(iter_sources(jobs, label, deadline, max_workers))
+
+def compute_threat(raw_data: Dict[str, Any]) -> Tuple[Dict[str, float], float]:
+    """由原始資料計算各項指標與總體威脅等級"""
+    indicators = calculate_indicators(
+        raw_data.get('military', {}),
+        raw_data.get('news', {}),
+        raw_data.get('gold', {}),
+        raw_data.get('food', {})
+    )
+    return indicators, calculate_threat_probability(indicators)
+
+def stream_analysis(budget: float, simulate: bool = False, language: str = 'zh') -> Iterator[Dict[str, Any]]:
+    """
+    在單一請求內執行完整分析並依序產出事件，不使用共享狀態：
+    start → source（每個來源完成時）→ indicators → [distribution] → report_chunk… → report → done。
+    爬蟲最多使用 STREAM_SCRAPE_SHARE 的時間預算，報告生成在整體預算到期時截斷。
+    """
+    started = time.monotonic()
+    deadline = started + budget
+
+    def elapsed_ms() -> int:
+        return int((time.monotonic() - started) * 1000)
+
+    yield {'event': 'start', 'budget_seconds': budget}
+
+    raw_data = {}
+    timed_out = []
+    for source, data in iter_sources(SOURCE_SCRAPERS, 'stream', started + budget * STREAM_SCRAPE_SHARE):
+        raw_data[source] = data
+        if isinstance(data, SourceError) and data.error == SOURCE_TIMEOUT_ERROR:
+            timed_out.append(source)
+        yield {'event': 'source', 'source': source, 'data': data, 'elapsed_ms': elapsed_ms()}
+
+    indicators, threat_level = compute_threat(raw_data)
+    yield {'event': 'indicators', 'indicators': Indicators.from_dict(indicators),
+           'threat_level': threat_level, 'elapsed_ms': elapsed_ms()}
+
+    if simulate:
+        yield {'event': 'distribution', 'distribution': simulate_threat_distribution(indicators, raw_data),
+               'elapsed_ms': elapsed_ms()}
+
+    remaining = deadline - time.monotonic()
+    truncated = False
+    if remaining < STREAM_MIN_REPORT_SECONDS:
+        report = generate_fallback_report(threat_level, indicators['military'], indicators['economic'], language)
+        yield {'event': 'report_chunk', 'text': report}
+    else:
+        chunks = []
+        stream = stream_ai_report(
+            raw_data.get('military', {}), raw_data.get('news', {}),
+            raw_data.get('gold', {}), raw_data.get('food', {}),
+            indicators['military'], indicators['economic'], threat_level,
+            language, timeout=remaining
+        )
+        try:
+            for text in stream:
+                chunks.append(text)
+                yield {'event': 'report_chunk', 'text': text}
+                if time.monotonic() >= deadline:
+                    truncated = True
+                    break
+        finally:
+            stream.close()
+        report = ''.join(chunks)
+
+    yield {'event': 'report', 'report': report, 'truncated': truncated, 'elapsed_ms': elapsed_ms()}
+    yield {'event': 'done', 'elapsed_ms': elapsed_ms(), 'timed_out_sources': timed_out}
@@ -1,34 +1,50 @@
 import os
-import openai
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
-def generate_ai_report(military_data: Dict[str, Any], 
-                      news_data: Dict[str, Any],
-                      gold_data: Dict[str, Any], 
-                      food_data: Dict[str, Any],
-                      military_indicator: float,
-                      economic_indicator: float,
-                      overall_threat_level: float) -> str:
-    """
-    使用 OpenAI API 生成威脅分析報告
-    """
-    
-    # 設定 OpenAI API
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        logging.warning("OPENAI_API_KEY 未設定，使用預設報告")
-        return generate_fallback_report(overall_threat_level, military_indicator, economic_indicator)
-    
-    try:
-        # 設定 OpenAI 客戶端
-        client = openai.OpenAI(api_key=api_key)
-        
-        # 準備分析資料摘要
-        data_summary = prepare_data_summary(military_data, news_data, gold_data, food_data)
-        
-        # 建構提示詞
+from utils.sampling_profiler import propagate
+
+# 支援的報告語言
+REPORT_LANGUAGES = ('zh', 'en')
+
+def _build_prompts(military_data: Dict[str, Any],
+                   news_data: Dict[str, Any],
+                   gold_data: Dict[str, Any],
+                   food_data: Dict[str, Any],
+                   military_indicator: float,
+                   economic_indicator: float,
+                   overall_threat_level: float,
+                   language: str = 'zh') -> Tuple[str, str]:
+    """回傳 (system_prompt, prompt)"""
+    # 準備分析資料摘要
+    data_summary = prepare_data_summary(military_data, news_data, gold_data, food_data, language)
+
+    # 建構提示詞
+    if language == 'en':
+        system_prompt = "You are a professional geopolitical analyst specializing in cross-strait affairs."
+        prompt = f"""
+As a professional geopolitical analyst, write a threat assessment report on the Taiwan Strait situation based on the following data:
+
+Data summary:
+{data_summary}
+
+Threat indicators:
+- Military threat indicator: {military_indicator:.1f}/100
+- Economic threat indicator: {economic_indicator:.1f}/100
+- Overall threat level: {overall_threat_level:.1f}/100
+
+The report should include:
+1. Situation overview
+2. Threat analysis by dimension
+3. Risk assessment
+4. Recommendations and conclusion
+
+Keep the report objective and professional, avoiding inflammatory language. Length: about 250-400 words.
+"""
+    else:
+        system_prompt = "你是一位專業的地緣政治分析師，擅長台海情勢分析。"
         prompt = f"""
 作為一位專業的地緣政治分析師，請根據以下資料生成一份關於台海情勢的威脅評估報告：
 
@@ -49,32 +65,155 @@ def generate_ai_report(military_data: Dict[str, Any],
 報告應該客觀、專業，避免過度煽動性言論。長度約 300-500 字。
 """
 
+    return system_prompt, prompt
+
+def _timeout_option(timeout: Optional[float]) -> Dict[str, float]:
+    """openai 以 timeout=None 表示不逾時，未指定時不傳入以沿用預設值"""
+    return {'timeout': timeout} if timeout is not None else {}
+
+def generate_ai_report(military_data: Dict[str, Any], 
+                      news_data: Dict[str, Any],
+                      gold_data: Dict[str, Any], 
+                      food_data: Dict[str, Any],
+                      military_indicator: float,
+                      economic_indicator: float,
+                      overall_threat_level: float,
+                      language: str = 'zh',
+                      timeout: Optional[float] = None) -> str:
+    """
+    使用 OpenAI API 生成威脅分析報告，language 可為 'zh'（中文）或 'en'（英文）；
+    timeout 為請求逾時秒數（未指定時使用 openai 預設值）
+    """
+    
+    # 設定 OpenAI API
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        logging.warning("OPENAI_API_KEY 未設定，使用預設報告")
+        return generate_fallback_report(overall_threat_level, military_indicator, economic_indicator, language)
+    
+    try:
+        # openai 套件載入較慢，只在實際呼叫時匯入（命令列工具不產生報告時不需要）
+        import openai
+
+        # 設定 OpenAI 客戶端
+        client = openai.OpenAI(api_key=api_key)
+        
+        # 建構提示詞
+        system_prompt, prompt = _build_prompts(
+            military_data, news_data, gold_data, food_data,
+            military_indicator, economic_indicator, overall_threat_level, language
+        )
+
         # 呼叫 OpenAI API
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
-                {"role": "system", "content": "你是一位專業的地緣政治分析師，擅長台海情勢分析。"},
+                {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt}
             ],
             max_tokens=800,
-            temperature=0.7
+            temperature=0.7,
+            **_timeout_option(timeout)
         )
         
         report = response.choices[0].message.content.strip()
-        logging.info("成功生成 AI 威脅分析報告")
+        logging.info(f"成功生成 AI 威脅分析報告 ({language})")
         return report
         
     except Exception as e:
-        logging.error(f"AI 報告生成失敗: {e}")
-        return generate_fallback_report(overall_threat_level, military_indicator, economic_indicator)
+        logging.error(f"AI 報告生成失敗 ({language}): {e}")
+        return generate_fallback_report(overall_threat_level, military_indicator, economic_indicator, language)
+
+def stream_ai_report(military_data: Dict[str, Any],
+                     news_data: Dict[str, Any],
+                     gold_data: Dict[str, Any],
+                     food_data: Dict[str, Any],
+                     military_indicator: float,
+                     economic_indicator: float,
+                     overall_threat_level: float,
+                     language: str = 'zh',
+                     timeout: Optional[float] = None) -> Iterator[str]:
+    """
+    以串流方式生成報告，逐段產出文字。尚未收到任何內容前失敗（或未設定金鑰）時
+    改為一次產出預設報告；呼叫端提前停止迭代時會關閉與 OpenAI 的連線。
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        logging.warning("OPENAI_API_KEY 未設定，使用預設報告")
+        yield generate_fallback_report(overall_threat_level, military_indicator, economic_indicator, language)
+        return
+
+    received = False
+    stream = None
+    try:
+        import openai
+
+        # 串流模式受時間預算限制，不重試
+        client = openai.OpenAI(api_key=api_key, max_retries=0)
+        system_prompt, prompt = _build_prompts(
+            military_data, news_data, gold_data, food_data,
+            military_indicator, economic_indicator, overall_threat_level, language
+        )
+        stream = client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=800,
+            temperature=0.7,
+            stream=True,
+            **_timeout_option(timeout)
+        )
+        for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                received = True
+                yield text
+        logging.info(f"成功串流生成 AI 威脅分析報告 ({language})")
+
+    except Exception as e:
+        logging.error(f"AI 報告串流生成失敗 ({language}): {e}")
+        if not received:
+            yield generate_fallback_report(overall_threat_level, military_indicator, economic_indicator, language)
+    finally:
+        if stream is not None:
+            stream.close()
+
+def generate_bilingual_report(military_data: Dict[str, Any], 
+                             news_data: Dict[str, Any],
+                             gold_data: Dict[str, Any], 
+                             food_data: Dict[str, Any],
+                             military_indicator: float,
+                             economic_indicator: float,
+                             overall_threat_level: float,
+                             timeout: Optional[float] = None) -> Dict[str, str]:
+    """
+    並行生成中英雙語報告，回傳 {'zh': ..., 'en': ...}
+    """
+    with ThreadPoolExecutor(max_workers=len(REPORT_LANGUAGES)) as executor:
+        futures = {
+            language: executor.submit(
+                propagate(generate_ai_report),
+                military_data, news_data, gold_data, food_data,
+                military_indicator, economic_indicator, overall_threat_level,
+                language, timeout
+            )
+            for language in REPORT_LANGUAGES
+        }
+        return {language: future.result() for language, future in futures.items()}
 
 def prepare_data_summary(military_data: Dict[str, Any], 
                         news_data: Dict[str, Any],
                         gold_data: Dict[str, Any], 
-                        food_data: Dict[str, Any]) -> str:
+                        food_data: Dict[str, Any],
+                        language: str = 'zh') -> str:
     """
     準備資料摘要供 AI 分析
     """
+    if language == 'en':
+        return _prepare_data_summary_en(military_data, news_data, gold_data, food_data)
+
     summary_parts = []
     
     # 軍事資料摘要
@@ -109,12 +248,52 @@ def prepare_data_summary(military_data: Dict[str, Any],
     
     return " ".join(summary_parts)
 
+def _prepare_data_summary_en(military_data: Dict[str, Any], 
+                            news_data: Dict[str, Any],
+                            gold_data: Dict[str, Any], 
+                            food_data: Dict[str, Any]) -> str:
+    """英文版資料摘要"""
+    summary_parts = []
+    
+    if military_data:
+        total_incursions = military_data.get('total_incursions_last_week', 0)
+        latest_aircrafts = military_data.get('latest_aircrafts', 0)
+        latest_ships = military_data.get('latest_ships', 0)
+        summary_parts.append(
+            f"Military activity: {total_incursions} incursions detected over the past week; "
+            f"the latest day recorded {latest_aircrafts} PLA aircraft sorties and {latest_ships} vessels."
+        )
+    
+    if gold_data:
+        gold_price = gold_data.get('current_price', 'N/A')
+        gold_change = gold_data.get('daily_change_percent', 0)
+        summary_parts.append(
+            f"Gold: ${gold_price}/oz, daily change {gold_change:+.2f}%."
+        )
+    
+    if food_data:
+        food_price = food_data.get('wheat_price', 'N/A')
+        food_change = food_data.get('daily_change_percent', 0)
+        summary_parts.append(
+            f"Food: wheat futures ${food_price}/bushel, daily change {food_change:+.2f}%."
+        )
+    
+    if news_data:
+        total_articles = news_data.get('total_articles', 0)
+        summary_parts.append(f"News: {total_articles} related articles collected.")
+    
+    return " ".join(summary_parts)
+
 def generate_fallback_report(overall_threat_level: float, 
                             military_indicator: float, 
-                            economic_indicator: float) -> str:
+                            economic_indicator: float,
+                            language: str = 'zh') -> str:
     """
     生成備用報告（當 OpenAI API 不可用時）
     """
+    if language == 'en':
+        return _generate_fallback_report_en(overall_threat_level, military_indicator, economic_indicator)
+
     current_date = datetime.now().strftime("%Y年%m月%d日")
     
     # 根據威脅等級決定基調
@@ -153,6 +332,47 @@ def generate_fallback_report(overall_threat_level: float,
     
     return report.strip()
 
+def _generate_fallback_report_en(overall_threat_level: float, 
+                                military_indicator: float, 
+                                economic_indicator: float) -> str:
+    """英文版備用報告"""
+    current_date = datetime.now().strftime("%Y-%m-%d")
+    
+    if overall_threat_level >= 70:
+        threat_level_desc = "high"
+        situation_desc = "the situation is tense"
+    elif overall_threat_level >= 40:
+        threat_level_desc = "moderate"
+        situation_desc = "the situation warrants close attention"
+    else:
+        threat_level_desc = "relatively low"
+        situation_desc = "the situation is relatively stable"
+    
+    report = f"""
+Taiwan Strait Threat Assessment ({current_date})
+
+【Situation Overview】
+Based on the latest multi-source data, the current threat level in the Taiwan Strait is {overall_threat_level:.1f}/100, a {threat_level_desc} risk level. Overall, {situation_desc}.
+
+【Threat Analysis】
+Military: the indicator stands at {military_indicator:.1f}/100. PLA activity remains within the monitored range and is being closely tracked.
+
+Economic: the indicator stands at {economic_indicator:.1f}/100. Shifts in the international economy deserve attention, as commodity price swings may reflect market sensitivity to geopolitical risk.
+
+【Risk Assessment】
+Current risk stems mainly from uncertainty in military activity and economic volatility. Indicators should continue to be monitored with an appropriate level of vigilance.
+
+【Recommendations and Conclusion】
+1. Continue strengthening intelligence collection and analysis
+2. Monitor the impact of international economic trends on regional stability
+3. Strengthen communication and coordination with partners
+4. Improve public understanding of the current situation
+
+This report is generated from public data and is for reference only. Please refer to official sources for authoritative information.
+"""
+    
+    return report.strip()
+
 if __name__ == '__main__':
     # 測試用的模擬資料
     test_military_data = {"total_incursions_last_week": 20, "latest_aircrafts": 5, "latest_ships": 2}
@@ -160,10 +380,12 @@ if __name__ == '__main__':
     test_gold_data = {"current_price": 2000, "daily_change_percent": 1.2}
     test_food_data = {"wheat_price": 600, "daily_change_percent": -0.5}
     
-    report = generate_ai_report(
+    reports = generate_bilingual_report(
         test_military_data, test_news_data, test_gold_data, test_food_data,
         45.0, 25.0, 35.0
     )
         
     print("=== 測試報告 ===")
-    print(report)
+    print(reports['zh'])
+    print("=== Test Report ===")
+    print(reports['en'])
@@ -0,0 +1,182 @@
+"""
+命令列產生威脅分析快照（不載入 Flask）
+
+執行爬蟲 → 指標 → 報告的完整流程，將結果以原子方式寫入帶時間戳記的 JSON 檔，
+並更新同目錄下的 latest.json，供 cron 或 systemd timer 預先產生、由網頁端以靜態檔案提供。
+快照格式與 /get_report/<task_id> 完成時的回應相同，另加上各資料來源的狀態。
+
+所有來源都失敗，或以 --source 只執行部分來源時，latest.json 維持上一份完整快照不變
+（仍會寫入帶時間戳記的檔案），除非指定 --force-latest。
+
+結束代碼依失敗的資料來源組成（可相加）：military=1、news=2、gold=4、food=8；
+0 表示全部成功，16 表示快照寫入失敗。
+
+用法：
+    python -m analyzer.snapshot --source military --source news --deadline 30 --output data/snapshots
+"""
+import os
+import sys
+import time
+import uuid
+import argparse
+import logging
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from analyzer.pipeline import SOURCE_SCRAPERS, SOURCE_TIMEOUT_ERROR, collect_sources, compute_threat
+from analyzer.threat_simulation import simulate_threat_distribution
+from analyzer.report_generator import REPORT_LANGUAGES, generate_bilingual_report, generate_fallback_report
+from utils.models import TaskRecord, Indicators, SourceError
+from utils.json_codec import dumps
+
+DEFAULT_OUTPUT_DIR = 'data/snapshots'
+LATEST_NAME = 'latest.json'
+
+# 各資料來源失敗時的結束代碼位元
+SOURCE_EXIT_CODES = {'military': 1, 'news': 2, 'gold': 4, 'food': 8}
+EXIT_WRITE_FAILED = 16
+
+# 截止前剩餘時間少於此秒數時不呼叫 OpenAI，直接使用預設報告
+MIN_REPORT_SECONDS = 5.0
+
+def source_status(data: Any) -> str:
+    """資料來源的狀態：ok、error 或 timeout"""
+    if isinstance(data, SourceError):
+        return 'timeout' if data.error == SOURCE_TIMEOUT_ERROR else 'error'
+    return 'error' if data.get('error') else 'ok'
+
+def exit_code(statuses: Dict[str, str]) -> int:
+    return sum(SOURCE_EXIT_CODES[source] for source, status in statuses.items() if status != 'ok')
+
+def build_snapshot(sources: List[str], concurrency: Optional[int] = None,
+                   deadline: Optional[float] = None, report: bool = True,
+                   simulate: bool = False) -> Dict[str, Any]:
+    """執行分析並回傳快照內容；deadline 為整體時間預算（秒）"""
+    started = time.monotonic()
+    stop_at = started + deadline if deadline else None
+    task = TaskRecord(f"snapshot-{uuid.uuid4().hex[:12]}")
+
+    raw_data = collect_sources(task.task_id, {source: SOURCE_SCRAPERS[source] for source in sources},
+                               stop_at, concurrency)
+    indicators, threat_level = compute_threat(raw_data)
+    if simulate:
+        task.threat_distribution = simulate_threat_distribution(indicators, raw_data)
+
+    remaining = None if stop_at is None else stop_at - time.monotonic()
+    if not report or (remaining is not None and remaining < MIN_REPORT_SECONDS):
+        if report:
+            logging.warning(f"[{task.task_id}] 剩餘時間不足，使用預設報告")
+        reports = {
+            language: generate_fallback_report(threat_level, indicators['military'], indicators['economic'], language)
+            for language in REPORT_LANGUAGES
+        }
+    else:
+        reports = generate_bilingual_report(
+            military_data=raw_data.get('military', {}),
+            news_data=raw_data.get('news', {}),
+            gold_data=raw_data.get('gold', {}),
+            food_data=raw_data.get('food', {}),
+            military_indicator=indicators.get('military', 0),
+            economic_indicator=indicators.get('economic', 0),
+            overall_threat_level=threat_level,
+            timeout=remaining
+        )
+
+    task.status = 'completed'
+    task.threat_level = threat_level
+    task.indicators = Indicators.from_dict(indicators)
+    task.raw_data = raw_data
+    task.report = reports['zh']
+    task.report_en = reports['en']
+    task.timestamp = datetime.now().isoformat()
+
+    snapshot = task.to_dict()
+    snapshot['sources'] = {source: source_status(raw_data[source]) for source in sources}
+    snapshot['elapsed_ms'] = int((time.monotonic() - started) * 1000)
+    return snapshot
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """寫入同目錄的暫存檔再改名，讀取端不會看到寫到一半的檔案"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def latest_skip_reason(statuses: Dict[str, str], partial: bool) -> Optional[str]:
+    """不應以此快照取代 latest.json 的原因；可以更新時回傳 None"""
+    if statuses and all(status != 'ok' for status in statuses.values()):
+        return '所有資料來源都失敗'
+    if partial:
+        return '只執行了部分資料來源'
+    return None
+
+def write_snapshot(snapshot: Dict[str, Any], output_dir: str, latest: bool = True) -> Path:
+    """
+    寫入 threat-<時間戳記>-<任務識別碼>.json，並更新 latest.json。
+    時間戳記精確到微秒並附上任務識別碼，同一秒內的多次執行不會互相覆蓋。
+    """
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.fromisoformat(snapshot['timestamp']).strftime('%Y%m%d-%H%M%S-%f')
+    path = directory / f"threat-{stamp}-{snapshot['task_id'].rsplit('-', 1)[-1]}.json"
+    data = dumps(snapshot)
+    _atomic_write(path, data)
+    if latest:
+        _atomic_write(directory / LATEST_NAME, data)
+    return path
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='產生威脅分析快照（不啟動網頁伺服器）')
+    parser.add_argument('--source', action='append', choices=list(SOURCE_SCRAPERS),
+                        help='資料來源（可重複指定，預設全部）')
+    parser.add_argument('--concurrency', type=int, help='同時執行的爬蟲數（預設每個來源一個）')
+    parser.add_argument('--deadline', type=float, help='整體時間預算（秒），逾時的來源記為 timeout')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_DIR, help=f'快照目錄（預設 {DEFAULT_OUTPUT_DIR}）')
+    parser.add_argument('--no-report', action='store_true', help='不呼叫 OpenAI，使用預設報告')
+    parser.add_argument('--no-latest', action='store_true', help=f'不更新 {LATEST_NAME}')
+    parser.add_argument('--force-latest', action='store_true',
+                        help=f'即使所有來源失敗或只執行部分來源，仍更新 {LATEST_NAME}')
+    parser.add_argument('--simulate', action='store_true', help='以蒙地卡羅模擬計算威脅等級分布')
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    sources = list(dict.fromkeys(args.source or SOURCE_SCRAPERS))
+
+    snapshot = build_snapshot(sources, args.concurrency, args.deadline, not args.no_report, args.simulate)
+    code = exit_code(snapshot['sources'])
+    update_latest = not args.no_latest
+    skip_reason = latest_skip_reason(snapshot['sources'], set(sources) != set(SOURCE_SCRAPERS))
+    if update_latest and skip_reason and not args.force_latest:
+        logging.warning(f"{skip_reason}，不更新 {LATEST_NAME}（可用 --force-latest 強制更新）")
+        update_latest = False
+    try:
+        path = write_snapshot(snapshot, args.output, update_latest)
+    except OSError as e:
+        logging.error(f"寫入快照失敗: {e}")
+        sys.exit(code | EXIT_WRITE_FAILED)
+
+    print(f"快照已寫入 {path}（威脅等級 {snapshot['threat_level']:.1f}，耗時 {snapshot['elapsed_ms'] / 1000:.2f} 秒）")
+    for source, status in snapshot['sources'].items():
+        print(f"  {source}: {status}")
+    if 'timeout' in snapshot['sources'].values():
+        # 逾時的爬蟲執行緒仍在等待上游回應，正常結束會等它們完成；快照已寫入，直接結束程序
+        sys.stdout.flush()
+        logging.shutdown()
+        os._exit(code)
+    sys.exit(code)
+
+if __name__ == '__main__':
+    main()
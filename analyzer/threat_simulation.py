@@ -0,0 +1,95 @@
+import numpy as np
+from typing import Dict, Any, Optional
+
+from analyzer.indicator_calculator import THREAT_WEIGHTS
+
+# 各指標的輸入雜訊標準差（指標分數單位）；來源使用備用資料時雜訊大幅放寬
+INPUT_NOISE_SD = 5.0
+FALLBACK_NOISE_SD = 25.0
+
+# 權重以 Dirichlet 分佈抽樣，濃度越高越接近預設權重
+WEIGHT_CONCENTRATION = 60.0
+
+DEFAULT_SAMPLES = 1_000_000
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# 各指標依賴的原始資料來源
+INDICATOR_SOURCES = {
+    'military': ('military',),
+    'economic': ('gold', 'food'),
+    'news': ('news',)
+}
+
+def _uses_fallback(raw_data: Dict[str, Any], sources) -> bool:
+    """任何一個來源帶有 error（含 "Using fallback data"）即視為不可靠"""
+    for source in sources:
+        data = raw_data.get(source)
+        if not data or data.get('error'):
+            return True
+    return False
+
+def _weighted_percentiles(levels: np.ndarray, percentiles) -> np.ndarray:
+    """
+    以 0.01 為刻度的直方圖計算百分位數：結果本來就四捨五入到小數兩位，
+    bincount + cumsum 比對百萬筆樣本做 partition 快得多
+    """
+    bins = np.rint(levels * 100).astype(np.int32)
+    cdf = np.cumsum(np.bincount(bins, minlength=10001))
+    targets = np.ceil(np.asarray(percentiles) / 100 * len(levels))
+    return np.searchsorted(cdf, np.maximum(targets, 1)) / 100
+
+def simulate_threat_distribution(indicators: Dict[str, float],
+                                 raw_data: Optional[Dict[str, Any]] = None,
+                                 samples: int = DEFAULT_SAMPLES,
+                                 seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    以蒙地卡羅模擬估計總體威脅等級的分佈。
+    同時抽樣指標雜訊與權重不確定性，並以單次向量化運算完成所有樣本（以對偶變量減半亂數抽樣）。
+    """
+    rng = np.random.default_rng(seed)
+    raw_data = raw_data or {}
+    names = list(THREAT_WEIGHTS)
+    uncertain = [name for name in names if _uses_fallback(raw_data, INDICATOR_SOURCES[name])]
+
+    values = np.array([indicators.get(name, 0) for name in names], dtype=np.float32)
+    noise_sd = np.array([
+        FALLBACK_NOISE_SD if name in uncertain else INPUT_NOISE_SD for name in names
+    ], dtype=np.float32)
+
+    # 權重不確定性：以常態近似 Dirichlet(concentration * 預設權重)。
+    # 其共變異數 (diag(w) - w wᵀ) / (k + 1) 的秩為 指標數 - 1（權重總和固定為 1），
+    # 因此只需抽樣 指標數 - 1 個常態變數，再經特徵分解得到的線性轉換映射回權重空間。
+    base = np.array([THREAT_WEIGHTS[name] for name in names], dtype=np.float64)
+    covariance = (np.diag(base) - np.outer(base, base)) / (WEIGHT_CONCENTRATION + 1)
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    transform = (eigenvectors[:, 1:] * np.sqrt(np.clip(eigenvalues[1:], 0, None))).astype(np.float32)
+
+    # 常態亂數佔了大部分時間：以對偶變量（z 與 -z 各產生一個樣本）只抽一半，
+    # 一次填入預先配置的 float32 緩衝區。每個樣本的邊際分佈不變，平均數的變異數不會變大。
+    # 緩衝區排列為 (對偶, 維度, 半數樣本)，每列在記憶體中連續，逐列運算遠快於沿樣本軸歸約。
+    half = (samples + 1) // 2
+    normals = np.empty((2, len(names) * 2 - 1, half), dtype=np.float32)
+    rng.standard_normal(out=normals[0], dtype=np.float32)
+    np.negative(normals[0], out=normals[1])
+
+    # 指標雜訊：截斷於 0-100
+    noisy = normals[:, :len(names)]
+    noisy *= noise_sd[:, None]
+    noisy += values[:, None]
+    np.clip(noisy, 0, 100, out=noisy)
+
+    weights = np.matmul(transform, normals[:, len(names):])
+    weights += base.astype(np.float32)[:, None]
+
+    noisy *= weights
+    levels = noisy.sum(axis=1).reshape(-1)[:samples]
+    np.clip(levels, 0, 100, out=levels)
+
+    quantiles = _weighted_percentiles(levels, PERCENTILES)
+    return {
+        'samples': samples,
+        'mean': round(float(levels.mean(dtype=np.float64)), 2),
+        'std': round(float(levels.std(dtype=np.float64)), 2),
+        'percentiles': {f"p{p}": round(float(q), 2) for p, q in zip(PERCENTILES, quantiles)},
+        'uncertain_indicators': uncertain
+    }
@@ -0,0 +1,114 @@
+import math
+import warnings
+import numpy as np
+from typing import Dict, Sequence, Union
+
+# 期貨每日交易時間約 23 小時，一年約 252 個交易日
+TRADING_SECONDS_PER_DAY = 23 * 3600
+TRADING_DAYS_PER_YEAR = 252
+
+# 單根K線報酬率超過穩健標準差的倍數即視為跳空
+JUMP_THRESHOLD = 4.0
+
+# 各商品「正常」年化波動度，用來將波動度換算為分數
+REFERENCE_VOLATILITY = {
+    'gold': 0.15,
+    'food': 0.30
+}
+
+def stack_series(series: Sequence[Sequence[float]]) -> np.ndarray:
+    """將長度不一的收盤價序列堆疊為 (商品數, K線數) 的二維陣列，不足處補 NaN"""
+    length = max(len(s) for s in series)
+    matrix = np.full((len(series), length), np.nan)
+    for row, values in enumerate(series):
+        # array('d') 可透過緩衝區直接轉換，不需複製為 Python 浮點數
+        matrix[row, :len(values)] = np.asarray(values, dtype=float)
+    return matrix
+
+def _row_nanmedian(values: np.ndarray) -> np.ndarray:
+    """逐列中位數（忽略 NaN）；np.sort 會把 NaN 排到最後，比 np.nanmedian 快數倍"""
+    ordered = np.sort(values, axis=1)
+    counts = (~np.isnan(values)).sum(axis=1)
+    rows = np.arange(len(values))
+    low = np.maximum((counts - 1) // 2, 0)
+    high = np.minimum(counts // 2, values.shape[1] - 1)
+    median = (ordered[rows, low] + ordered[rows, high]) / 2
+    return np.where(counts > 0, median, np.nan)[:, None]
+
+def compute_volatility_metrics(closes: np.ndarray,
+                               interval_seconds: Union[int, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    對整個 (商品數, K線數) 陣列一次計算：
+    - realized_volatility：年化實現波動度
+    - max_drawdown：期間最大回撤（比例）
+    - jump_count / max_jump_z：以中位數絕對離差估計的穩健標準差偵測跳空
+    NaN 代表缺值或休市斷點，跨越 NaN 的報酬率會被忽略。
+    interval_seconds 可為純量或每個商品各自的K線秒數。
+    """
+    closes = np.atleast_2d(np.asarray(closes, dtype=float))
+    interval_seconds = np.asarray(interval_seconds, dtype=float)
+    log_prices = np.log(closes)
+    returns = np.diff(log_prices, axis=1)
+    valid = ~np.isnan(returns)
+    counts = valid.sum(axis=1)
+
+    # 實現波動度：各K線報酬平方和，換算為每根K線變異數後年化
+    squared = np.where(valid, returns * returns, 0.0)
+    per_bar_variance = squared.sum(axis=1) / np.maximum(counts, 1)
+    bars_per_year = TRADING_DAYS_PER_YEAR * TRADING_SECONDS_PER_DAY / interval_seconds
+    realized_volatility = np.sqrt(per_bar_variance * bars_per_year)
+
+    # 最大回撤：以累積最高價（忽略 NaN）計算
+    running_max = np.fmax.accumulate(np.where(np.isnan(closes), -np.inf, closes), axis=1)
+    drawdown = np.where(np.isnan(closes), np.nan, 1.0 - closes / running_max)
+
+    # 全為 NaN 的列會觸發 RuntimeWarning，結果以 0 處理
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        max_drawdown = np.nan_to_num(np.nanmax(drawdown, axis=1))
+
+        # 跳空偵測：|r - median| > JUMP_THRESHOLD * 1.4826 * MAD
+        median = _row_nanmedian(returns)
+        deviation = np.abs(returns - median)
+        robust_sigma = 1.4826 * _row_nanmedian(deviation)
+        z_scores = np.where(robust_sigma > 0, deviation / robust_sigma, 0.0)
+    z_scores = np.where(valid, z_scores, 0.0)
+    jump_count = (z_scores > JUMP_THRESHOLD).sum(axis=1)
+    max_jump_z = z_scores.max(axis=1) if z_scores.shape[1] else np.zeros(len(closes))
+
+    insufficient = counts < 2
+    realized_volatility[insufficient] = 0.0
+
+    return {
+        'realized_volatility': realized_volatility,
+        'max_drawdown': max_drawdown,
+        'jump_count': jump_count,
+        'max_jump_z': max_jump_z
+    }
+
+def volatility_scores(metrics: Dict[str, np.ndarray], reference_volatility: np.ndarray) -> np.ndarray:
+    """
+    將波動度指標換算為 0-100 分：
+    正常波動度約 30 分，回撤每 1% 加 3 分，每次跳空加 5 分（最多 20 分）
+    """
+    volatility_component = 30.0 * metrics['realized_volatility'] / reference_volatility
+    drawdown_component = 300.0 * metrics['max_drawdown']
+    jump_component = np.minimum(5.0 * metrics['jump_count'], 20.0)
+    return np.clip(volatility_component + drawdown_component + jump_component, 0.0, 100.0)
+
+def intraday_economic_score(quotes: Dict[str, Dict]) -> float:
+    """
+    根據各商品的日內K線計算經濟波動分數（依商品權重加權平均）。
+    quotes 為 {'gold': intraday, 'food': intraday}，intraday 需含 closes 與 interval_seconds。
+    """
+    kinds = list(quotes)
+    interval_seconds = np.array([quotes[kind]['interval_seconds'] for kind in kinds])
+    matrix = stack_series([quotes[kind]['closes'] for kind in kinds])
+    metrics = compute_volatility_metrics(matrix, interval_seconds)
+    reference = np.array([REFERENCE_VOLATILITY.get(kind, 0.2) for kind in kinds])
+    scores = volatility_scores(metrics, reference)
+
+    # 與原本日變動公式相同的相對權重：黃金 10、糧食 15
+    weights = np.array([{'gold': 10.0, 'food': 15.0}.get(kind, 10.0) for kind in kinds])
+    score = float(np.dot(scores, weights) / weights.sum())
+    return 0.0 if math.isnan(score) else score
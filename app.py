@@ -1,20 +1,32 @@
 import os
+import hmac
 import json
+import math
 import logging
+import sqlite3
 import threading
 import uuid
 from datetime import datetime
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, send_file, Response, url_for, stream_with_context
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # 匯入我們的模組
 from scraper.military_scraper import scrape_military_data
-from scraper.news_scraper import scrape_news_data
+from scraper.news_scraper import fetch_news_results
 from scraper.gold_scraper import scrape_gold_prices
 from scraper.food_scraper import scrape_food_prices
-from analyzer.indicator_calculator import calculate_indicators, calculate_threat_probability
-from analyzer.report_generator import generate_ai_report
+from analyzer.pipeline import SOURCE_SCRAPERS, collect_sources, compute_threat, stream_analysis
+from analyzer.report_generator import generate_bilingual_report
+from analyzer.threat_simulation import simulate_threat_distribution
+from analyzer.batch_analysis import (
+    parse_profiles, distinct_news_queries, analyze_profiles, generate_profile_reports
+)
+from analyzer.pdf_exporter import submit_pdf_render, get_cached_pdf, is_render_pending
+from utils.models import TaskRecord, Indicators, SourceError, ModelValidationError
+from utils.json_codec import dumps, json_response
+from utils import sampling_profiler
+from utils.dashboard_state import dashboard, build_sections
+from utils.static_assets import asset_paths, is_fingerprinted, IMMUTABLE_CACHE_CONTROL
 
 load_dotenv()
 
@@ -24,6 +36,13 @@ logging.basicConfig(level=logging.INFO)
 # 全域任務儲存
 tasks = {}
 
+# 是否預設啟用威脅等級的蒙地卡羅模擬
+THREAT_SIMULATION_DEFAULT = os.getenv('THREAT_SIMULATION', '0') == '1'
+
+# 串流分析的預設時間預算與上限（秒）
+ANALYZE_STREAM_BUDGET = float(os.getenv('ANALYZE_STREAM_BUDGET', '25'))
+ANALYZE_STREAM_MAX_BUDGET = 120.0
+
 # 恢復 try...except 區塊以處理資料庫模組不存在的情況
 with app.app_context():
     try:
@@ -35,56 +54,51 @@ with app.app_context():
     except Exception as e:
         logging.error(f"資料庫初始化時發生錯誤: {e}")
 
+@app.context_processor
+def inject_asset_urls():
+    """模板透過 asset_urls('app.js') 取得打包後（或原始）的資源網址"""
+    def asset_urls(name):
+        return [url_for('static', filename=path) for path in asset_paths(name)]
+    return {'asset_urls': asset_urls}
+
+@app.after_request
+def cache_fingerprinted_assets(response):
+    """雜湊命名的打包檔內容不會改變，設定一年 immutable 快取"""
+    filename = request.view_args.get('filename', '') if request.endpoint == 'static' and request.view_args else ''
+    if response.status_code == 200 and is_fingerprinted(filename):
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
 @app.route('/')
 def index():
     """渲染主頁面"""
     return render_template('index.html')
 
-def run_analysis_task(task_id):
+def run_analysis_task(task_id, simulate=False):
     """
     在背景執行緒中執行完整的分析流程，使用並行處理來加速爬蟲。
+    simulate 為 True 時另外以蒙地卡羅模擬計算威脅等級的不確定區間。
     """
-    with app.app_context():
+    with app.app_context(), sampling_profiler.task_scope(task_id):
         try:
             logging.info(f"[{task_id}] Phase 1: Scraping and Calculating Indicators...")
-            tasks[task_id]['status'] = 'processing'
-            tasks[task_id]['phase'] = 'indicators'
+            task = tasks[task_id]
+            task.status = 'processing'
+            task.phase = 'indicators'
 
             # --- 並行執行所有爬蟲 ---
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                futures = {
-                    executor.submit(scrape_military_data): 'military',
-                    executor.submit(scrape_news_data): 'news',
-                    executor.submit(scrape_gold_prices): 'gold',
-                    executor.submit(scrape_food_prices): 'food'
-                }
-
-                raw_data = {}
-                for future in as_completed(futures):
-                    data_type = futures[future]
-                    try:
-                        result = future.result()
-                        raw_data[data_type] = result
-                        logging.info(f"[{task_id}] {data_type.title()} data collected successfully")
-                    except Exception as exc:
-                        logging.error(f"[{task_id}] {data_type.title()} data collection failed: {exc}")
-                        raw_data[data_type] = {"error": str(exc)}
+            raw_data = collect_sources(task_id, SOURCE_SCRAPERS)
 
             # --- 計算指標 ---
-            indicators = calculate_indicators(
-                raw_data.get('military', {}),
-                raw_data.get('news', {}), 
-                raw_data.get('gold', {}),
-                raw_data.get('food', {})
-            )
-            
-            overall_threat_level = calculate_threat_probability(indicators)
+            indicators, overall_threat_level = compute_threat(raw_data)
+            if simulate:
+                task.threat_distribution = simulate_threat_distribution(indicators, raw_data)
             
             logging.info(f"[{task_id}] Phase 2: Generating AI Report...")
-            tasks[task_id]['phase'] = 'report'
+            task.phase = 'report'
             
-            # --- 生成完整報告 ---
-            report = generate_ai_report(
+            # --- 並行生成中英雙語報告 ---
+            reports = generate_bilingual_report(
                 military_data=raw_data.get('military', {}),
                 news_data=raw_data.get('news', {}),
                 gold_data=raw_data.get('gold', {}),
@@ -94,44 +108,248 @@ def run_analysis_task(task_id):
                 overall_threat_level=overall_threat_level
             )
 
+            # --- PDF 於背景執行緒渲染，不阻塞任務完成 ---
+            pdf_digest = submit_pdf_render(reports)
+
             # --- 完成任務 ---
-            tasks[task_id]['status'] = 'completed'
-            tasks[task_id]['threat_level'] = overall_threat_level
-            tasks[task_id]['indicators'] = indicators
-            tasks[task_id]['raw_data'] = raw_data
-            tasks[task_id]['report'] = report
-            tasks[task_id]['timestamp'] = datetime.now().isoformat()
+            task.threat_level = overall_threat_level
+            task.indicators = Indicators.from_dict(indicators)
+            task.raw_data = raw_data
+            task.report = reports['zh']
+            task.report_en = reports['en']
+            task.report_pdf = f"/report_pdf/{pdf_digest}" if pdf_digest else None
+            task.timestamp = datetime.now().isoformat()
+            publish_dashboard(task)
+            task.status = 'completed'
             
             logging.info(f"[{task_id}] Task completed successfully")
 
         except Exception as e:
             logging.error(f"Error during analysis task {task_id}: {e}", exc_info=True)
-            tasks[task_id]['status'] = 'failed'
-            tasks[task_id]['report'] = f"報告生成失敗：{e}"
+            tasks[task_id].status = 'failed'
+            tasks[task_id].report = f"報告生成失敗：{e}"
+
+def publish_dashboard(task):
+    """將完成的任務發布到共用的儀表板狀態；寫入失敗不影響任務結果"""
+    try:
+        dashboard.publish(build_sections(task))
+    except (sqlite3.Error, OSError) as e:
+        logging.warning(f"[{task.task_id}] 無法更新儀表板狀態: {e}")
 
 @app.route('/analyze', methods=['POST'])
 def analyze():
     """開始威脅分析"""
+    options = request.get_json(silent=True) or {}
+    if not isinstance(options, dict):
+        return jsonify({"error": "請求內容必須為 JSON 物件"}), 400
     task_id = str(uuid.uuid4())
-    tasks[task_id] = {'status': 'pending', 'task_id': task_id}
+    tasks[task_id] = TaskRecord(task_id)
     
     # 啟動背景執行緒
-    background_thread = threading.Thread(target=run_analysis_task, args=(task_id,))
+    simulate = bool(options.get('simulate', THREAT_SIMULATION_DEFAULT))
+    background_thread = threading.Thread(target=run_analysis_task, args=(task_id, simulate))
     background_thread.start()
     
     return jsonify({"task_id": task_id})
 
+def run_batch_task(task_id, profiles):
+    """
+    批次分析：所有設定檔共用一次爬蟲（新聞關鍵字去重後各搜尋一次），
+    再分別計算指標並並行產生報告。
+    """
+    with app.app_context(), sampling_profiler.task_scope(task_id):
+        try:
+            logging.info(f"[{task_id}] Batch Phase 1: Scraping shared sources for {len(profiles)} profiles...")
+            task = tasks[task_id]
+            task.status = 'processing'
+            task.phase = 'indicators'
+
+            queries = distinct_news_queries(profiles)
+            shared = collect_sources(task_id, {
+                'military': scrape_military_data,
+                'gold': scrape_gold_prices,
+                'food': scrape_food_prices,
+                'news_results': lambda: fetch_news_results(queries)
+            })
+            news_results = shared.pop('news_results')
+            if isinstance(news_results, SourceError):
+                news_results = {}
+
+            results = analyze_profiles(profiles, shared, news_results)
+
+            logging.info(f"[{task_id}] Batch Phase 2: Generating {len(results)} AI reports...")
+            task.phase = 'report'
+            generate_profile_reports(results, shared)
+
+            task.raw_data = shared
+            task.profiles = results
+            task.timestamp = datetime.now().isoformat()
+            # 指標與威脅等級依設定檔而異，儀表板只更新共用的資料來源區塊
+            publish_dashboard(task)
+            task.status = 'completed'
+
+            logging.info(f"[{task_id}] Batch task completed successfully")
+
+        except Exception as e:
+            logging.error(f"Error during batch task {task_id}: {e}", exc_info=True)
+            tasks[task_id].status = 'failed'
+            tasks[task_id].report = f"批次分析失敗：{e}"
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """
+    以多組關注設定（新聞關鍵字與指標權重）同時分析，共用同一次爬蟲。
+    請求格式：{"profiles": [{"name": ..., "news_keywords": {...}, "weights": {...}}]}
+    """
+    try:
+        profiles = parse_profiles(request.get_json(silent=True))
+    except ModelValidationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    task_id = str(uuid.uuid4())
+    tasks[task_id] = TaskRecord(task_id)
+
+    background_thread = threading.Thread(target=run_batch_task, args=(task_id, profiles))
+    background_thread.start()
+
+    return jsonify({"task_id": task_id, "profiles": [profile.name for profile in profiles]})
+
+@app.route('/analyze/stream', methods=['GET', 'POST'])
+def analyze_stream():
+    """
+    同步串流分析：在同一個請求內執行完整分析，以 NDJSON（每行一個 JSON 事件）逐步回傳
+    各資料來源、指標與報告片段。不建立任務也不更新儀表板，適合無伺服器環境或 curl 等簡單用戶端。
+    參數：budget（秒，預設 ANALYZE_STREAM_BUDGET）、simulate、language（zh/en）。
+    """
+    options = request.get_json(silent=True) or {}
+    if not isinstance(options, dict):
+        return jsonify({"error": "請求內容必須為 JSON 物件"}), 400
+    options.update(request.args.to_dict())
+    try:
+        budget = float(options.get('budget', ANALYZE_STREAM_BUDGET))
+        # float('nan') 與任何數比較都為 False，必須明確排除非有限值
+        if not math.isfinite(budget) or budget <= 0:
+            raise ValueError("budget 必須為大於 0 的有限數值")
+        budget = min(budget, ANALYZE_STREAM_MAX_BUDGET)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"參數格式錯誤：{e}"}), 400
+    simulate = str(options.get('simulate', THREAT_SIMULATION_DEFAULT)).lower() in ('1', 'true')
+    language = 'en' if options.get('language') == 'en' else 'zh'
+
+    def generate():
+        try:
+            for event in stream_analysis(budget, simulate, language):
+                yield dumps(event) + b'\n'
+        except Exception as e:
+            logging.error(f"Error during streaming analysis: {e}", exc_info=True)
+            yield dumps({"event": "error", "error": str(e)}) + b'\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/get_report/<task_id>', methods=['GET'])
 def get_report(task_id):
     """獲取分析報告"""
-    task_result = tasks.get(task_id, {'status': 'not_found'})
+    task_result = tasks.get(task_id)
+    if task_result is None:
+        return json_response({'status': 'not_found'})
     
     # 如果任務完成或失敗，從記憶體中移除
-    if task_result.get('status') in ['completed', 'failed']:
+    if task_result.status in ['completed', 'failed']:
         task_to_return = tasks.pop(task_id, task_result)
-        return jsonify(task_to_return)
+        return json_response(task_to_return)
         
-    return jsonify(task_result)
+    return json_response(task_result)
+
+@app.route('/dashboard', methods=['GET'])
+def dashboard_changes():
+    """
+    儀表板差異同步：回傳版本 since 之後變動的區塊。
+    epoch 與伺服器不符時回傳完整狀態（full 為 true）。
+    """
+    try:
+        since = int(request.args.get('since', 0))
+    except ValueError:
+        since = -1
+    try:
+        body = dashboard.changes_since(since, request.args.get('epoch'))
+    except (sqlite3.Error, OSError) as e:
+        logging.error(f"讀取儀表板狀態失敗: {e}")
+        return jsonify({"error": "儀表板狀態暫時無法使用"}), 503
+    return Response(body, mimetype='application/json', headers={'Cache-Control': 'no-cache'})
+
+@app.route('/report_pdf/<digest>', methods=['GET'])
+def report_pdf(digest):
+    """下載雙語 PDF 報告（依內容雜湊快取）"""
+    if not all(c in '0123456789abcdef' for c in digest) or len(digest) != 64:
+        return jsonify({"status": "not_found"}), 404
+
+    pdf_path = get_cached_pdf(digest)
+    if pdf_path:
+        return send_file(
+            pdf_path.resolve(),
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=f"threat_report_{digest[:12]}.pdf",
+            max_age=86400
+        )
+
+    if is_render_pending(digest):
+        return jsonify({"status": "rendering"}), 202
+
+    return jsonify({"status": "not_found"}), 404
+
+def _admin_authorized():
+    """管理端點需設定 ADMIN_TOKEN，並以 X-Admin-Token 標頭驗證"""
+    token = os.getenv('ADMIN_TOKEN')
+    provided = request.headers.get('X-Admin-Token', '')
+    return bool(token) and hmac.compare_digest(provided.encode('utf-8'), token.encode('utf-8'))
+
+@app.route('/admin/profile', methods=['GET', 'POST'])
+def admin_profile():
+    """
+    啟動取樣分析：{"duration": 秒數} 取樣整個程序一段時間，
+    {"tasks": N} 則取樣接下來 N 個分析任務。GET 列出近期的分析結果。
+    """
+    if not _admin_authorized():
+        return jsonify({"status": "not_found"}), 404
+
+    if request.method == 'GET':
+        return jsonify({
+            "armed_tasks": sampling_profiler.armed_task_count(),
+            "sessions": sampling_profiler.list_sessions()
+        })
+
+    options = request.get_json(silent=True) or {}
+    if not isinstance(options, dict):
+        return jsonify({"error": "請求內容必須為 JSON 物件"}), 400
+    try:
+        interval = float(options.get('interval_ms', sampling_profiler.DEFAULT_INTERVAL * 1000)) / 1000
+        trace_memory = bool(options.get('tracemalloc', True))
+        top_n = int(options.get('top', sampling_profiler.DEFAULT_TOP_N))
+        if 'tasks' in options:
+            armed = sampling_profiler.arm_tasks(int(options['tasks']), interval, trace_memory, top_n)
+            return jsonify({"armed_tasks": armed})
+        session = sampling_profiler.start_window(float(options.get('duration', 10)), interval, trace_memory, top_n)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"參數格式錯誤：{e}"}), 400
+    return jsonify({"session_id": session.session_id, "status": session.status})
+
+@app.route('/admin/profile/<session_id>', methods=['GET'])
+def admin_profile_result(session_id):
+    """取得分析結果；?format=collapsed 回傳可供 flamegraph.pl / speedscope 使用的文字格式"""
+    if not _admin_authorized():
+        return jsonify({"status": "not_found"}), 404
+
+    session = sampling_profiler.get_session(session_id)
+    if session is None:
+        return jsonify({"status": "not_found"}), 404
+    if request.args.get('format') == 'collapsed':
+        return Response(session.collapsed(), mimetype='text/plain')
+    return jsonify(session.to_dict())
 
 if __name__ == '__main__':
     print("伺服器已啟動。")
@@ -0,0 +1,116 @@
+"""
+比較以 dict 與精簡模型保存任務時的記憶體用量與序列化時間。
+
+用法：
+    python -m benchmarks.models_benchmark --tasks 2000 --rounds 200
+"""
+import json
+import time
+import argparse
+import tracemalloc
+from copy import deepcopy
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from utils import json_codec
+from utils.models import TaskRecord, Indicators, parse_source
+
+def sample_raw_data() -> Dict[str, Any]:
+    """產生與實際爬蟲輸出結構相同的樣本資料"""
+    now = datetime.now()
+    article = lambda i: {
+        'title': f'兩岸情勢發展最新消息第 {i} 則，各方持續關注',
+        'url': f'https://news.google.com/articles/CBMi{i:08d}?hl=zh-TW&gl=TW&ceid=TW:zh-Hant',
+        'published_date': now.isoformat(),
+        'source': f'新聞來源 {i % 5}'
+    }
+    return {
+        'military': {
+            "total_incursions_last_week": 87,
+            "latest_aircrafts": 21,
+            "latest_ships": 7,
+            "daily_incursions_chart_data": {
+                "labels": [(now - timedelta(days=i)).strftime("%m-%d") for i in range(6, -1, -1)],
+                "data": [12, 9, 15, 11, 14, 8, 18]
+            },
+            "source_url": 'https://www.mnd.gov.tw/PublishTable.aspx?Types=即時軍事動態&title=國防消息'
+        },
+        'news': {
+            "economic_news": [article(i) for i in range(5)],
+            "diplomatic_news": [article(i) for i in range(5, 10)],
+            "public_opinion_news": [article(i) for i in range(10, 15)],
+            "sources": [f'新聞來源 {i}' for i in range(5)],
+            "total_articles": 48
+        },
+        'gold': {
+            "current_price": 2351.4, "previous_close": 2339.1, "daily_change": 12.3,
+            "daily_change_percent": 0.53, "week_change": 20.5, "week_change_percent": 0.88,
+            "currency": "USD", "last_updated": now.isoformat(), "source": "Yahoo Finance"
+        },
+        'food': {
+            "wheat_price": 6.12, "previous_close": 6.05, "daily_change": 0.07,
+            "daily_change_percent": 1.16, "week_change": -0.11, "week_change_percent": -1.77,
+            "currency": "USD", "unit": "蒲式耳", "last_updated": now.isoformat(), "source": "Yahoo Finance"
+        }
+    }
+
+def build_dict_task(task_id: str, raw: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'status': 'completed', 'task_id': task_id, 'phase': 'report',
+        'threat_level': 42.5,
+        'indicators': {'military': 100, 'economic': 22.7, 'news': 100},
+        'raw_data': deepcopy(raw),
+        'report': '台海威脅情勢分析報告' * 40,
+        'timestamp': datetime.now().isoformat()
+    }
+
+def build_model_task(task_id: str, raw: Dict[str, Any]) -> TaskRecord:
+    task = TaskRecord(task_id, status='completed')
+    task.phase = 'report'
+    task.threat_level = 42.5
+    task.indicators = Indicators(100, 22.7, 100)
+    task.raw_data = {source: parse_source(source, deepcopy(data)) for source, data in raw.items()}
+    task.report = '台海威脅情勢分析報告' * 40
+    task.timestamp = datetime.now().isoformat()
+    return task
+
+def measure_memory(builder: Callable[[str, Dict[str, Any]], Any], raw: Dict[str, Any], count: int) -> float:
+    """回傳每個任務平均佔用的位元組數"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    kept: List[Any] = [builder(str(i), raw) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del kept
+    return used / count
+
+def measure_serialization(encode: Callable[[Any], Any], task: Any, rounds: int) -> float:
+    """回傳每次序列化的平均微秒數"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encode(task)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='任務模型記憶體與序列化基準測試')
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+
+    raw = sample_raw_data()
+    # 與 Flask jsonify 預設行為相同：排序鍵值、ASCII 跳脫
+    stdlib_encode = lambda obj: json.dumps(obj, sort_keys=True, ensure_ascii=True).encode('utf-8')
+
+    dict_bytes = measure_memory(build_dict_task, raw, args.tasks)
+    model_bytes = measure_memory(build_model_task, raw, args.tasks)
+    dict_us = measure_serialization(stdlib_encode, build_dict_task('x', raw), args.rounds)
+    model_us = measure_serialization(json_codec.dumps, build_model_task('x', raw), args.rounds)
+
+    encoder = 'orjson' if json_codec.ORJSON_AVAILABLE else 'json (標準庫)'
+    print(f"每任務記憶體  dict: {dict_bytes / 1024:8.2f} KiB   模型: {model_bytes / 1024:8.2f} KiB"
+          f"   ({(1 - model_bytes / dict_bytes) * 100:.1f}% 減少)")
+    print(f"每次序列化    dict+jsonify: {dict_us:8.1f} µs   模型+{encoder}: {model_us:8.1f} µs"
+          f"   ({dict_us / model_us:.1f}x)")
+
+if __name__ == '__main__':
+    main()
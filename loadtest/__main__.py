@@ -0,0 +1,325 @@
+"""
+Flask 應用程式壓力測試工具
+
+以本地替身取代所有上游與 LLM，啟動 gunicorn 後模擬使用者「點擊分析 → 輪詢報告」的流程，
+並輸出吞吐量、延遲百分位數、錯誤率以及各 worker 的記憶體/執行緒成長。
+
+任務狀態存放在各 worker 的記憶體中，多 worker 時輪詢可能打到沒有該任務的 worker 而得到 not_found；
+結果中的 not_found_rate 即為這類跨 worker 遺失任務的比例，可用來量測正式環境（例如 --workers 4）的影響。
+啟動的 gunicorn 會把封存、儀表板、入侵紀錄與 PDF 快取指向暫存目錄，不會寫入專案的 data/。
+
+用法：
+    python -m loadtest --threads 8 --users 20 --duration 60
+    python -m loadtest --workers 4 --users 20 --duration 60         # 與正式環境相同的 worker 數
+    python -m loadtest --target http://127.0.0.1:8000 --users 10   # 對已執行中的服務施壓
+"""
+import os
+import sys
+import json
+import math
+import time
+import signal
+import argparse
+import tempfile
+import threading
+import subprocess
+from typing import Dict, Any, List, Optional
+
+import requests
+
+from loadtest.upstream_stub import start_upstream_stub, stub_environment
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近排名法計算百分位數（輸入需已排序）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+class Metrics:
+    """執行緒安全的延遲與錯誤統計"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {'analyze': [], 'get_report': [], 'session': []}
+        self.errors: Dict[str, int] = {}
+        self.requests = 0
+        self.sessions_completed = 0
+
+    def record(self, kind: str, seconds: float) -> None:
+        with self._lock:
+            self.latencies[kind].append(seconds)
+            if kind != 'session':
+                self.requests += 1
+
+    def record_error(self, reason: str) -> None:
+        with self._lock:
+            self.errors[reason] = self.errors.get(reason, 0) + 1
+
+    def record_session(self, seconds: float) -> None:
+        with self._lock:
+            self.latencies['session'].append(seconds)
+            self.sessions_completed += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        with self._lock:
+            total_errors = sum(self.errors.values())
+            attempted = self.sessions_completed + total_errors
+            result = {
+                'elapsed_seconds': round(elapsed, 2),
+                'http_requests': self.requests,
+                'throughput_rps': round(self.requests / elapsed, 2) if elapsed else 0,
+                'sessions_completed': self.sessions_completed,
+                'sessions_per_second': round(self.sessions_completed / elapsed, 3) if elapsed else 0,
+                'error_rate': round(total_errors / attempted, 4) if attempted else 0,
+                # 輪詢打到沒有該任務的 worker（多 worker 時任務不共享）
+                'not_found_rate': round(self.errors.get('task_not_found', 0) / attempted, 4) if attempted else 0,
+                'errors': dict(self.errors),
+                'latency_ms': {}
+            }
+            for kind, values in self.latencies.items():
+                ordered = sorted(values)
+                result['latency_ms'][kind] = {
+                    'count': len(ordered),
+                    'p50': round(percentile(ordered, 50) * 1000, 1),
+                    'p95': round(percentile(ordered, 95) * 1000, 1),
+                    'p99': round(percentile(ordered, 99) * 1000, 1),
+                    'max': round(ordered[-1] * 1000, 1) if ordered else 0.0
+                }
+            return result
+
+def run_session(base_url: str, metrics: Metrics, poll_interval: float, session_timeout: float) -> None:
+    """模擬一位使用者：POST /analyze 後輪詢 /get_report 直到完成"""
+    http = requests.Session()
+    session_start = time.perf_counter()
+    try:
+        start = time.perf_counter()
+        response = http.post(f"{base_url}/analyze", timeout=30)
+        metrics.record('analyze', time.perf_counter() - start)
+        if response.status_code != 200:
+            metrics.record_error(f"analyze_http_{response.status_code}")
+            return
+        task_id = response.json().get('task_id')
+
+        while time.perf_counter() - session_start < session_timeout:
+            time.sleep(poll_interval)
+            start = time.perf_counter()
+            response = http.get(f"{base_url}/get_report/{task_id}", timeout=30)
+            metrics.record('get_report', time.perf_counter() - start)
+            if response.status_code != 200:
+                metrics.record_error(f"get_report_http_{response.status_code}")
+                return
+            status = response.json().get('status')
+            if status == 'completed':
+                metrics.record_session(time.perf_counter() - session_start)
+                return
+            if status in ('failed', 'not_found'):
+                metrics.record_error(f"task_{status}")
+                return
+        metrics.record_error('session_timeout')
+    except requests.RequestException as e:
+        metrics.record_error(type(e).__name__)
+    finally:
+        http.close()
+
+def user_loop(base_url: str, metrics: Metrics, stop_at: float, args: argparse.Namespace) -> None:
+    while time.perf_counter() < stop_at:
+        run_session(base_url, metrics, args.poll_interval, args.session_timeout)
+        if args.think_time:
+            time.sleep(args.think_time)
+
+def _read_proc_status(pid: int) -> Optional[Dict[str, int]]:
+    """讀取 /proc/<pid>/status 中的 RSS 與執行緒數（僅限 Linux）"""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return {
+            'rss_kb': int(fields['VmRSS'].split()[0]),
+            'threads': int(fields['Threads'].strip())
+        }
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _child_pids(parent_pid: int) -> List[int]:
+    children = []
+    try:
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", 'r') as f:
+                    stat = f.read()
+                # 第四欄為 ppid；程序名稱可能含空白，因此從最後一個 ')' 之後解析
+                ppid = int(stat.rsplit(')', 1)[1].split()[1])
+                if ppid == parent_pid:
+                    children.append(int(entry))
+            except (OSError, ValueError, IndexError):
+                continue
+    except OSError:
+        pass
+    return children
+
+class WorkerSampler(threading.Thread):
+    """定期取樣 gunicorn 各 worker 的 RSS 與執行緒數"""
+
+    def __init__(self, master_pid: int, interval: float = 1.0):
+        super().__init__(name='worker-sampler', daemon=True)
+        self.master_pid = master_pid
+        self.interval = interval
+        self.samples: Dict[int, List[Dict[str, int]]] = {}
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            for pid in _child_pids(self.master_pid):
+                status = _read_proc_status(pid)
+                if status:
+                    self.samples.setdefault(pid, []).append(status)
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def summary(self) -> Dict[str, Any]:
+        result = {}
+        for pid, samples in self.samples.items():
+            first, last = samples[0], samples[-1]
+            result[str(pid)] = {
+                'rss_mb_start': round(first['rss_kb'] / 1024, 1),
+                'rss_mb_end': round(last['rss_kb'] / 1024, 1),
+                'rss_mb_peak': round(max(s['rss_kb'] for s in samples) / 1024, 1),
+                'rss_mb_growth': round((last['rss_kb'] - first['rss_kb']) / 1024, 1),
+                'threads_start': first['threads'],
+                'threads_end': last['threads'],
+                'threads_peak': max(s['threads'] for s in samples)
+            }
+        return result
+
+def storage_environment(directory: str) -> Dict[str, str]:
+    """讓受測的應用程式把所有持久化資料寫入 directory，而不是專案的 data/"""
+    return {
+        'RAW_ARCHIVE_DIR': os.path.join(directory, 'raw_archive'),
+        'DASHBOARD_DB_PATH': os.path.join(directory, 'dashboard.db'),
+        'INCURSION_DB_PATH': os.path.join(directory, 'incursions.db'),
+        'PDF_CACHE_DIR': os.path.join(directory, 'reports_cache')
+    }
+
+def start_gunicorn(args: argparse.Namespace, env: Dict[str, str]) -> subprocess.Popen:
+    command = [
+        sys.executable, '-m', 'gunicorn',
+        '--workers', str(args.workers),
+        '--threads', str(args.threads),
+        '--worker-class', args.worker_class,
+        '--bind', f"127.0.0.1:{args.port}",
+        '--log-level', 'warning',
+        'app:app'
+    ]
+    return subprocess.Popen(command, env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def wait_until_ready(base_url: str, timeout: float = 30.0) -> bool:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if requests.get(f"{base_url}/get_report/healthcheck", timeout=2).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.3)
+    return False
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m loadtest', description='台海威脅儀表板壓力測試')
+    parser.add_argument('--target', help='對已執行中的服務施壓（不啟動 gunicorn 與替身）')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='gunicorn worker 數量（多於 1 時跨 worker 的輪詢會計入 not_found_rate）')
+    parser.add_argument('--threads', type=int, default=1, help='每個 worker 的執行緒數')
+    parser.add_argument('--worker-class', default='sync', help='gunicorn worker 類型')
+    parser.add_argument('--port', type=int, default=8765, help='gunicorn 綁定埠號')
+    parser.add_argument('--users', type=int, default=10, help='同時模擬的使用者數')
+    parser.add_argument('--duration', type=float, default=60.0, help='施壓秒數')
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='輪詢間隔（與前端相同為 2 秒）')
+    parser.add_argument('--session-timeout', type=float, default=120.0, help='單次分析的最長等待秒數')
+    parser.add_argument('--think-time', type=float, default=0.0, help='每次分析之間的停頓秒數')
+    parser.add_argument('--upstream-latency', type=float, default=0.05, help='替身上游回應延遲（秒）')
+    parser.add_argument('--llm-latency', type=float, default=1.0, help='替身 LLM 回應延遲（秒）')
+    parser.add_argument('--output', help='將結果 JSON 另存至指定路徑')
+    args = parser.parse_args(argv)
+    return args
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    server = None
+    gunicorn = None
+    sampler = None
+    storage = None
+
+    try:
+        if args.target:
+            base_url = args.target.rstrip('/')
+        else:
+            server = start_upstream_stub(upstream_latency=args.upstream_latency, llm_latency=args.llm_latency)
+            storage = tempfile.TemporaryDirectory(prefix='loadtest-')
+            env = dict(os.environ)
+            env.update(stub_environment(server))
+            env.update(storage_environment(storage.name))
+            gunicorn = start_gunicorn(args, env)
+            base_url = f"http://127.0.0.1:{args.port}"
+            if not wait_until_ready(base_url):
+                print("gunicorn 未能在時限內啟動", file=sys.stderr)
+                return 2
+            sampler = WorkerSampler(gunicorn.pid)
+            sampler.start()
+
+        print(f"開始施壓：{args.users} 位使用者，持續 {args.duration:.0f} 秒 → {base_url}")
+        metrics = Metrics()
+        started = time.perf_counter()
+        stop_at = started + args.duration
+        users = [
+            threading.Thread(target=user_loop, args=(base_url, metrics, stop_at, args), daemon=True)
+            for _ in range(args.users)
+        ]
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+        elapsed = time.perf_counter() - started
+
+        result = {
+            'config': {
+                'target': base_url,
+                'workers': None if args.target else args.workers,
+                'threads': None if args.target else args.threads,
+                'worker_class': None if args.target else args.worker_class,
+                'users': args.users,
+                'duration': args.duration,
+                'llm_latency': args.llm_latency,
+                'upstream_latency': args.upstream_latency
+            },
+            'results': metrics.summary(elapsed)
+        }
+        if sampler:
+            sampler.stop()
+            sampler.join()
+            result['workers'] = sampler.summary()
+
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+        print(output)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(output)
+        return 0
+
+    finally:
+        if gunicorn:
+            gunicorn.send_signal(signal.SIGTERM)
+            try:
+                gunicorn.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                gunicorn.kill()
+        if server:
+            server.shutdown()
+        if storage:
+            storage.cleanup()
+
+if __name__ == '__main__':
+    sys.exit(main())
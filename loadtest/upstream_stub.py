@@ -0,0 +1,194 @@
+"""
+本地上游替身伺服器：模擬國防部、Google 新聞、Yahoo Finance、
+Metals API 與 OpenAI Chat Completions，讓壓力測試不會打到真實服務。
+"""
+import json
+import time
+import random
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+from typing import Dict, Any
+
+MND_PATH = '/mnd/PublishTable.aspx'
+NEWS_PATH = '/news/search'
+YAHOO_PREFIX = '/yahoo/'
+METALS_PATH = '/metals/gold'
+OPENAI_PATH = '/openai/chat/completions'
+
+def _mnd_listing_html(rows: int = 7) -> str:
+    """產生與國防部即時軍事動態列表相同結構的頁面"""
+    table_rows = []
+    for i in range(rows):
+        table_rows.append(
+            '<tr class="list_table_text">'
+            f'<td>114.01.{10 + i:02d}</td>'
+            f'<td><a href="javascript:__doPostBack(\'ctl00$ContentPlaceHolder1$gvList$ctl{i + 2:02d}$lnkTitle\',\'\')">'
+            f'中共解放軍臺海周邊海、空域動態 {i}</a></td>'
+            '<td>國防部</td>'
+            '</tr>'
+        )
+    viewstate = 'x' * 4096  # 模擬真實頁面龐大的 __VIEWSTATE
+    return (
+        '<html><body><form>'
+        f'<input type="hidden" name="__VIEWSTATE" value="{viewstate}"/>'
+        '<input type="hidden" name="__VIEWSTATEGENERATOR" value="ABCDEF12"/>'
+        '<input type="hidden" name="__EVENTVALIDATION" value="stub"/>'
+        '<div class="ins_p_data"><table>' + ''.join(table_rows) + '</table></div>'
+        '</form></body></html>'
+    )
+
+# 替身內容中隨機出現的威脅詞條，讓詞條比對與計分路徑有實際負載
+STUB_THREAT_PHRASES = ('', '並實施聯合戰備警巡', '另有實彈演習', '執行封鎖演練')
+
+def _mnd_detail_html() -> str:
+    aircrafts = random.randint(0, 30)
+    ships = random.randint(0, 10)
+    return (
+        '<html><body><div class="ins_p_data">'
+        f'<p>今日偵獲共機{aircrafts}架次及共艦{ships}艘，持續於臺海周邊活動{random.choice(STUB_THREAT_PHRASES)}。</p>'
+        '</div></body></html>'
+    )
+
+def _news_html(count: int = 8) -> str:
+    items = []
+    for i in range(count):
+        items.append(
+            '<div class="SoaBEf">'
+            f'<a href="./articles/stub-{i}">link</a>'
+            f'<div role="heading">兩岸情勢測試新聞 {i}</div>'
+            '<time datetime="2025-01-01T00:00:00Z"></time>'
+            f'<div data-n-tid="source-{i}">測試來源 {i % 3}</div>'
+            f'<div class="GI74Re">測試摘要內容{random.choice(STUB_THREAT_PHRASES)}</div>'
+            '</div>'
+        )
+    return '<html><body>' + ''.join(items) + '</body></html>'
+
+def _yahoo_chart(base_price: float) -> Dict[str, Any]:
+    now = int(time.time())
+    closes = [round(base_price * (1 + random.uniform(-0.02, 0.02)), 2) for _ in range(7)]
+    return {
+        "chart": {
+            "result": [{
+                "timestamp": [now - 86400 * (6 - i) for i in range(7)],
+                "indicators": {"quote": [{"close": closes}]}
+            }],
+            "error": None
+        }
+    }
+
+STUB_REPORT = "【情勢概述】\n此為壓力測試用的替身報告內容。\n【風險評估】\n情勢穩定。"
+
+def _chat_completion_chunk(content: str = '', finish_reason: Any = None) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "gpt-3.5-turbo",
+        "choices": [{"index": 0, "delta": {"content": content} if content else {}, "finish_reason": finish_reason}]
+    }
+
+def _chat_completion() -> Dict[str, Any]:
+    content = STUB_REPORT
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "gpt-3.5-turbo",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {"prompt_tokens": 300, "completion_tokens": 400, "total_tokens": 700}
+    }
+
+class UpstreamStubHandler(BaseHTTPRequestHandler):
+    # 由 start_upstream_stub 設定
+    upstream_latency = 0.0
+    llm_latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: str, content_type: str) -> None:
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _drain_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send_chat_stream(self, pieces: int = 8) -> None:
+        """以 server-sent events 逐段送出報告，總延遲與非串流模式相同"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        step = max(1, len(STUB_REPORT) // pieces)
+        for start in range(0, len(STUB_REPORT), step):
+            time.sleep(self.llm_latency / pieces)
+            chunk = _chat_completion_chunk(STUB_REPORT[start:start + step])
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+        self.wfile.write(f"data: {json.dumps(_chat_completion_chunk(finish_reason='stop'))}\n\ndata: [DONE]\n\n".encode('utf-8'))
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        time.sleep(self.upstream_latency)
+        if path == MND_PATH:
+            self._send(200, _mnd_listing_html(), 'text/html; charset=utf-8')
+        elif path == NEWS_PATH:
+            self._send(200, _news_html(), 'text/html; charset=utf-8')
+        elif path.startswith(YAHOO_PREFIX):
+            base_price = 2000.0 if 'GC' in path else 6.0
+            self._send(200, json.dumps(_yahoo_chart(base_price)), 'application/json')
+        elif path == METALS_PATH:
+            self._send(200, json.dumps([{"price": 2000.0}]), 'application/json')
+        else:
+            self._send(404, '{}', 'application/json')
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        body = self._drain_body()
+        if path == MND_PATH:
+            time.sleep(self.upstream_latency)
+            self._send(200, _mnd_detail_html(), 'text/html; charset=utf-8')
+        elif path == OPENAI_PATH:
+            if json.loads(body or b'{}').get('stream'):
+                self._send_chat_stream()
+                return
+            time.sleep(self.llm_latency)
+            self._send(200, json.dumps(_chat_completion()), 'application/json')
+        else:
+            self._send(404, '{}', 'application/json')
+
+def start_upstream_stub(host: str = '127.0.0.1', port: int = 0,
+                        upstream_latency: float = 0.05,
+                        llm_latency: float = 1.0) -> ThreadingHTTPServer:
+    """在背景執行緒啟動替身伺服器，port=0 時自動選擇可用埠"""
+    handler = type('ConfiguredStubHandler', (UpstreamStubHandler,), {
+        'upstream_latency': upstream_latency,
+        'llm_latency': llm_latency
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='upstream-stub', daemon=True)
+    thread.start()
+    return server
+
+def stub_environment(server: ThreadingHTTPServer) -> Dict[str, str]:
+    """回傳讓應用程式改連替身伺服器所需的環境變數"""
+    host, port = server.server_address[:2]
+    base = f"http://{host}:{port}"
+    return {
+        'MND_URL': f"{base}{MND_PATH}?Types=stub",
+        'GOOGLE_NEWS_URL': f"{base}/news",
+        'YAHOO_CHART_URL': f"{base}/yahoo",
+        'METALS_API_URL': f"{base}{METALS_PATH}",
+        'OPENAI_BASE_URL': f"{base}/openai",
+        'OPENAI_API_KEY': 'sk-loadtest-stub'
+    }
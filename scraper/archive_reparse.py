@@ -0,0 +1,143 @@
+"""
+以目前的解析器離線重新解析封存的上游回應
+
+用於驗證解析器修正：對數個月的封存頁面重新解析並統計失敗與「解析結果為空」的數量，
+不需要連線到國防部或 Google 新聞。解析在程序池中並行執行，每個工作只依索引讀取區段檔中的位置。
+
+用法：
+    python -m scraper.archive_reparse --source mnd_detail --since 2025-01-01 --workers 4 --output reparsed.jsonl
+"""
+import os
+import sys
+import time
+import argparse
+import logging
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from scraper.response_archive import ResponseArchive, read_record
+from scraper.military_scraper import parse_listing_page, parse_incursion_details
+from scraper.news_scraper import _parse_news_results
+from scraper.yahoo_chart import parse_daily_quote
+from utils.json_codec import dumps
+
+# 封存來源 → (解析器, 計算解析出的項目數)；項目數為 0 表示解析器可能已失效
+ARCHIVE_PARSERS: Dict[str, Tuple[Callable[[str], Any], Callable[[Any], int]]] = {
+    'mnd_listing': (parse_listing_page, lambda result: len(result['rows'])),
+    'mnd_detail': (parse_incursion_details, lambda result: int(result is not None)),
+    'google_news': (_parse_news_results, len),
+    'yahoo_gold': (parse_daily_quote, lambda result: int(result is not None)),
+    'yahoo_food': (parse_daily_quote, lambda result: int(result is not None)),
+}
+
+DEFAULT_BATCH_SIZE = 64
+
+def reparse_batch(segment_dir: str, rows: List[Tuple]) -> List[Dict[str, Any]]:
+    """在子程序中重新解析一批索引列"""
+    results = []
+    for row in rows:
+        record_id, source, url, fetched_at = row[:4]
+        outcome: Dict[str, Any] = {'id': record_id, 'source': source, 'url': url, 'fetched_at': fetched_at}
+        try:
+            parser, count_items = ARCHIVE_PARSERS[source]
+            parsed = parser(read_record(Path(segment_dir), row).text)
+            outcome['items'] = count_items(parsed)
+            outcome['result'] = parsed
+        except Exception as e:
+            outcome['error'] = f"{type(e).__name__}: {e}"
+        results.append(outcome)
+    return results
+
+def _batches(rows: List[Tuple], batch_size: int) -> List[List[Tuple]]:
+    """索引已依區段檔與位置排序，連續切分即可讓每批盡量讀取同一個區段檔"""
+    return [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+
+def reparse_archive(archive: ResponseArchive, sources: Optional[List[str]] = None,
+                    since: Optional[str] = None, until: Optional[str] = None,
+                    workers: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                    output: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """重新解析指定範圍的封存回應，回傳各來源的統計；output 指定時寫入 JSON Lines"""
+    sources = sources or list(ARCHIVE_PARSERS)
+    unknown = [source for source in sources if source not in ARCHIVE_PARSERS]
+    if unknown:
+        raise ValueError(f"沒有對應解析器的來源: {', '.join(unknown)}")
+
+    # HTTP 錯誤回應只供追查，不列入解析器驗證
+    rows = [row for source in sources for row in archive.query(source, since, until, successful_only=True)]
+    rows.sort(key=lambda row: (row[4], row[5]))
+    stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {'records': 0, 'errors': 0, 'empty': 0})
+    if not rows:
+        return {}
+
+    out_file = None
+    if output:
+        output_path = Path(output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, prefix='.tmp-')
+        out_file = os.fdopen(fd, 'wb')
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(reparse_batch, str(archive.segment_dir), batch)
+                for batch in _batches(rows, batch_size)
+            ]
+            for future in as_completed(futures):
+                for outcome in future.result():
+                    source_stats = stats[outcome['source']]
+                    source_stats['records'] += 1
+                    if 'error' in outcome:
+                        source_stats['errors'] += 1
+                    elif not outcome['items']:
+                        source_stats['empty'] += 1
+                    if out_file:
+                        out_file.write(dumps(outcome) + b'\n')
+        if out_file:
+            out_file.close()
+            os.replace(tmp_path, output)
+    finally:
+        if out_file:
+            out_file.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    return dict(stats)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='離線重新解析封存的上游回應')
+    parser.add_argument('--source', action='append', choices=sorted(ARCHIVE_PARSERS),
+                        help='封存來源（可重複指定，預設全部）')
+    parser.add_argument('--since', help='起始時間（YYYY-MM-DD 或 ISO 時間，含）')
+    parser.add_argument('--until', help='結束時間（YYYY-MM-DD 或 ISO 時間，含）')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='解析程序數')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='每個工作處理的回應數')
+    parser.add_argument('--output', help='將每筆解析結果寫入 JSON Lines 檔案')
+    parser.add_argument('--archive-dir', help='封存目錄（預設 data/raw_archive）')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # 只有日期時，結束時間包含當天整天
+    until = f"{args.until}T23:59:59.999999" if args.until and len(args.until) == 10 else args.until
+
+    archive = ResponseArchive(args.archive_dir)
+    start = time.perf_counter()
+    try:
+        stats = reparse_archive(archive, args.source, args.since, until,
+                                args.workers, args.batch_size, args.output)
+    finally:
+        archive.close()
+    elapsed = time.perf_counter() - start
+
+    total = sum(s['records'] for s in stats.values())
+    print(f"重新解析 {total} 筆回應，耗時 {elapsed:.2f} 秒（{total / elapsed if elapsed else 0:.0f} 筆/秒）")
+    for source, source_stats in sorted(stats.items()):
+        print(f"  {source}: {source_stats['records']} 筆，錯誤 {source_stats['errors']}，"
+              f"解析結果為空 {source_stats['empty']}")
+    if any(s['errors'] for s in stats.values()):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
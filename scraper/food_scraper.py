@@ -1,79 +1,47 @@
-import requests
+import os
 import random
 import json
 from datetime import datetime, timedelta
 from typing import Dict, Any
 import logging
 
+from scraper.intraday_prices import INTRADAY_ENABLED, fetch_intraday_bars
+from scraper.yahoo_chart import fetch_daily_quote
+
+# Yahoo Finance 圖表 API 基礎 URL（可由環境變數覆寫）
+YAHOO_CHART_URL = os.getenv("YAHOO_CHART_URL", "https://query1.finance.yahoo.com/v8/finance/chart")
+
 def scrape_food_prices_yahoo() -> Dict[str, Any]:
     """
     從 Yahoo Finance 抓取小麥價格資料
     """
     try:
-        url = "https://query1.finance.yahoo.com/v8/finance/chart/ZW=F"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        params = {
-            'interval': '1d',
-            'range': '7d'
+        quote = fetch_daily_quote(f"{YAHOO_CHART_URL}/ZW=F", 'yahoo_food')
+        if quote is None:
+            return None
+
+        # 快取中的解析結果為共用物件，複製後再加上抓取時間
+        return {
+            "wheat_price": quote["price"],
+            "previous_close": quote["previous_close"],
+            "daily_change": quote["daily_change"],
+            "daily_change_percent": quote["daily_change_percent"],
+            "week_change": quote["week_change"],
+            "week_change_percent": quote["week_change_percent"],
+            "currency": "USD",
+            "unit": "蒲式耳",
+            "last_updated": datetime.now().isoformat(),
+            "source": "Yahoo Finance"
         }
-        
-        response = requests.get(url, headers=headers, params=params, timeout=15)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if 'chart' in data and 'result' in data['chart'] and data['chart']['result']:
-            result = data['chart']['result'][0]
-            
-            # 獲取價格數據
-            timestamps = result['timestamp']
-            prices = result['indicators']['quote'][0]['close']
-            
-            # 過濾掉 None 值
-            valid_prices = [p for p in prices if p is not None]
-            
-            if not valid_prices:
-                return None
-                
-            current_price = valid_prices[-1]
-            previous_close = valid_prices[-2] if len(valid_prices) > 1 else current_price
-            
-            # 計算日變化
-            change = current_price - previous_close
-            change_percent = (change / previous_close) * 100 if previous_close != 0 else 0
-            
-            # 計算7天內的價格變化
-            if len(prices) >= 2:
-                week_change = current_price - prices[0]
-                week_change_percent = (week_change / prices[0]) * 100
-            else:
-                week_change = 0
-                week_change_percent = 0
-                
-            return {
-                "wheat_price": round(current_price, 2),
-                "previous_close": round(previous_close, 2),
-                "daily_change": round(change, 2),
-                "daily_change_percent": round(change_percent, 2),
-                "week_change": round(week_change, 2),
-                "week_change_percent": round(week_change_percent, 2),
-                "currency": "USD",
-                "unit": "蒲式耳",
-                "last_updated": datetime.now().isoformat(),
-                "source": "Yahoo Finance"
-            }
-            
+
     except Exception as e:
         logging.warning(f"Yahoo Finance 小麥價格抓取失敗: {e}")
         return None
 
-def scrape_food_prices() -> Dict[str, Any]:
+def scrape_food_prices(intraday: bool = INTRADAY_ENABLED) -> Dict[str, Any]:
     """
-    主要的食品價格爬取函數
+    主要的食品價格爬取函數。
+    intraday 為 True 時另外抓取日內K線，供波動度指標使用。
     """
     print("正在爬取食品價格資料...")
     
@@ -82,6 +50,10 @@ def scrape_food_prices() -> Dict[str, Any]:
     
     if food_data:
         print("成功從 Yahoo Finance 獲取小麥價格")
+        if intraday:
+            bars = fetch_intraday_bars(f"{YAHOO_CHART_URL}/ZW=F")
+            if bars:
+                food_data["intraday"] = bars
         return food_data
     
     # 如果失敗，提供模擬數據
@@ -0,0 +1,141 @@
+"""
+條件式請求與內容雜湊快取
+
+記住每個上游頁面的 ETag / Last-Modified 並送出條件式請求；
+收到 304 或內容雜湊與上次成功解析時相同，就直接沿用上次解析出的結果，
+省去下載與 BeautifulSoup 解析的成本。
+"""
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from scraper.response_archive import archive_response
+
+# 快取的最大項目數（每個 URL / postback 目標一筆）
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv('HTTP_CACHE_MAX_ENTRIES', '512'))
+
+class _CacheEntry:
+    __slots__ = ('etag', 'last_modified', 'body_hash', 'parsed', 'immutable')
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], body_hash: str, parsed: Any,
+                 immutable: bool = False):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body_hash = body_hash
+        self.parsed = parsed
+        # 只有解析結果完整時才視為不會變更，之後不再發送請求
+        self.immutable = immutable
+
+class ResponseCache:
+    """執行緒安全的 LRU 快取，保存驗證標頭、內容雜湊與解析結果"""
+
+    def __init__(self, max_entries: int = HTTP_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, _CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'not_modified': 0, 'hash_hit': 0, 'immutable_hit': 0, 'parsed': 0}
+
+    def get(self, key: str) -> Optional[_CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: _CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+_default_cache = ResponseCache()
+
+def body_digest(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+def fetch_and_parse(url: str, parser: Callable[[str], Any], *,
+                    method: str = 'GET',
+                    session: Optional[requests.Session] = None,
+                    cache_key: Optional[str] = None,
+                    headers: Optional[Dict[str, str]] = None,
+                    cache: Optional[ResponseCache] = None,
+                    immutable: bool = False,
+                    complete: Optional[Callable[[Any], bool]] = None,
+                    archive_source: Optional[str] = None,
+                    **request_kwargs) -> Any:
+    """
+    下載並解析頁面；未變更時（304 或雜湊相同）直接回傳上次的解析結果。
+
+    parser 接收回應文字並回傳解析結果，結果會被快取共用，呼叫端不應修改。
+    cache_key 預設為 method + URL；postback 等 URL 相同的請求需自行指定。
+    immutable=True 表示內容發布後不會變更（例如已公告的詳情頁），有快取時完全不發送請求。
+    complete 判斷解析結果是否完整；回傳 False 時（例如狀態碼 200 的錯誤頁或逾期的 __VIEWSTATE）
+    結果不會標記為 immutable，下次仍會重新請求。
+    archive_source 指定時，需要解析的新內容與 HTTP 錯誤回應會先封存原始回應，供日後離線重新解析。
+    """
+    cache = cache or _default_cache
+    key = cache_key or f"{method} {url}"
+    entry = cache.get(key)
+
+    if entry is not None and entry.immutable:
+        cache.record('immutable_hit')
+        return entry.parsed
+
+    request_headers = dict(headers or {})
+    if entry is not None and method == 'GET':
+        if entry.etag:
+            request_headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            request_headers['If-Modified-Since'] = entry.last_modified
+
+    http = session or requests
+    response = http.request(method, url, headers=request_headers, **request_kwargs)
+
+    if response.status_code == 304 and entry is not None:
+        cache.record('not_modified')
+        logging.debug(f"304 未變更，沿用快取: {key}")
+        return entry.parsed
+
+    digest = body_digest(response.content)
+    if not response.ok:
+        # 錯誤回應也先封存（索引記錄狀態碼），事後才能看到上游回了什麼
+        if archive_source:
+            archive_response(archive_source, response, digest, method, key, request_kwargs)
+        response.raise_for_status()
+
+    if entry is not None and entry.body_hash == digest:
+        cache.record('hash_hit')
+        logging.debug(f"內容雜湊相同，略過解析: {key}")
+        # 更新驗證標頭，下次可改用 304
+        cache.put(key, _CacheEntry(response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                                   digest, entry.parsed))
+        return entry.parsed
+
+    # 在解析前封存，解析器失效時仍保有原始頁面
+    if archive_source:
+        archive_response(archive_source, response, digest, method, key, request_kwargs)
+
+    parsed = parser(response.text)
+    cache.record('parsed')
+    cache.put(key, _CacheEntry(response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                               digest, parsed, immutable and (complete is None or complete(parsed))))
+    return parsed
+
+def cache_stats() -> Dict[str, int]:
+    """回傳預設快取的命中統計"""
+    with _default_cache._lock:
+        return dict(_default_cache.stats)
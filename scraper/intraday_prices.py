@@ -0,0 +1,60 @@
+import os
+import math
+import logging
+import requests
+from typing import Dict, Any, Optional
+
+# 是否抓取日內K線供波動度指標使用
+INTRADAY_ENABLED = os.getenv('ECONOMIC_INTRADAY', '0') == '1'
+INTRADAY_INTERVAL = os.getenv('INTRADAY_INTERVAL', '5m')
+INTRADAY_RANGE = os.getenv('INTRADAY_RANGE', '5d')
+
+_INTERVAL_SECONDS = {'1m': 60, '2m': 120, '5m': 300, '15m': 900, '30m': 1800, '60m': 3600, '90m': 5400, '1h': 3600}
+
+def fetch_intraday_bars(chart_url: str, interval: str = INTRADAY_INTERVAL,
+                        range_: str = INTRADAY_RANGE) -> Optional[Dict[str, Any]]:
+    """
+    從 Yahoo Finance 圖表 API 抓取日內收盤價。
+    休市造成的時間斷層會插入 NaN，讓跨休市的報酬率不會被誤判為跳空。
+    """
+    interval_seconds = _INTERVAL_SECONDS.get(interval)
+    if not interval_seconds:
+        logging.warning(f"不支援的日內K線間隔: {interval}")
+        return None
+
+    try:
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+        params = {
+            'interval': interval,
+            'range': range_
+        }
+        response = requests.get(chart_url, headers=headers, params=params, timeout=15)
+        response.raise_for_status()
+        data = response.json()
+
+        result = data['chart']['result'][0]
+        timestamps = result.get('timestamp') or []
+        closes = result['indicators']['quote'][0]['close']
+
+        series = []
+        previous_ts = None
+        for ts, close in zip(timestamps, closes):
+            if previous_ts is not None and ts - previous_ts > 2 * interval_seconds:
+                series.append(math.nan)
+            series.append(float(close) if close is not None else math.nan)
+            previous_ts = ts
+
+        if sum(1 for c in series if not math.isnan(c)) < 2:
+            return None
+
+        return {
+            "interval": interval,
+            "interval_seconds": interval_seconds,
+            "closes": series
+        }
+
+    except Exception as e:
+        logging.warning(f"日內K線抓取失敗 ({chart_url}): {e}")
+        return None
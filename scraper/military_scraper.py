@@ -1,117 +1,196 @@
+import os
 import re
 import random
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from collections import Counter
+from typing import Dict, Any, Optional, Tuple
 import urllib3
 import logging
 
+from scraper.http_cache import fetch_and_parse
+from utils.keyword_matcher import KeywordMatcher, threat_matcher
+
 # 忽略 SSL 警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# 台灣國防部網站URL
-MND_URL = 'https://www.mnd.gov.tw/PublishTable.aspx?Types=即時軍事動態&title=國防消息'
+# 台灣國防部網站URL（可由環境變數覆寫，供壓力測試指向本地替身）
+MND_URL = os.getenv('MND_URL', 'https://www.mnd.gov.tw/PublishTable.aspx?Types=即時軍事動態&title=國防消息')
 
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     'Referer': MND_URL
 }
 
+# 擾台相關新聞標題關鍵字
+INCURSION_TITLE_KEYWORDS = ['解放軍', '共軍', '擾台', '軍機', '軍艦', '偵獲']
+INCURSION_TITLE_MATCHER = KeywordMatcher({keyword: 1 for keyword in INCURSION_TITLE_KEYWORDS})
+
+ASPNET_FORM_FIELDS = ('__VIEWSTATE', '__VIEWSTATEGENERATOR', '__EVENTVALIDATION')
+
+def extract_form_state(soup: BeautifulSoup) -> Optional[Dict[str, str]]:
+    """取出 ASP.NET 表單狀態欄位，缺少任一欄位時回傳 None"""
+    state = {}
+    for field in ASPNET_FORM_FIELDS:
+        elem = soup.find('input', {'name': field})
+        if not elem:
+            return None
+        state[field] = elem.get('value', '')
+    return state
+
+def parse_postback(href: str) -> Optional[Tuple[str, str]]:
+    """解析 javascript:__doPostBack('target','argument') 連結"""
+    match = re.search(r"__doPostBack\('([^']+)'\s*,\s*'([^']*)'", href)
+    if match:
+        return match.group(1), match.group(2)
+    match = re.search(r"__doPostBack\('([^']+)'", href)
+    if match:
+        return match.group(1), ''
+    return None
+
+def postback_data(form_state: Dict[str, str], event_target: str, event_argument: str = '') -> Dict[str, str]:
+    """組合 __doPostBack 所需的 POST 參數"""
+    data = dict(form_state)
+    data['__EVENTTARGET'] = event_target
+    data['__EVENTARGUMENT'] = event_argument
+    return data
+
+def _details_text(details_html: str) -> str:
+    details_soup = BeautifulSoup(details_html, 'html.parser')
+    content_area = details_soup.find('div', class_='ins_p_data') or details_soup
+    return content_area.get_text()
+
+def _match_incursions(details_page_text: str) -> Optional[Tuple[int, int]]:
+    """找不到共機或共艦數量時回傳 None（例如錯誤頁、逾期的 __VIEWSTATE 或非每日動態的公告）"""
+    aircraft_match = re.search(r'偵獲共機(\d+)架次', details_page_text)
+    # 公告寫法為「共機N架次、共艦M艘」或「共機N架次及共艦M艘」
+    ship_match = re.search(r'共艦(\d+)艘', details_page_text)
+    if not aircraft_match and not ship_match:
+        return None
+
+    aircrafts = int(aircraft_match.group(1)) if aircraft_match else 0
+    ships = int(ship_match.group(1)) if ship_match else 0
+    return aircrafts, ships
+
+def _count_incursions(details_page_text: str) -> Tuple[int, int]:
+    return _match_incursions(details_page_text) or (0, 0)
+
+def match_incursion_counts(details_html: str) -> Optional[Tuple[int, int]]:
+    """從詳情頁解析共機架次與共艦艘數；頁面中沒有任何數量時回傳 None"""
+    return _match_incursions(_details_text(details_html))
+
+def parse_incursion_counts(details_html: str) -> Tuple[int, int]:
+    """從詳情頁解析共機架次與共艦艘數，找不到時視為 0"""
+    return match_incursion_counts(details_html) or (0, 0)
+
+def parse_incursion_details(details_html: str) -> Optional[Tuple[int, int, Dict[str, int]]]:
+    """
+    從詳情頁解析共機架次、共艦艘數與威脅詞條命中次數；
+    頁面中沒有數量（錯誤頁或非每日動態的公告）時回傳 None
+    """
+    details_page_text = _details_text(details_html)
+    counts = _match_incursions(details_page_text)
+    if counts is None:
+        return None
+    return counts[0], counts[1], threat_matcher().scan(details_page_text)
+
+def parse_listing_page(html: str) -> Dict[str, Any]:
+    """
+    解析列表頁：回傳 ASP.NET 表單狀態與最近 7 筆擾台相關列的標題與 postback 目標
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # 找到包含軍事動態的表格
+    content_div = soup.find('div', class_='ins_p_data') or soup.find('div', id='divContent') or soup
+    rows = []
+    for row in content_div.find_all('tr', class_='list_table_text')[:7]:  # 只檢查最近7天的資料
+        cells = row.find_all('td')
+        if len(cells) < 3:
+            continue
+        title_cell = cells[1]
+
+        # 檢查是否為擾台相關新聞
+        title_text = title_cell.get_text()
+        if not INCURSION_TITLE_MATCHER.contains_any(title_text):
+            continue
+
+        # 解析 __doPostBack 參數
+        link = title_cell.find('a')
+        href = link.get('href') if link else None
+        if not href or '__doPostBack' not in href:
+            continue
+        postback = parse_postback(href)
+        if not postback:
+            continue
+
+        rows.append({
+            'date_text': cells[0].get_text(strip=True),
+            'title': title_text,
+            'event_target': postback[0]
+        })
+
+    return {'form_state': extract_form_state(soup), 'rows': rows}
+
 def scrape_military_data() -> Dict[str, Any]:
     """
     從國防部網站抓取解放軍活動資料。
     此爬蟲會處理 ASP.NET 的 __doPostBack 機制來進入詳情頁。
+    列表頁與詳情頁皆經由條件式請求快取，未變更時不會重新解析。
     """
     print("正在從國防部網站爬取即時軍事動態...")
     try:
         session = requests.Session()
-        response = session.get(MND_URL, headers=HEADERS, timeout=20, verify=False)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # 找到包含軍事動態的表格
-        content_div = soup.find('div', class_='ins_p_data') or soup.find('div', id='divContent') or soup
-        rows = content_div.find_all('tr', class_='list_table_text')
+        listing = fetch_and_parse(
+            MND_URL, parse_listing_page, session=session, archive_source='mnd_listing',
+            headers=HEADERS, timeout=20, verify=False
+        )
+        form_state = listing['form_state']
+        # 缺少 ASP.NET 表單參數時無法進入詳情頁
+        rows = listing['rows'] if form_state else []
         
         total_incursions_last_week = 0
         latest_aircrafts = 0
         latest_ships = 0
         daily_intrusions = []
+        # 標題與詳情內文的威脅詞條命中次數
+        keyword_hits = Counter(threat_matcher().scan_many(row['title'] for row in rows))
         
         # 尋找最新的擾台數據
-        for row in rows[:7]:  # 只檢查最近7天的資料
-            cells = row.find_all('td')
-            if len(cells) >= 3:
-                date_text = cells[0].get_text(strip=True)
-                title_cell = cells[1]
+        for row in rows:
+            # 發送 POST 請求獲取詳細內容；已發布的公告不會變更，以標題與日期作為快取鍵
+            try:
+                # 解析不到數量的頁面（錯誤頁等）不標記為 immutable，下次會重新請求
+                details = fetch_and_parse(
+                    MND_URL, parse_incursion_details, method='POST', session=session,
+                    cache_key=f"mnd-detail {row['date_text']} {row['title']}",
+                    immutable=True, complete=lambda parsed: parsed is not None,
+                    archive_source='mnd_detail',
+                    headers=HEADERS, data=postback_data(form_state, row['event_target']),
+                    timeout=20, verify=False
+                )
+                if details is None:
+                    logging.info(f"詳情頁沒有共機/共艦數量，略過: {row['title']}")
+                    continue
+                aircrafts_today, ships_today, detail_hits = details
                 
-                # 檢查是否為擾台相關新聞
-                title_text = title_cell.get_text()
-                if any(keyword in title_text for keyword in ['解放軍', '共軍', '擾台', '軍機', '軍艦', '偵獲']):
-                    
-                    # 嘗試獲取詳細資料
-                    link = title_cell.find('a')
-                    if link and link.get('href'):
-                        href = link.get('href')
-                        
-                        # 解析 __doPostBack 參數
-                        if '__doPostBack' in href:
-                            event_target_match = re.search(r"__doPostBack\('([^']+)'", href)
-                            if not event_target_match:
-                                continue
-                
-                            event_target = event_target_match.group(1)
-                            
-                            # 獲取 ASP.NET 表單參數
-                            viewstate_elem = soup.find('input', {'name': '__VIEWSTATE'})
-                            viewstate_generator_elem = soup.find('input', {'name': '__VIEWSTATEGENERATOR'})
-                            event_validation_elem = soup.find('input', {'name': '__EVENTVALIDATION'})
-                            
-                            if not all([viewstate_elem, viewstate_generator_elem, event_validation_elem]):
-                                continue
-                            
-                            # 準備 POST 請求參數
-                            post_data = {
-                                '__VIEWSTATE': viewstate_elem.get('value', ''),
-                                '__VIEWSTATEGENERATOR': viewstate_generator_elem.get('value', ''),
-                                '__EVENTVALIDATION': event_validation_elem.get('value', ''),
-                                '__EVENTTARGET': event_target,
-                                '__EVENTARGUMENT': ''
-                            }
-                            
-                            # 發送 POST 請求獲取詳細內容
-                            try:
-                                details_response = session.post(MND_URL, headers=HEADERS, data=post_data, timeout=20, verify=False)
-                                details_response.raise_for_status()
-                
-                                details_soup = BeautifulSoup(details_response.text, 'html.parser')
-                                content_area = details_soup.find('div', class_='ins_p_data') or details_soup
-                                details_page_text = content_area.get_text()
-
-                                # 解析軍機和軍艦數量
-                                aircraft_match = re.search(r'偵獲共機(\d+)架次', details_page_text)
-                                ship_match = re.search(r'及共艦(\d+)艘', details_page_text)
+                # 累加數據
+                keyword_hits.update(detail_hits)
+                total_incursions_last_week += aircrafts_today + ships_today
+                if not latest_aircrafts and not latest_ships:  # 保存最新的數據
+                    latest_aircrafts = aircrafts_today
+                    latest_ships = ships_today
                 
-                                aircrafts_today = int(aircraft_match.group(1)) if aircraft_match else 0
-                                ships_today = int(ship_match.group(1)) if ship_match else 0
+                daily_intrusions.append(aircrafts_today + ships_today)
                 
-                                # 累加數據
-                                total_incursions_last_week += aircrafts_today + ships_today
-                                if not latest_aircrafts and not latest_ships:  # 保存最新的數據
-                                    latest_aircrafts = aircrafts_today
-                                    latest_ships = ships_today
-            
-                                daily_intrusions.append(aircrafts_today + ships_today)
-                                
-                            except Exception as detail_error:
-                                logging.warning(f"無法獲取詳細內容: {detail_error}")
-                                # 從標題嘗試提取數字
-                                numbers = re.findall(r'(\d+)', title_text)
-                                if numbers:
-                                    daily_total = sum(int(num) for num in numbers if int(num) < 100)
-                                    total_incursions_last_week += daily_total
-                                    daily_intrusions.append(daily_total)
+            except Exception as detail_error:
+                logging.warning(f"無法獲取詳細內容: {detail_error}")
+                # 從標題嘗試提取數字
+                numbers = re.findall(r'(\d+)', row['title'])
+                if numbers:
+                    daily_total = sum(int(num) for num in numbers if int(num) < 100)
+                    total_incursions_last_week += daily_total
+                    daily_intrusions.append(daily_total)
 
         # 補齊7天的數據
         while len(daily_intrusions) < 7:
@@ -125,6 +204,8 @@ def scrape_military_data() -> Dict[str, Any]:
                 "labels": [(datetime.now() - timedelta(days=i)).strftime("%m-%d") for i in range(6, -1, -1)],
                 "data": daily_intrusions[::-1]
             },
+            "keyword_hits": dict(keyword_hits),
+            "keyword_reports": len(rows),
             "source_url": MND_URL
         }
 
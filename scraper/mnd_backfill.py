@@ -0,0 +1,270 @@
+"""
+國防部即時軍事動態歷史資料回補
+
+透過與 scrape_military_data 相同的 ASP.NET __doPostBack 機制逐頁翻閱列表，
+以有限並行度與請求間隔抓取詳情頁，並將每日共機/共艦數量批次寫入 SQLite。
+每完成一頁即寫入檢查點，中斷後重新執行會從下一頁繼續；
+詳情頁請求失敗的列連同當時的表單狀態記在檢查點中，下次執行時先重試，避免歷史資料留下缺口。
+
+用法：
+    python -m scraper.mnd_backfill --max-pages 50 --concurrency 4 --min-interval 1.0
+"""
+import os
+import re
+import json
+import time
+import logging
+import argparse
+import threading
+from datetime import date
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from bs4 import BeautifulSoup
+
+from scraper.military_scraper import (
+    MND_URL, HEADERS, INCURSION_TITLE_KEYWORDS,
+    extract_form_state, parse_postback, postback_data, match_incursion_counts
+)
+from utils.incursion_store import IncursionStore
+
+DEFAULT_CHECKPOINT_PATH = os.getenv('MND_BACKFILL_CHECKPOINT', 'data/mnd_backfill_checkpoint.json')
+
+class RateLimiter:
+    """所有執行緒共用的最小請求間隔"""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_allowed = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_allowed - now
+            self._next_allowed = max(now, self._next_allowed) + self.min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+def parse_listing_date(text: str) -> Optional[str]:
+    """將列表日期（民國或西元年）轉為 YYYY-MM-DD"""
+    match = re.search(r'(\d{2,4})[./\-年](\d{1,2})[./\-月](\d{1,2})', text)
+    if not match:
+        return None
+    year, month, day = (int(part) for part in match.groups())
+    if year < 1911:
+        year += 1911
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+def parse_listing_rows(soup: BeautifulSoup) -> List[Dict[str, str]]:
+    """解析列表頁中與擾台相關的列，回傳日期、標題與詳情頁的 postback 目標"""
+    content_div = soup.find('div', class_='ins_p_data') or soup.find('div', id='divContent') or soup
+    rows = []
+    for row in content_div.find_all('tr', class_='list_table_text'):
+        cells = row.find_all('td')
+        if len(cells) < 3:
+            continue
+        title_text = cells[1].get_text(strip=True)
+        if not any(keyword in title_text for keyword in INCURSION_TITLE_KEYWORDS):
+            continue
+        link = cells[1].find('a')
+        postback = parse_postback(link.get('href', '')) if link else None
+        row_date = parse_listing_date(cells[0].get_text(strip=True))
+        if not postback or not row_date:
+            continue
+        rows.append({'date': row_date, 'title': title_text, 'event_target': postback[0]})
+    return rows
+
+def find_page_link(soup: BeautifulSoup, page_number: int) -> Optional[Tuple[str, str]]:
+    """在分頁列中尋找指定頁碼的 postback 目標與參數"""
+    for link in soup.find_all('a', href=True):
+        postback = parse_postback(link['href'])
+        if postback and postback[1] == f'Page${page_number}':
+            return postback
+    return None
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    """先寫入暫存檔再替換，避免中斷時留下損毀的檢查點"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+class MndBackfill:
+    def __init__(self, store: IncursionStore, checkpoint_path: str = DEFAULT_CHECKPOINT_PATH,
+                 concurrency: int = 4, min_interval: float = 1.0, retries: int = 2):
+        self.store = store
+        self.checkpoint_path = checkpoint_path
+        self.concurrency = concurrency
+        self.retries = retries
+        self.rate_limiter = RateLimiter(min_interval)
+        self.session = requests.Session()
+        self._local = threading.local()
+
+    def _thread_session(self) -> requests.Session:
+        """每個執行緒使用獨立 Session，並沿用主 Session 的 Cookie"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.cookies.update(self.session.cookies)
+            self._local.session = session
+        return session
+
+    def _request(self, session: requests.Session, method: str, data: Optional[Dict[str, str]] = None) -> str:
+        last_error: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.wait()
+            try:
+                response = session.request(method, MND_URL, headers=HEADERS, data=data, timeout=20, verify=False)
+                response.raise_for_status()
+                return response.text
+            except requests.RequestException as e:
+                last_error = e
+                if attempt < self.retries:
+                    time.sleep(2 ** attempt)
+        raise last_error
+
+    def _fetch_detail(self, row: Dict[str, str],
+                      form_state: Dict[str, str]) -> Tuple[str, Optional[Tuple[str, int, int, str]]]:
+        """
+        回傳 (狀態, 紀錄)：狀態為 ok、failed（請求失敗）或 skipped（詳情頁沒有共機/共艦數量，
+        例如標題含「解放軍」的其他公告），skipped 的列不寫入，以免以 0 覆蓋同日的每日動態
+        """
+        try:
+            html = self._request(self._thread_session(), 'POST', postback_data(form_state, row['event_target']))
+        except requests.RequestException as e:
+            logging.warning(f"無法獲取 {row['date']} 詳細內容: {e}")
+            return 'failed', None
+        counts = match_incursion_counts(html)
+        if counts is None:
+            logging.info(f"{row['date']}「{row['title']}」沒有共機/共艦數量，略過")
+            return 'skipped', None
+        return 'ok', (row['date'], counts[0], counts[1], row['title'])
+
+    def _fetch_rows(self, executor: ThreadPoolExecutor, rows: List[Dict[str, str]],
+                    form_state: Dict[str, str], stats: Dict[str, Any]) -> List[Dict[str, str]]:
+        """抓取並寫入一批詳情頁，回傳請求失敗、需要日後重試的列"""
+        results = list(executor.map(lambda row: self._fetch_detail(row, form_state), rows))
+        records = [record for status, record in results if status == 'ok']
+        stats['skipped_rows'] += sum(status == 'skipped' for status, _ in results)
+        stats['records'] += self.store.bulk_upsert(records)
+        return [row for row, (status, _) in zip(rows, results) if status == 'failed']
+
+    def _retry_failed(self, executor: ThreadPoolExecutor, pending: List[Dict[str, Any]],
+                      stats: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """重試檢查點中失敗的詳情頁（使用原列表頁的表單狀態），回傳仍然失敗的部分"""
+        remaining = []
+        for group in pending:
+            failed = self._fetch_rows(executor, group['rows'], group['form_state'], stats)
+            stats['retried_details'] += len(group['rows'])
+            if failed:
+                remaining.append({'form_state': group['form_state'], 'rows': failed})
+        return remaining
+
+    def run(self, max_pages: Optional[int] = None, since: Optional[str] = None,
+            restart: bool = False) -> Dict[str, Any]:
+        checkpoint = None if restart else load_checkpoint(self.checkpoint_path)
+        stats = {'pages': 0, 'records': 0, 'failed_details': 0, 'skipped_rows': 0,
+                 'retried_details': 0, 'resumed_from_page': None}
+        pending = (checkpoint or {}).get('failed', [])
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='mnd-backfill') as executor:
+            if pending:
+                logging.info(f"重試檢查點中 {sum(len(group['rows']) for group in pending)} 筆失敗的詳情頁")
+                pending = self._retry_failed(executor, pending, stats)
+
+            if checkpoint and checkpoint.get('finished'):
+                stats['failed_details'] = sum(len(group['rows']) for group in pending)
+                save_checkpoint(self.checkpoint_path, dict(checkpoint, failed=pending))
+                logging.info("檢查點顯示已完成回補，使用 --restart 重新執行")
+                return stats
+
+            page_html = None
+            page_number = 1
+            if checkpoint and checkpoint.get('next_page'):
+                page_number = checkpoint['next_page']
+                stats['resumed_from_page'] = page_number
+                logging.info(f"從檢查點繼續：第 {page_number} 頁")
+                try:
+                    page_html = self._request(self.session, 'POST', postback_data(
+                        checkpoint['form_state'], checkpoint['next_target'], checkpoint['next_argument']
+                    ))
+                except requests.RequestException as e:
+                    logging.warning(f"無法以檢查點狀態繼續 ({e})，從第 1 頁重新開始")
+                    page_number = 1
+
+            if page_html is None:
+                page_html = self._request(self.session, 'GET')
+
+            while True:
+                soup = BeautifulSoup(page_html, 'html.parser')
+                form_state = extract_form_state(soup)
+                if not form_state:
+                    raise RuntimeError(f"第 {page_number} 頁缺少 ASP.NET 表單欄位，頁面結構可能已變更")
+
+                rows = parse_listing_rows(soup)
+                failed = self._fetch_rows(executor, rows, form_state, stats)
+                if failed:
+                    pending.append({'form_state': form_state, 'rows': failed})
+                stats['pages'] += 1
+                logging.info(f"第 {page_number} 頁完成：{len(rows) - len(failed)}/{len(rows)} 筆")
+
+                next_link = find_page_link(soup, page_number + 1)
+                reached_since = since and rows and min(row['date'] for row in rows) < since
+                reached_max = max_pages and stats['pages'] >= max_pages
+                save_checkpoint(self.checkpoint_path, {
+                    'completed_page': page_number,
+                    'next_page': page_number + 1 if next_link and not reached_since else None,
+                    'next_target': next_link[0] if next_link else None,
+                    'next_argument': next_link[1] if next_link else None,
+                    'form_state': form_state,
+                    'finished': not next_link or bool(reached_since),
+                    'failed': pending
+                })
+
+                if not next_link or reached_since or reached_max:
+                    break
+
+                page_number += 1
+                page_html = self._request(self.session, 'POST', postback_data(form_state, *next_link))
+
+        stats['failed_details'] = sum(len(group['rows']) for group in pending)
+        return stats
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='國防部擾台資料歷史回補')
+    parser.add_argument('--max-pages', type=int, help='本次最多處理的頁數')
+    parser.add_argument('--since', help='抓到早於此日期 (YYYY-MM-DD) 的資料後停止')
+    parser.add_argument('--concurrency', type=int, default=4, help='詳情頁並行請求數')
+    parser.add_argument('--min-interval', type=float, default=1.0, help='任兩個請求間的最小間隔（秒）')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH, help='檢查點檔案路徑')
+    parser.add_argument('--db', help='SQLite 資料庫路徑（預設 data/incursions.db）')
+    parser.add_argument('--restart', action='store_true', help='忽略檢查點從第一頁開始')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    store = IncursionStore(args.db)
+    try:
+        backfill = MndBackfill(store, args.checkpoint, args.concurrency, args.min_interval)
+        stats = backfill.run(max_pages=args.max_pages, since=args.since, restart=args.restart)
+        stats['total_days_stored'] = store.count()
+        print(json.dumps(stats, indent=2, ensure_ascii=False))
+    finally:
+        store.close()
+
+if __name__ == '__main__':
+    main()
@@ -1,106 +1,132 @@
-import requests
+import os
 from bs4 import BeautifulSoup, Tag
 from urllib.parse import quote_plus, urljoin
 import random
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
-# Google News 基礎 URL
-GOOGLE_NEWS_URL = "https://news.google.com"
+from scraper.http_cache import fetch_and_parse
+from utils.keyword_matcher import threat_matcher
+from utils.sampling_profiler import propagate
+
+# Google News 基礎 URL（可由環境變數覆寫）
+GOOGLE_NEWS_URL = os.getenv("GOOGLE_NEWS_URL", "https://news.google.com")
+
+# 預設的各類別搜尋關鍵字（限制搜尋數量避免超時）
+DEFAULT_NEWS_KEYWORDS = {
+    "economic_news": ["中國經濟", "中美貿易"],
+    "diplomatic_news": ["中國外交", "兩岸關係"],
+    "public_opinion_news": ["中國輿情", "兩岸民意"]
+}
+
+def _parse_news_results(html: str) -> List[Dict[str, str]]:
+    """解析 Google 新聞搜尋結果頁"""
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    articles: List[Dict[str, str]] = []
+    # Google News 的 HTML 結構可能會變，此選擇器相對穩定
+    for article_div in soup.find_all('div', {'class': 'SoaBEf'}, limit=8):
+        if not isinstance(article_div, Tag):
+            continue
+
+        link_tag = article_div.find('a', href=True)
+        title_tag = article_div.find('div', attrs={'role': 'heading'})
+        time_tag = article_div.find('time')
+        snippet_tag = article_div.find('div', class_='GI74Re')
+        
+        # 抓取來源資訊
+        source_tag = article_div.find('div', attrs={'data-n-tid': lambda x: x and 'source' in x})
+        
+        if link_tag and title_tag:
+            # Google News 的連結需要處理
+            href = link_tag.get('href', '')
+            if href.startswith('./'):
+                href = href[2:]  # 移除 './'
+            full_url = urljoin(GOOGLE_NEWS_URL, href)
+            
+            article = {
+                'title': title_tag.get_text(strip=True),
+                'url': full_url,
+                'published_date': time_tag.get('datetime', '') if time_tag else '',
+                'source': source_tag.get_text(strip=True) if source_tag else '未知來源',
+                'snippet': snippet_tag.get_text(strip=True) if snippet_tag else ''
+            }
+            articles.append(article)
+
+    return articles
 
 def _search_google_news(query: str) -> List[Dict[str, str]]:
-    """輔助函式，用於搜尋特定關鍵字的 Google 新聞"""
+    """輔助函式，用於搜尋特定關鍵字的 Google 新聞（未變更的結果頁不會重新解析）"""
     formatted_query = quote_plus(query)
     search_url = f"{GOOGLE_NEWS_URL}/search?q={formatted_query}&hl=zh-TW&gl=TW&ceid=TW:zh-Hant"
     
     try:
-        response = requests.get(search_url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        articles: List[Dict[str, str]] = []
-        # Google News 的 HTML 結構可能會變，此選擇器相對穩定
-        for article_div in soup.find_all('div', {'class': 'SoaBEf'}, limit=8):
-            if not isinstance(article_div, Tag):
-                continue
-
-            link_tag = article_div.find('a', href=True)
-            title_tag = article_div.find('div', attrs={'role': 'heading'})
-            time_tag = article_div.find('time')
-            
-            # 抓取來源資訊
-            source_tag = article_div.find('div', attrs={'data-n-tid': lambda x: x and 'source' in x})
-            
-            if link_tag and title_tag:
-                # Google News 的連結需要處理
-                href = link_tag.get('href', '')
-                if href.startswith('./'):
-                    href = href[2:]  # 移除 './'
-                full_url = urljoin(GOOGLE_NEWS_URL, href)
-                
-                article = {
-                    'title': title_tag.get_text(strip=True),
-                    'url': full_url,
-                    'published_date': time_tag.get('datetime', '') if time_tag else '',
-                    'source': source_tag.get_text(strip=True) if source_tag else '未知來源'
-                }
-                articles.append(article)
-
-        return articles
+        return fetch_and_parse(
+            search_url, _parse_news_results, archive_source='google_news',
+            headers={'User-Agent': 'Mozilla/5.0'}, timeout=15
+        )
 
     except Exception as e:
         logging.warning(f"搜尋 Google 新聞時發生錯誤 (查詢: {query}): {e}")
         return []
 
-def scrape_news_data() -> Dict[str, Any]:
+def fetch_news_results(queries: Iterable[str], max_workers: int = 4) -> Dict[str, List[Dict[str, str]]]:
+    """並行搜尋多個關鍵字，重複的關鍵字只會搜尋一次"""
+    distinct = list(dict.fromkeys(queries))
+    if not distinct:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(distinct))) as executor:
+        return dict(zip(distinct, executor.map(propagate(_search_google_news), distinct)))
+
+def assemble_news_data(category_keywords: Dict[str, List[str]],
+                       results: Dict[str, List[Dict[str, str]]]) -> Dict[str, Any]:
+    """依各類別的關鍵字，從已抓取的搜尋結果組合新聞資料"""
+    categories = {
+        category: [article for keyword in keywords for article in results.get(keyword, [])]
+        for category, keywords in category_keywords.items()
+    }
+    economic_news = categories.get("economic_news", [])
+    diplomatic_news = categories.get("diplomatic_news", [])
+    public_opinion_news = categories.get("public_opinion_news", [])
+    
+    # 收集所有來源
+    all_articles = economic_news + diplomatic_news + public_opinion_news
+    sources = list(set([article['source'] for article in all_articles if article['source']]))
+    
+    # 如果沒有抓到新聞，提供備用資料
+    if not all_articles:
+        logging.warning("無法從 Google 新聞抓取到任何文章，使用備用資料")
+        return _get_fallback_news_data()
+
+    # 以標題與摘要統計威脅詞條（同一篇文章被多個關鍵字搜到時只計一次）
+    unique_articles = {article['url']: article for article in all_articles}.values()
+    keyword_hits = threat_matcher().scan_many(
+        text for article in unique_articles for text in (article['title'], article.get('snippet'))
+    )
+    
+    return {
+        "economic_news": economic_news[:5],  # 限制數量
+        "diplomatic_news": diplomatic_news[:5],
+        "public_opinion_news": public_opinion_news[:5],
+        "sources": sources[:10],  # 限制來源數量
+        "total_articles": len(all_articles),
+        "keyword_hits": keyword_hits
+    }
+
+def scrape_news_data(category_keywords: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
     """
     從 Google 新聞抓取與中國相關的新聞資料
     """
     print("正在從 Google 新聞抓取相關新聞...")
 
     try:
-        # 定義搜尋關鍵字
-        economic_keywords = ["中國經濟", "中美貿易", "台海經濟", "兩岸貿易"]
-        diplomatic_keywords = ["中國外交", "兩岸關係", "台海情勢", "中美關係"]
-        opinion_keywords = ["中國輿情", "兩岸民意", "台海局勢", "中國社會"]
-        
-        economic_news = []
-        diplomatic_news = []
-        public_opinion_news = []
-        sources = []
-        
-        # 搜尋經濟相關新聞
-        for keyword in economic_keywords[:2]:  # 限制搜尋數量避免超時
-            articles = _search_google_news(keyword)
-            economic_news.extend(articles)
-            
-        # 搜尋外交相關新聞
-        for keyword in diplomatic_keywords[:2]:
-            articles = _search_google_news(keyword)
-            diplomatic_news.extend(articles)
-            
-        # 搜尋輿情相關新聞
-        for keyword in opinion_keywords[:2]:
-            articles = _search_google_news(keyword)
-            public_opinion_news.extend(articles)
-        
-        # 收集所有來源
-        all_articles = economic_news + diplomatic_news + public_opinion_news
-        sources = list(set([article['source'] for article in all_articles if article['source']]))
-        
-        # 如果沒有抓到新聞，提供備用資料
-        if not all_articles:
-            logging.warning("無法從 Google 新聞抓取到任何文章，使用備用資料")
-            return _get_fallback_news_data()
-        
-        return {
-            "economic_news": economic_news[:5],  # 限制數量
-            "diplomatic_news": diplomatic_news[:5],
-            "public_opinion_news": public_opinion_news[:5],
-            "sources": sources[:10],  # 限制來源數量
-            "total_articles": len(all_articles)
-        }
+        category_keywords = category_keywords or DEFAULT_NEWS_KEYWORDS
+        results = fetch_news_results(
+            keyword for keywords in category_keywords.values() for keyword in keywords
+        )
+        return assemble_news_data(category_keywords, results)
         
     except Exception as e:
         logging.error(f"抓取新聞資料時發生錯誤: {e}")
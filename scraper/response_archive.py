@@ -0,0 +1,291 @@
+"""
+上游原始回應封存
+
+每個下載到的上游回應（內容與請求中繼資料）都以 zlib 壓縮後附加寫入區段檔（segment），
+並在 SQLite 索引中記錄來源、時間與在區段檔中的位置。區段檔只會附加、不會改寫，
+每個程序各自寫入自己的區段檔，多個 gunicorn worker 之間不需要協調。
+
+區段檔格式：連續的 [4 bytes 長度（big-endian）][zlib(中繼資料 JSON + "\\n" + 原始內容)]，
+即使索引遺失也能從區段檔本身重建。
+
+設定：RAW_ARCHIVE=0 關閉封存；RAW_ARCHIVE_DIR 指定目錄（預設 data/raw_archive）；
+RAW_ARCHIVE_MAX_MB 為區段檔總大小上限（預設 1024），RAW_ARCHIVE_MAX_DAYS 為保留天數（預設 0，不限）。
+換新區段檔時會刪除超過上限的最舊區段檔及其索引。
+
+封存範圍：國防部列表/詳情頁、Google 新聞與 Yahoo Finance 日線報價。日內K線可隨時向 Yahoo 重新查詢歷史，
+OpenAI 回應是產生的報告而非上游資料、沒有解析器可重跑，兩者都不封存。
+"""
+import os
+import json
+import zlib
+import time
+import struct
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+ARCHIVE_ENABLED = os.getenv('RAW_ARCHIVE', '1') == '1'
+ARCHIVE_DIR = os.getenv('RAW_ARCHIVE_DIR', 'data/raw_archive')
+
+# 區段檔超過此大小即換新檔
+SEGMENT_MAX_BYTES = int(os.getenv('RAW_ARCHIVE_SEGMENT_MB', '64')) * 1024 * 1024
+# 保留上限：區段檔總大小與天數（0 表示不限）
+ARCHIVE_MAX_BYTES = int(os.getenv('RAW_ARCHIVE_MAX_MB', '1024')) * 1024 * 1024
+ARCHIVE_MAX_DAYS = float(os.getenv('RAW_ARCHIVE_MAX_DAYS', '0'))
+COMPRESSION_LEVEL = 6
+
+_FRAME_HEADER = struct.Struct('>I')
+
+# 封存的回應標頭（其餘標頭對重新解析沒有幫助）
+ARCHIVED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Date', 'Content-Encoding')
+
+class ArchiveRecord:
+    """從區段檔讀回的單筆回應"""
+    __slots__ = ('record_id', 'source', 'url', 'fetched_at', 'metadata', 'content')
+
+    def __init__(self, record_id: int, source: str, url: str, fetched_at: str,
+                 metadata: Dict[str, Any], content: bytes):
+        self.record_id = record_id
+        self.source = source
+        self.url = url
+        self.fetched_at = fetched_at
+        self.metadata = metadata
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        """與 requests 的 response.text 相同的解碼方式"""
+        return self.content.decode(self.metadata.get('encoding') or 'utf-8', errors='replace')
+
+def encode_frame(metadata: Dict[str, Any], content: bytes) -> bytes:
+    payload = zlib.compress(
+        json.dumps(metadata, ensure_ascii=False).encode('utf-8') + b'\n' + content, COMPRESSION_LEVEL
+    )
+    return _FRAME_HEADER.pack(len(payload)) + payload
+
+def decode_frame(frame: bytes) -> Tuple[Dict[str, Any], bytes]:
+    """frame 不含長度前綴"""
+    raw = zlib.decompress(frame)
+    header, _, content = raw.partition(b'\n')
+    return json.loads(header), content
+
+def iter_segment(path: Path) -> Iterator[Tuple[int, int, Dict[str, Any], bytes]]:
+    """依序讀出區段檔中的每筆 (offset, length, 中繼資料, 內容)；結尾不完整的資料會被略過"""
+    with open(path, 'rb') as f:
+        while True:
+            offset = f.tell()
+            header = f.read(_FRAME_HEADER.size)
+            if len(header) < _FRAME_HEADER.size:
+                return
+            (length,) = _FRAME_HEADER.unpack(header)
+            frame = f.read(length)
+            if len(frame) < length:
+                return
+            metadata, content = decode_frame(frame)
+            yield offset + _FRAME_HEADER.size, length, metadata, content
+
+class ResponseArchive:
+    """附加寫入的壓縮區段檔與 SQLite 索引"""
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = ARCHIVE_MAX_BYTES,
+                 max_days: float = ARCHIVE_MAX_DAYS):
+        self.root = Path(root or ARCHIVE_DIR)
+        self.max_bytes = max_bytes
+        self.max_days = max_days
+        self.segment_dir = self.root / 'segments'
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / 'index.db'), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                url TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                segment TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_source_time ON responses (source, fetched_at)")
+        self._conn.commit()
+        self._segment: Optional[Path] = None
+        self._segment_seq = 0
+
+    def _current_segment(self) -> Path:
+        """每個程序各自的區段檔，超過大小上限（或已被其他程序的保留機制刪除）時換新檔"""
+        segment = self._segment
+        try:
+            rotate = segment is None or segment.stat().st_size >= SEGMENT_MAX_BYTES
+        except FileNotFoundError:
+            rotate = True
+        if rotate:
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+            self._segment_seq += 1
+            segment = self.segment_dir / f"{stamp}-{os.getpid()}-{self._segment_seq:04d}.seg"
+            segment.touch()
+            self._segment = segment
+            self._prune_locked()
+        return segment
+
+    def prune(self) -> List[str]:
+        """依保留上限刪除最舊的區段檔與索引，回傳刪除的區段檔名稱"""
+        with self._lock:
+            return self._prune_locked()
+
+    def _prune_locked(self) -> List[str]:
+        cutoff = time.time() - self.max_days * 86400 if self.max_days else None
+        segments = []
+        for path in sorted(self.segment_dir.glob('*.seg')):  # 檔名以建立時間開頭，由舊到新
+            try:
+                segments.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        total = sum(stat.st_size for _, stat in segments)
+
+        removed = []
+        for path, stat in segments:
+            if path == self._segment:
+                continue
+            over_size = self.max_bytes and total > self.max_bytes
+            expired = cutoff is not None and stat.st_mtime < cutoff
+            if not over_size and not expired:
+                continue
+            try:
+                # 先刪索引再刪檔案，查詢不會拿到指向不存在檔案的位置
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE segment = ?", (path.name,))
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except (OSError, sqlite3.Error) as e:
+                logging.warning(f"刪除過期封存區段 {path.name} 失敗: {e}")
+                continue
+            total -= stat.st_size
+            removed.append(path.name)
+        if removed:
+            logging.info(f"原始回應封存超過保留上限，已刪除 {len(removed)} 個區段檔")
+        return removed
+
+    def append(self, source: str, url: str, content: bytes, *, status: int, digest: str,
+               metadata: Optional[Dict[str, Any]] = None) -> int:
+        """寫入一筆回應並回傳索引 ID"""
+        fetched_at = datetime.now().isoformat()
+        record_meta = dict(metadata or {})
+        record_meta.update(source=source, url=url, fetched_at=fetched_at, status=status, digest=digest)
+        frame = encode_frame(record_meta, content)
+
+        with self._lock:
+            segment = self._current_segment()
+            with open(segment, 'ab') as f:
+                offset = f.tell()
+                f.write(frame)
+            with self._conn:
+                cursor = self._conn.execute(
+                    "INSERT INTO responses (source, url, fetched_at, status, digest, segment, offset, length) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (source, url, fetched_at, status, digest, segment.name,
+                     offset + _FRAME_HEADER.size, len(frame) - _FRAME_HEADER.size)
+                )
+            return cursor.lastrowid
+
+    def query(self, source: Optional[str] = None, since: Optional[str] = None,
+              until: Optional[str] = None, successful_only: bool = False) -> List[Tuple]:
+        """
+        依來源與時間區間（ISO 格式，含端點）查詢索引，successful_only 時排除 HTTP 錯誤回應，
+        回傳 (id, source, url, fetched_at, segment, offset, length)，依區段檔與位置排序以利循序讀取
+        """
+        clauses, params = [], []
+        if successful_only:
+            clauses.append("status < 400")
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if since:
+            clauses.append("fetched_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("fetched_at <= ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT id, source, url, fetched_at, segment, offset, length FROM responses {where} "
+                "ORDER BY segment, offset",
+                params
+            ).fetchall()
+
+    def sources(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT source, COUNT(*) FROM responses GROUP BY source"))
+
+    def close(self) -> None:
+        self._conn.close()
+
+def read_record(segment_dir: Path, row: Tuple) -> ArchiveRecord:
+    """依索引列讀出單筆回應；只需要區段檔，適合在子程序中執行"""
+    record_id, source, url, fetched_at, segment, offset, length = row
+    with open(Path(segment_dir) / segment, 'rb') as f:
+        f.seek(offset)
+        metadata, content = decode_frame(f.read(length))
+    return ArchiveRecord(record_id, source, url, fetched_at, metadata, content)
+
+_archive: Optional[ResponseArchive] = None
+_archive_pid: Optional[int] = None
+_archive_lock = threading.Lock()
+_archive_failed = False
+
+def get_archive() -> Optional[ResponseArchive]:
+    """
+    程序內共用的封存；關閉或無法寫入（例如唯讀檔案系統）時回傳 None。
+    fork 後的子程序（gunicorn preload）會重新開啟，不共用父程序的區段檔與資料庫連線。
+    """
+    global _archive, _archive_pid, _archive_failed
+    if not ARCHIVE_ENABLED or _archive_failed:
+        return None
+    if _archive is None or _archive_pid != os.getpid():
+        with _archive_lock:
+            if (_archive is None or _archive_pid != os.getpid()) and not _archive_failed:
+                try:
+                    _archive = ResponseArchive()
+                    _archive_pid = os.getpid()
+                except (OSError, sqlite3.Error) as e:
+                    _archive_failed = True
+                    logging.warning(f"無法建立原始回應封存，已停用: {e}")
+    return _archive
+
+def _request_metadata(method: str, cache_key: str, request_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """請求中繼資料；過長的表單欄位（例如 __VIEWSTATE）只記錄長度"""
+    metadata: Dict[str, Any] = {'method': method, 'cache_key': cache_key}
+    for field in ('params', 'data'):
+        values = request_kwargs.get(field)
+        if isinstance(values, dict):
+            metadata[field] = {
+                name: value if not isinstance(value, str) or len(value) <= 256 else f"<{len(value)} chars>"
+                for name, value in values.items()
+            }
+    return metadata
+
+def archive_response(source: str, response: Any, digest: str, method: str = 'GET',
+                     cache_key: str = '', request_kwargs: Optional[Dict[str, Any]] = None) -> None:
+    """封存 requests 回應；任何錯誤只記錄警告，不影響爬蟲"""
+    archive = get_archive()
+    if archive is None:
+        return
+    metadata = _request_metadata(method, cache_key, request_kwargs or {})
+    metadata['encoding'] = response.encoding or response.apparent_encoding
+    metadata['headers'] = {name: response.headers[name] for name in ARCHIVED_HEADERS if name in response.headers}
+    metadata['elapsed_ms'] = round(response.elapsed.total_seconds() * 1000, 1) if response.elapsed else None
+    try:
+        archive.append(source, response.url, response.content, status=response.status_code,
+                       digest=digest, metadata=metadata)
+    except (OSError, sqlite3.Error) as e:
+        logging.warning(f"封存上游回應失敗 ({source} {response.url}): {e}")
@@ -0,0 +1,57 @@
+"""
+Yahoo Finance 圖表 API 的日線報價
+
+黃金與小麥共用同一個解析器；請求經由 fetch_and_parse，內容未變時沿用上次的解析結果，
+新內容則先封存原始 JSON（yahoo_gold / yahoo_food），供日後離線重新解析。
+"""
+import json
+from typing import Dict, Optional
+
+from scraper.http_cache import fetch_and_parse
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+def parse_daily_quote(text: str) -> Optional[Dict[str, float]]:
+    """
+    解析圖表 API 的日線收盤價，回傳最新價、前收與日/週變化；沒有有效價格時回傳 None。
+    結果會被快取共用，不含抓取時間等每次不同的欄位。
+    """
+    data = json.loads(text)
+    results = (data.get('chart') or {}).get('result')
+    if not results:
+        return None
+    prices = results[0]['indicators']['quote'][0]['close']
+
+    # 過濾掉 None 值
+    valid_prices = [p for p in prices if p is not None]
+    if not valid_prices:
+        return None
+
+    current_price = valid_prices[-1]
+    previous_close = valid_prices[-2] if len(valid_prices) > 1 else current_price
+
+    # 計算日變化
+    change = current_price - previous_close
+    change_percent = (change / previous_close) * 100 if previous_close != 0 else 0
+
+    # 計算區間內的價格變化
+    week_change = current_price - valid_prices[0]
+    week_change_percent = (week_change / valid_prices[0]) * 100 if valid_prices[0] != 0 else 0
+
+    return {
+        "price": round(current_price, 2),
+        "previous_close": round(previous_close, 2),
+        "daily_change": round(change, 2),
+        "daily_change_percent": round(change_percent, 2),
+        "week_change": round(week_change, 2),
+        "week_change_percent": round(week_change_percent, 2)
+    }
+
+def fetch_daily_quote(chart_url: str, archive_source: str) -> Optional[Dict[str, float]]:
+    """抓取最近 7 天的日線報價；HTTP 錯誤時拋出 requests 例外"""
+    return fetch_and_parse(
+        chart_url, parse_daily_quote, archive_source=archive_source,
+        headers=HEADERS, params={'interval': '1d', 'range': '7d'}, timeout=15
+    )
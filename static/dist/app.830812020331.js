@@ -0,0 +1,123 @@
+document.addEventListener('DOMContentLoaded',function(){const analyzeButton=document.getElementById('analyze-button');const loadingDiv=document.getElementById('loading');const loadingPhase=document.getElementById('loading-phase');const progressFill=document.getElementById('progress-fill');const threatIndicators=document.getElementById('threat-indicators');const threatLevel=document.getElementById('threat-level');const analysisSection=document.getElementById('analysis-section');const dataSection=document.getElementById('data-section');let currentTaskId=null;let progress=0;const DASHBOARD_SYNC_INTERVAL=60000;let dashboardEpoch='';let dashboardVersion=0;const sectionValues={};const renderedSections={};const sectionRenderers={'indicators.military':[value=>displayIndicator('military',value),threatIndicators,()=>clearElements('military-indicator','military-details')],'indicators.economic':[value=>displayIndicator('economic',value),threatIndicators,()=>clearElements('economic-indicator','economic-details')],'indicators.news':[value=>displayIndicator('news',value),threatIndicators,()=>clearElements('news-indicator','news-details')],'threat_level':[displayThreatLevel,threatLevel,()=>clearElements('threat-value','threat-description')],'report':[displayAiReport,analysisSection,()=>clearElements('report-content')],'source.military':[displayMilitaryData,dataSection,()=>clearElements('military-data')],'source.gold':[displayEconomicData,dataSection,displayEconomicData],'source.food':[displayEconomicData,dataSection,displayEconomicData],'source.news':[displayNewsData,dataSection,()=>clearElements('news-data')]};analyzeButton.addEventListener('click',function(){startAnalysis();});syncDashboard();setInterval(syncDashboard,DASHBOARD_SYNC_INTERVAL);function startAnalysis(){hideAllSections();showLoading();analyzeButton.disabled=true;analyzeButton.textContent='分析中...';fetch('/analyze',{method:'POST',headers:{'Content-Type':'application/json'}}).then(response=>response.json()).then(data=>{if(data.task_id){currentTaskId=data.task_id;startProgressUpdates();}else{showError('無法啟動分析任務');}}).catch(error=>{console.error('Error:',error);showError('連接錯誤，請稍後再試');});}
+function startProgressUpdates(){const interval=setInterval(()=>{if(!currentTaskId){clearInterval(interval);return;}
+fetch(`/get_report/${currentTaskId}`).then(response=>response.json()).then(data=>{updateProgress(data);if(data.status==='completed'){clearInterval(interval);currentTaskId=null;showResults(data);}else if(data.status==='failed'){clearInterval(interval);currentTaskId=null;showError(data.report||'分析失敗');}}).catch(error=>{console.error('Error polling:',error);});},2000);}
+function updateProgress(data){if(data.phase==='indicators'){loadingPhase.textContent='正在收集威脅情報...';progress=30;}else if(data.phase==='report'){loadingPhase.textContent='正在生成 AI 分析報告...';progress=70;}
+progressFill.style.width=progress+'%';}
+function showResults(data){hideLoading();applySections(sectionsFromTask(data));analyzeButton.disabled=false;analyzeButton.textContent='啟動威脅掃描';}
+function syncDashboard(){if(currentTaskId){return;}
+fetch(`/dashboard?since=${dashboardVersion}&epoch=${dashboardEpoch}`).then(response=>response.json()).then(patch=>{dashboardEpoch=patch.epoch;dashboardVersion=patch.version;applySections(patch.sections,patch.full);}).catch(error=>{console.error('Error syncing dashboard:',error);});}
+function sectionsFromTask(data){const sections={};if(data.indicators){['military','economic','news'].forEach(name=>{sections[`indicators.${name}`]=data.indicators[name];});}
+if(data.threat_level!==undefined){const distribution=data.threat_distribution||{};sections['threat_level']={level:data.threat_level,percentiles:distribution.percentiles||null};}
+if(data.report){sections['report']={zh:data.report,en:data.report_en||null,pdf:data.report_pdf||null};}
+const rawData=data.raw_data||{};if(rawData.military){sections['source.military']={total_incursions_last_week:rawData.military.total_incursions_last_week||0,latest_aircrafts:rawData.military.latest_aircrafts||0,latest_ships:rawData.military.latest_ships||0,error:rawData.military.error||null};}
+if(rawData.gold){sections['source.gold']={current_price:rawData.gold.current_price??null,daily_change_percent:rawData.gold.daily_change_percent||0,error:rawData.gold.error||null};}
+if(rawData.food){sections['source.food']={wheat_price:rawData.food.wheat_price??null,daily_change_percent:rawData.food.daily_change_percent||0,error:rawData.food.error||null};}
+if(rawData.news){sections['source.news']={economic_news:rawData.news.economic_news?.length||0,diplomatic_news:rawData.news.diplomatic_news?.length||0,public_opinion_news:rawData.news.public_opinion_news?.length||0,total_articles:rawData.news.total_articles||0,error:rawData.news.error||null};}
+return sections;}
+function applySections(sections,full=false){sections=sections||{};if(full){Object.keys(sectionValues).filter(name=>!(name in sections)).forEach(removeSection);}
+Object.entries(sections).forEach(([name,value])=>{const entry=sectionRenderers[name];if(!entry){return;}
+const[render,container]=entry;const encoded=JSON.stringify(value);sectionValues[name]=value;if(renderedSections[name]!==encoded){renderedSections[name]=encoded;render(value);}
+container.style.display='block';});}
+function removeSection(name){const[,container,clear]=sectionRenderers[name];delete sectionValues[name];delete renderedSections[name];clear();const containerInUse=Object.keys(sectionValues).some(other=>sectionRenderers[other][1]===container);if(!containerInUse){container.style.display='none';}}
+function clearElements(...ids){ids.forEach(id=>{document.getElementById(id).textContent='';});}
+function displayIndicator(name,score){document.getElementById(`${name}-indicator`).textContent=score+'/100';document.getElementById(`${name}-details`).textContent=getThreatDescription(score);}
+function displayThreatLevel(section){document.getElementById('threat-value').textContent=section.level+'%';let description=getOverallThreatDescription(section.level);if(section.percentiles){description+=`（90% 區間 ${section.percentiles.p5}% – ${section.percentiles.p95}%）`;}
+document.getElementById('threat-description').textContent=description;}
+function displayAiReport(section){const reportHtml=[formatReport(section.zh)];if(section.en){reportHtml.push(`<details class="report-en"><summary>English Report</summary>${formatReport(section.en)}</details>`);}
+if(section.pdf){reportHtml.push(`<p class="report-download"><a href="${section.pdf}">下載雙語 PDF 報告</a></p>`);}
+document.getElementById('report-content').innerHTML=reportHtml.join('');}
+function displayMilitaryData(military){document.getElementById('military-data').innerHTML=`
+            <p><strong>過去一週擾台次數：</strong>${military.total_incursions_last_week || 0} 次</p>
+            <p><strong>最新共機：</strong>${military.latest_aircrafts || 0} 架次</p>
+            <p><strong>最新共艦：</strong>${military.latest_ships || 0} 艘次</p>
+        `;}
+function displayEconomicData(){const economicHtml=[];const gold=sectionValues['source.gold'];const food=sectionValues['source.food'];if(gold){economicHtml.push(`<p><strong>黃金價格：</strong>$${gold.current_price || 'N/A'}/oz</p>`);economicHtml.push(`<p><strong>日變動：</strong>${gold.daily_change_percent || 0}%</p>`);}
+if(food){economicHtml.push(`<p><strong>小麥價格：</strong>$${food.wheat_price || 'N/A'}/蒲式耳</p>`);economicHtml.push(`<p><strong>日變動：</strong>${food.daily_change_percent || 0}%</p>`);}
+document.getElementById('economic-data').innerHTML=economicHtml.join('');}
+function displayNewsData(news){document.getElementById('news-data').innerHTML=`
+            <p><strong>總新聞數：</strong>${news.total_articles || 0} 篇</p>
+            <p><strong>經濟新聞：</strong>${news.economic_news || 0} 篇</p>
+            <p><strong>外交新聞：</strong>${news.diplomatic_news || 0} 篇</p>
+            <p><strong>輿情新聞：</strong>${news.public_opinion_news || 0} 篇</p>
+        `;}
+function getThreatDescription(score){if(score>=80)return'極高威脅';if(score>=60)return'高威脅';if(score>=40)return'中等威脅';if(score>=20)return'低威脅';return'極低威脅';}
+function getOverallThreatDescription(level){if(level>=80)return'情勢高度緊張，需要密切關注';if(level>=60)return'情勢較為緊張，保持警戒';if(level>=40)return'情勢穩定，持續監控';if(level>=20)return'情勢相對穩定';return'情勢平靜';}
+function formatReport(report){return report.replace(/\n/g,'<br>').replace(/【([^】]+)】/g,'<h3>$1</h3>');}
+function hideAllSections(){threatIndicators.style.display='none';threatLevel.style.display='none';analysisSection.style.display='none';dataSection.style.display='none';}
+function showLoading(){loadingDiv.style.display='block';progress=10;progressFill.style.width=progress+'%';loadingPhase.textContent='初始化威脅掃描...';}
+function hideLoading(){loadingDiv.style.display='none';}
+function showError(message){hideLoading();alert('錯誤：'+message);analyzeButton.disabled=false;analyzeButton.textContent='啟動威脅掃描';}});;
+document.addEventListener('DOMContentLoaded',function(){function createScanLines(){const scanLine=document.createElement('div');scanLine.className='scan-line';scanLine.style.cssText=`
+            position: fixed;
+            top: 0;
+            left: 0;
+            width: 100%;
+            height: 2px;
+            background: linear-gradient(90deg, transparent, #00ffff, transparent);
+            z-index: 9999;
+            pointer-events: none;
+            animation: scan 3s linear infinite;
+        `;const style=document.createElement('style');style.textContent=`
+            @keyframes scan {
+                0% { transform: translateY(-2px); opacity: 0; }
+                10% { opacity: 1; }
+                90% { opacity: 1; }
+                100% { transform: translateY(100vh); opacity: 0; }
+            }
+        `;document.head.appendChild(style);document.body.appendChild(scanLine);setTimeout(createScanLines,5000);}
+setTimeout(createScanLines,2000);let mouseGlow=null;function createMouseGlow(){mouseGlow=document.createElement('div');mouseGlow.style.cssText=`
+            position: fixed;
+            width: 200px;
+            height: 200px;
+            background: radial-gradient(circle, rgba(0, 255, 255, 0.1) 0%, transparent 70%);
+            border-radius: 50%;
+            pointer-events: none;
+            z-index: 9998;
+            transition: all 0.1s ease;
+        `;document.body.appendChild(mouseGlow);}
+createMouseGlow();document.addEventListener('mousemove',function(e){if(mouseGlow){mouseGlow.style.left=(e.clientX-100)+'px';mouseGlow.style.top=(e.clientY-100)+'px';}});function animateNumber(element,start,end,duration=1000){const startTime=performance.now();function update(currentTime){const elapsed=currentTime-startTime;const progress=Math.min(elapsed/duration,1);const current=Math.floor(start+(end-start)*progress);element.textContent=current+(element.textContent.includes('%')?'%':'');if(progress<1){requestAnimationFrame(update);}}
+requestAnimationFrame(update);}
+function enhanceDataCards(){const dataCards=document.querySelectorAll('.data-card');dataCards.forEach((card,index)=>{card.style.animationDelay=(index*0.1)+'s';card.classList.add('cyber-fade-in');});}
+const cyberStyle=document.createElement('style');cyberStyle.textContent=`
+        .cyber-fade-in {
+            animation: cyberFadeIn 0.8s ease-out forwards;
+            opacity: 0;
+            transform: translateY(30px);
+        }
+        
+        @keyframes cyberFadeIn {
+            to {
+                opacity: 1;
+                transform: translateY(0);
+            }
+        }
+        
+        .glitch-text {
+            animation: glitch 2s infinite;
+        }
+        
+        @keyframes glitch {
+            0%, 100% { transform: translate(0); }
+            20% { transform: translate(-1px, 1px); }
+            40% { transform: translate(-1px, -1px); }
+            60% { transform: translate(1px, 1px); }
+            80% { transform: translate(1px, -1px); }
+        }
+        
+        .neon-pulse {
+            animation: neonPulse 2s ease-in-out infinite alternate;
+        }
+        
+        @keyframes neonPulse {
+            from { text-shadow: 0 0 10px currentColor, 0 0 20px currentColor; }
+            to { text-shadow: 0 0 20px currentColor, 0 0 30px currentColor, 0 0 40px currentColor; }
+        }
+    `;document.head.appendChild(cyberStyle);const observer=new MutationObserver(function(mutations){mutations.forEach(function(mutation){if(mutation.type==='childList'){const resultsContainer=document.getElementById('results-container');if(resultsContainer&&!resultsContainer.classList.contains('hidden')){enhanceDataCards();const threatPercentage=document.getElementById('threat-percentage');if(threatPercentage&&threatPercentage.textContent!=='0%'){threatPercentage.classList.add('neon-pulse');}}}});});observer.observe(document.body,{childList:true,subtree:true});const analyzeButton=document.getElementById('analyze-button');if(analyzeButton){analyzeButton.addEventListener('click',function(){this.style.transform='scale(0.95)';setTimeout(()=>{this.style.transform='';},150);});}
+function randomGlitch(){const elements=document.querySelectorAll('h1, h3, .level-name');const randomElement=elements[Math.floor(Math.random()*elements.length)];if(randomElement&&Math.random()<0.1){randomElement.classList.add('glitch-text');setTimeout(()=>{randomElement.classList.remove('glitch-text');},500);}
+setTimeout(randomGlitch,Math.random()*10000+5000);}
+setTimeout(randomGlitch,5000);});;
+document.addEventListener('DOMContentLoaded',function(){function updateThreatPercentage(newValue){const element=document.getElementById('threat-percentage');if(!element)return;element.style.animation='none';element.style.transition='all 0.3s ease';const cleanValue=parseFloat(newValue);if(!isNaN(cleanValue)){element.textContent=Math.round(cleanValue)+'%';}
+if(cleanValue>=80){element.style.color='#ff0040';element.style.textShadow='0 0 3px #ff0040, 0 0 6px #ff0040';}else if(cleanValue>=60){element.style.color='#ff4000';element.style.textShadow='0 0 3px #ff4000, 0 0 6px #ff4000';}else if(cleanValue>=40){element.style.color='#ffff00';element.style.textShadow='0 0 3px #ffff00, 0 0 6px #ffff00';}else if(cleanValue>=20){element.style.color='#80ff00';element.style.textShadow='0 0 3px #80ff00, 0 0 6px #80ff00';}else{element.style.color='#00ff80';element.style.textShadow='0 0 3px #00ff80, 0 0 6px #00ff80';}}
+const observer=new MutationObserver(function(mutations){mutations.forEach(function(mutation){if(mutation.type==='childList'||mutation.type==='characterData'){const element=document.getElementById('threat-percentage');if(element&&element.textContent&&element.textContent!=='0%'){const value=element.textContent.replace('%','');updateThreatPercentage(value);}}});});const threatElement=document.getElementById('threat-percentage');if(threatElement){observer.observe(threatElement,{childList:true,characterData:true,subtree:true});}
+function updateGaugeAngle(percentage){const gaugeFill=document.querySelector('.gauge-fill');if(gaugeFill){const angle=(percentage/100)*180;gaugeFill.style.setProperty('--gauge-angle',angle);gaugeFill.style.transition='all 1s ease-out';}}
+window.updateThreatDisplay=function(percentage){updateThreatPercentage(percentage);updateGaugeAngle(percentage);};});
\ No newline at end of file
@@ -11,10 +11,34 @@ document.addEventListener('DOMContentLoaded', function() {
     let currentTaskId = null;
     let progress = 0;
 
+    // 儀表板差異同步：只向伺服器索取已知版本之後變動的區塊
+    const DASHBOARD_SYNC_INTERVAL = 60000;
+    let dashboardEpoch = '';
+    let dashboardVersion = 0;
+    const sectionValues = {};
+    const renderedSections = {};
+
+    // 區塊名稱 → [繪製函數, 所屬容器, 區塊被移除時的清除函數]
+    const sectionRenderers = {
+        'indicators.military': [value => displayIndicator('military', value), threatIndicators, () => clearElements('military-indicator', 'military-details')],
+        'indicators.economic': [value => displayIndicator('economic', value), threatIndicators, () => clearElements('economic-indicator', 'economic-details')],
+        'indicators.news': [value => displayIndicator('news', value), threatIndicators, () => clearElements('news-indicator', 'news-details')],
+        'threat_level': [displayThreatLevel, threatLevel, () => clearElements('threat-value', 'threat-description')],
+        'report': [displayAiReport, analysisSection, () => clearElements('report-content')],
+        'source.military': [displayMilitaryData, dataSection, () => clearElements('military-data')],
+        // 黃金與糧食共用卡片，重繪時只會顯示仍存在的一方
+        'source.gold': [displayEconomicData, dataSection, displayEconomicData],
+        'source.food': [displayEconomicData, dataSection, displayEconomicData],
+        'source.news': [displayNewsData, dataSection, () => clearElements('news-data')]
+    };
+
     analyzeButton.addEventListener('click', function() {
         startAnalysis();
     });
 
+    syncDashboard();
+    setInterval(syncDashboard, DASHBOARD_SYNC_INTERVAL);
+
     function startAnalysis() {
         // 重置界面
         hideAllSections();
@@ -58,9 +82,11 @@ document.addEventListener('DOMContentLoaded', function() {
                     
                     if (data.status === 'completed') {
                         clearInterval(interval);
+                        currentTaskId = null;
                         showResults(data);
                     } else if (data.status === 'failed') {
                         clearInterval(interval);
+                        currentTaskId = null;
                         showError(data.report || '分析失敗');
                     }
                 })
@@ -84,91 +110,183 @@ document.addEventListener('DOMContentLoaded', function() {
 
     function showResults(data) {
         hideLoading();
+        applySections(sectionsFromTask(data));
         
-        // 顯示威脅指標
+        // 重置按鈕
+        analyzeButton.disabled = false;
+        analyzeButton.textContent = '啟動威脅掃描';
+    }
+
+    function syncDashboard() {
+        // 分析進行中不覆蓋畫面，完成後由 showResults 更新
+        if (currentTaskId) {
+            return;
+        }
+
+        fetch(`/dashboard?since=${dashboardVersion}&epoch=${dashboardEpoch}`)
+            .then(response => response.json())
+            .then(patch => {
+                dashboardEpoch = patch.epoch;
+                dashboardVersion = patch.version;
+                applySections(patch.sections, patch.full);
+            })
+            .catch(error => {
+                console.error('Error syncing dashboard:', error);
+            });
+    }
+
+    function sectionsFromTask(data) {
+        // 與伺服器端 build_sections 相同的區塊結構
+        const sections = {};
         if (data.indicators) {
-            displayThreatIndicators(data.indicators);
+            ['military', 'economic', 'news'].forEach(name => {
+                sections[`indicators.${name}`] = data.indicators[name];
+            });
         }
-        
-        // 顯示總體威脅等級
         if (data.threat_level !== undefined) {
-            displayThreatLevel(data.threat_level);
+            const distribution = data.threat_distribution || {};
+            sections['threat_level'] = { level: data.threat_level, percentiles: distribution.percentiles || null };
         }
-        
-        // 顯示 AI 報告
         if (data.report) {
-            displayAiReport(data.report);
+            sections['report'] = { zh: data.report, en: data.report_en || null, pdf: data.report_pdf || null };
         }
-        
-        // 顯示詳細數據
-        if (data.raw_data) {
-            displayDetailedData(data.raw_data);
+
+        const rawData = data.raw_data || {};
+        if (rawData.military) {
+            sections['source.military'] = {
+                total_incursions_last_week: rawData.military.total_incursions_last_week || 0,
+                latest_aircrafts: rawData.military.latest_aircrafts || 0,
+                latest_ships: rawData.military.latest_ships || 0,
+                error: rawData.military.error || null
+            };
         }
-        
-        // 重置按鈕
-        analyzeButton.disabled = false;
-        analyzeButton.textContent = '啟動威脅掃描';
+        if (rawData.gold) {
+            sections['source.gold'] = {
+                current_price: rawData.gold.current_price ?? null,
+                daily_change_percent: rawData.gold.daily_change_percent || 0,
+                error: rawData.gold.error || null
+            };
+        }
+        if (rawData.food) {
+            sections['source.food'] = {
+                wheat_price: rawData.food.wheat_price ?? null,
+                daily_change_percent: rawData.food.daily_change_percent || 0,
+                error: rawData.food.error || null
+            };
+        }
+        if (rawData.news) {
+            sections['source.news'] = {
+                economic_news: rawData.news.economic_news?.length || 0,
+                diplomatic_news: rawData.news.diplomatic_news?.length || 0,
+                public_opinion_news: rawData.news.public_opinion_news?.length || 0,
+                total_articles: rawData.news.total_articles || 0,
+                error: rawData.news.error || null
+            };
+        }
+        return sections;
     }
 
-    function displayThreatIndicators(indicators) {
-        document.getElementById('military-indicator').textContent = indicators.military + '/100';
-        document.getElementById('economic-indicator').textContent = indicators.economic + '/100';
-        document.getElementById('news-indicator').textContent = indicators.news + '/100';
-        
-        document.getElementById('military-details').textContent = getThreatDescription(indicators.military);
-        document.getElementById('economic-details').textContent = getThreatDescription(indicators.economic);
-        document.getElementById('news-details').textContent = getThreatDescription(indicators.news);
-        
-        threatIndicators.style.display = 'block';
+    function applySections(sections, full = false) {
+        sections = sections || {};
+        if (full) {
+            // 完整狀態取代本地狀態：移除伺服器已不存在的區塊
+            Object.keys(sectionValues)
+                .filter(name => !(name in sections))
+                .forEach(removeSection);
+        }
+
+        // 只重繪內容有變動的區塊，其餘 DOM 保持不動
+        Object.entries(sections).forEach(([name, value]) => {
+            const entry = sectionRenderers[name];
+            if (!entry) {
+                return;
+            }
+            const [render, container] = entry;
+            const encoded = JSON.stringify(value);
+            sectionValues[name] = value;
+            if (renderedSections[name] !== encoded) {
+                renderedSections[name] = encoded;
+                render(value);
+            }
+            container.style.display = 'block';
+        });
     }
 
-    function displayThreatLevel(threatLevel) {
-        document.getElementById('threat-value').textContent = threatLevel + '%';
-        document.getElementById('threat-description').textContent = getOverallThreatDescription(threatLevel);
-        
-        threatLevel.style.display = 'block';
+    function removeSection(name) {
+        const [, container, clear] = sectionRenderers[name];
+        delete sectionValues[name];
+        delete renderedSections[name];
+        clear();
+        // 容器內已沒有任何區塊時隱藏
+        const containerInUse = Object.keys(sectionValues)
+            .some(other => sectionRenderers[other][1] === container);
+        if (!containerInUse) {
+            container.style.display = 'none';
+        }
     }
 
-    function displayAiReport(report) {
-        document.getElementById('report-content').innerHTML = formatReport(report);
-        analysisSection.style.display = 'block';
+    function clearElements(...ids) {
+        ids.forEach(id => {
+            document.getElementById(id).textContent = '';
+        });
     }
 
-    function displayDetailedData(rawData) {
-        // 軍事數據
-        if (rawData.military) {
-            const militaryHtml = `
-                <p><strong>過去一週擾台次數：</strong>${rawData.military.total_incursions_last_week || 0} 次</p>
-                <p><strong>最新共機：</strong>${rawData.military.latest_aircrafts || 0} 架次</p>
-                <p><strong>最新共艦：</strong>${rawData.military.latest_ships || 0} 艘次</p>
-            `;
-            document.getElementById('military-data').innerHTML = militaryHtml;
+    function displayIndicator(name, score) {
+        document.getElementById(`${name}-indicator`).textContent = score + '/100';
+        document.getElementById(`${name}-details`).textContent = getThreatDescription(score);
+    }
+
+    function displayThreatLevel(section) {
+        document.getElementById('threat-value').textContent = section.level + '%';
+        let description = getOverallThreatDescription(section.level);
+        if (section.percentiles) {
+            description += `（90% 區間 ${section.percentiles.p5}% – ${section.percentiles.p95}%）`;
         }
-        
-        // 經濟數據
+        document.getElementById('threat-description').textContent = description;
+    }
+
+    function displayAiReport(section) {
+        const reportHtml = [formatReport(section.zh)];
+        if (section.en) {
+            reportHtml.push(`<details class="report-en"><summary>English Report</summary>${formatReport(section.en)}</details>`);
+        }
+        if (section.pdf) {
+            reportHtml.push(`<p class="report-download"><a href="${section.pdf}">下載雙語 PDF 報告</a></p>`);
+        }
+        document.getElementById('report-content').innerHTML = reportHtml.join('');
+    }
+
+    function displayMilitaryData(military) {
+        document.getElementById('military-data').innerHTML = `
+            <p><strong>過去一週擾台次數：</strong>${military.total_incursions_last_week || 0} 次</p>
+            <p><strong>最新共機：</strong>${military.latest_aircrafts || 0} 架次</p>
+            <p><strong>最新共艦：</strong>${military.latest_ships || 0} 艘次</p>
+        `;
+    }
+
+    function displayEconomicData() {
+        // 黃金與糧食共用同一張卡片，任一變動時以兩者的最新值重繪
         const economicHtml = [];
-        if (rawData.gold) {
-            economicHtml.push(`<p><strong>黃金價格：</strong>$${rawData.gold.current_price || 'N/A'}/oz</p>`);
-            economicHtml.push(`<p><strong>日變動：</strong>${rawData.gold.daily_change_percent || 0}%</p>`);
+        const gold = sectionValues['source.gold'];
+        const food = sectionValues['source.food'];
+        if (gold) {
+            economicHtml.push(`<p><strong>黃金價格：</strong>$${gold.current_price || 'N/A'}/oz</p>`);
+            economicHtml.push(`<p><strong>日變動：</strong>${gold.daily_change_percent || 0}%</p>`);
         }
-        if (rawData.food) {
-            economicHtml.push(`<p><strong>小麥價格：</strong>$${rawData.food.wheat_price || 'N/A'}/蒲式耳</p>`);
-            economicHtml.push(`<p><strong>日變動：</strong>${rawData.food.daily_change_percent || 0}%</p>`);
+        if (food) {
+            economicHtml.push(`<p><strong>小麥價格：</strong>$${food.wheat_price || 'N/A'}/蒲式耳</p>`);
+            economicHtml.push(`<p><strong>日變動：</strong>${food.daily_change_percent || 0}%</p>`);
         }
         document.getElementById('economic-data').innerHTML = economicHtml.join('');
-        
-        // 新聞數據
-        if (rawData.news) {
-            const newsHtml = `
-                <p><strong>總新聞數：</strong>${rawData.news.total_articles || 0} 篇</p>
-                <p><strong>經濟新聞：</strong>${rawData.news.economic_news?.length || 0} 篇</p>
-                <p><strong>外交新聞：</strong>${rawData.news.diplomatic_news?.length || 0} 篇</p>
-                <p><strong>輿情新聞：</strong>${rawData.news.public_opinion_news?.length || 0} 篇</p>
-            `;
-            document.getElementById('news-data').innerHTML = newsHtml;
-        }
-        
-        dataSection.style.display = 'block';
+    }
+
+    function displayNewsData(news) {
+        document.getElementById('news-data').innerHTML = `
+            <p><strong>總新聞數：</strong>${news.total_articles || 0} 篇</p>
+            <p><strong>經濟新聞：</strong>${news.economic_news || 0} 篇</p>
+            <p><strong>外交新聞：</strong>${news.diplomatic_news || 0} 篇</p>
+            <p><strong>輿情新聞：</strong>${news.public_opinion_news || 0} 篇</p>
+        `;
     }
 
     function getThreatDescription(score) {
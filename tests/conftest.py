@@ -0,0 +1,25 @@
+"""
+測試共用設定：在匯入任何專案模組前關閉原始回應封存與 OpenAI 金鑰，
+並將儀表板狀態指向暫存目錄，避免測試寫入 data/ 或連線到外部服務。
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+
+sys.path.insert(0, str(ROOT))
+os.environ['RAW_ARCHIVE'] = '0'
+os.environ.pop('OPENAI_API_KEY', None)
+os.environ['DASHBOARD_DB_PATH'] = os.path.join(tempfile.mkdtemp(prefix='dashboard-test-'), 'dashboard.db')
+
+@pytest.fixture
+def fixture_text():
+    """讀取 tests/fixtures 下的已存檔頁面"""
+    def read(name: str) -> str:
+        return (FIXTURES / name).read_text(encoding='utf-8')
+    return read
@@ -0,0 +1,48 @@
+import pytest
+
+import app as app_module
+from utils import sampling_profiler
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+    yield app_module.app.test_client()
+    sampling_profiler.arm_tasks(0)
+
+@pytest.mark.parametrize('headers', [{}, {'X-Admin-Token': 'wrong'}])
+def test_admin_routes_hide_without_valid_token(client, headers):
+    assert client.get('/admin/profile', headers=headers).status_code == 404
+    assert client.post('/admin/profile', json={'tasks': 1}, headers=headers).status_code == 404
+    assert sampling_profiler.armed_task_count() == 0
+
+def test_admin_routes_disabled_without_configured_token(client, monkeypatch):
+    monkeypatch.delenv('ADMIN_TOKEN')
+    assert client.get('/admin/profile', headers={'X-Admin-Token': ''}).status_code == 404
+
+def test_arm_tasks_and_fetch_collapsed_session(client):
+    headers = {'X-Admin-Token': 'secret'}
+    assert client.post('/admin/profile', json={'tasks': 2}, headers=headers).get_json() == {'armed_tasks': 2}
+    assert client.get('/admin/profile', headers=headers).get_json()['armed_tasks'] == 2
+
+    started = client.post('/admin/profile', json={'duration': 0.05, 'tracemalloc': False}, headers=headers)
+    session_id = started.get_json()['session_id']
+    sampling_profiler.get_session(session_id)._sampler.join(timeout=5)
+
+    result = client.get(f'/admin/profile/{session_id}', headers=headers).get_json()
+    assert result['status'] == 'completed'
+    collapsed = client.get(f'/admin/profile/{session_id}?format=collapsed', headers=headers)
+    assert collapsed.mimetype == 'text/plain'
+    assert client.get('/admin/profile/missing', headers=headers).status_code == 404
+
+def test_invalid_options_return_400(client):
+    response = client.post('/admin/profile', json={'tasks': 'many'}, headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('options', [
+    {'duration': 'nan'}, {'duration': 'inf'}, {'duration': 1, 'interval_ms': 'nan'},
+    {'tasks': 1, 'interval_ms': 'inf'}, [1]
+])
+def test_non_finite_or_malformed_options_return_400(client, options):
+    response = client.post('/admin/profile', json=options, headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 400
+    assert sampling_profiler.armed_task_count() == 0
@@ -0,0 +1,58 @@
+import pytest
+
+from analyzer.batch_analysis import MAX_PROFILES, distinct_news_queries, parse_profiles
+from analyzer.indicator_calculator import THREAT_WEIGHTS
+from scraper.news_scraper import DEFAULT_NEWS_KEYWORDS
+from utils.models import ModelValidationError
+
+def test_name_only_profile_uses_defaults():
+    (profile,) = parse_profiles({'profiles': [{'name': 'default'}]})
+    assert profile.news_keywords == {k: tuple(v) for k, v in DEFAULT_NEWS_KEYWORDS.items()}
+    assert profile.weights == pytest.approx(THREAT_WEIGHTS)
+
+def test_partial_keywords_keep_other_default_categories():
+    (profile,) = parse_profiles({'profiles': [
+        {'name': 'economy', 'news_keywords': {'economic_news': [' 半導體 ']}}
+    ]})
+    assert profile.news_keywords['economic_news'] == ('半導體',)
+    assert profile.news_keywords['diplomatic_news'] == tuple(DEFAULT_NEWS_KEYWORDS['diplomatic_news'])
+    assert profile.news_keywords['public_opinion_news'] == tuple(DEFAULT_NEWS_KEYWORDS['public_opinion_news'])
+
+def test_empty_category_disables_it():
+    (profile,) = parse_profiles({'profiles': [{'name': 'quiet', 'news_keywords': {'public_opinion_news': []}}]})
+    assert profile.news_keywords['public_opinion_news'] == ()
+
+def test_partial_weights_merge_over_defaults_and_normalize():
+    (profile,) = parse_profiles({'profiles': [{'name': 'military', 'weights': {'military': 1.4}}]})
+    expected_total = 1.4 + THREAT_WEIGHTS['economic'] + THREAT_WEIGHTS['news']
+    assert profile.weights['military'] == pytest.approx(1.4 / expected_total)
+    assert profile.weights['economic'] == pytest.approx(THREAT_WEIGHTS['economic'] / expected_total)
+    assert sum(profile.weights.values()) == pytest.approx(1.0)
+
+def test_distinct_news_queries_deduplicates_across_profiles():
+    profiles = parse_profiles({'profiles': [
+        {'name': 'a'},
+        {'name': 'b', 'news_keywords': {'economic_news': ['中國經濟', '半導體']}}
+    ]})
+    queries = distinct_news_queries(profiles)
+    assert len(queries) == len(set(queries))
+    assert '半導體' in queries
+
+@pytest.mark.parametrize('payload', [
+    None,
+    {'profiles': []},
+    {'profiles': [{'name': f'p{i}'} for i in range(MAX_PROFILES + 1)]},
+    {'profiles': [{'name': 'dup'}, {'name': 'dup'}]},
+    {'profiles': [{}]},
+    {'profiles': [{'name': 'x', 'news_keywords': {'sports_news': ['棒球']}}]},
+    {'profiles': [{'name': 'x', 'news_keywords': {'economic_news': ['  ']}}]},
+    {'profiles': [{'name': 'x', 'news_keywords': {'economic_news': '中國經濟'}}]},
+    {'profiles': [{'name': 'x', 'weights': {'diplomacy': 1}}]},
+    {'profiles': [{'name': 'x', 'weights': {'military': -1}}]},
+    {'profiles': [{'name': 'x', 'weights': {'military': float('nan')}}]},
+    {'profiles': [{'name': 'x', 'weights': {'military': 0, 'economic': 0, 'news': 0}}]},
+    {'profiles': [{'name': 'x', 'weights': {'military': True}}]},
+])
+def test_invalid_payloads_are_rejected(payload):
+    with pytest.raises(ModelValidationError):
+        parse_profiles(payload)
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+import app as app_module
+from utils.dashboard_state import DashboardState, build_sections
+from utils.models import Indicators, TaskRecord, parse_source
+
+def _completed_task(military_aircrafts=5, gold_price=2400.0):
+    task = TaskRecord('t1')
+    task.indicators = Indicators(military=40.0, economic=20.0, news=10.0)
+    task.threat_level = 25.0
+    task.report, task.report_en, task.report_pdf = '報告', 'report', None
+    task.raw_data = {
+        'military': parse_source('military', {'latest_aircrafts': military_aircrafts, 'latest_ships': 2,
+                                              'total_incursions_last_week': 30}),
+        'gold': parse_source('gold', {
+            'current_price': gold_price, 'previous_close': 2390.0, 'daily_change': 10.0,
+            'daily_change_percent': 0.5, 'week_change': 0.0, 'week_change_percent': 0.0,
+            'currency': 'USD', 'last_updated': '2025-01-01T00:00:00', 'source': 'Yahoo Finance'
+        })
+    }
+    return task
+
+@pytest.fixture
+def workers(tmp_path):
+    """兩個共用同一個資料庫的 DashboardState，模擬兩個 worker"""
+    first, second = DashboardState(tmp_path / 'dashboard.db'), DashboardState(tmp_path / 'dashboard.db')
+    yield first, second
+    first.close()
+    second.close()
+
+def _changes(state, since=0, epoch=None):
+    return json.loads(state.changes_since(since, epoch))
+
+def test_build_sections_keeps_display_fields():
+    sections = build_sections(_completed_task())
+    assert sections['indicators.military'] == 40.0
+    assert sections['threat_level'] == {'level': 25.0, 'percentiles': None}
+    assert sections['source.military']['latest_aircrafts'] == 5
+    assert sections['source.gold']['current_price'] == 2400.0
+    assert 'source.news' not in sections
+
+def test_unknown_epoch_returns_full_state(workers):
+    first, _ = workers
+    version = first.publish(build_sections(_completed_task()))
+    patch = _changes(first, since=version, epoch='stale')
+    assert patch['full'] is True
+    assert patch['version'] == version
+    assert set(patch['sections']) == set(build_sections(_completed_task()))
+
+def test_only_changed_sections_are_returned(workers):
+    first, _ = workers
+    base = first.publish(build_sections(_completed_task()))
+    assert first.publish(build_sections(_completed_task())) == base
+
+    version = first.publish(build_sections(_completed_task(gold_price=2500.0)))
+    assert version == base + 1
+    patch = _changes(first, since=base, epoch=first.epoch)
+    assert patch['full'] is False
+    assert list(patch['sections']) == ['source.gold']
+    assert patch['sections']['source.gold']['current_price'] == 2500.0
+    assert _changes(first, since=version, epoch=first.epoch)['sections'] == {}
+
+def test_version_ahead_of_server_returns_full_state(workers):
+    first, _ = workers
+    version = first.publish({'threat_level': {'level': 1}})
+    assert _changes(first, since=version + 5, epoch=first.epoch)['full'] is True
+
+def test_workers_share_epoch_and_versions(workers):
+    first, second = workers
+    assert first.epoch == second.epoch
+    base = first.publish(build_sections(_completed_task()))
+    version = second.publish(build_sections(_completed_task(military_aircrafts=9)))
+    assert version == base + 1
+
+    patch = _changes(first, since=base, epoch=second.epoch)
+    assert patch['full'] is False
+    assert list(patch['sections']) == ['source.military']
+    assert patch['sections']['source.military']['latest_aircrafts'] == 9
+
+def test_dashboard_route_returns_delta(monkeypatch, workers):
+    first, _ = workers
+    monkeypatch.setattr(app_module, 'dashboard', first)
+    version = first.publish({'threat_level': {'level': 10}})
+    client = app_module.app.test_client()
+
+    response = client.get(f'/dashboard?since={version}&epoch={first.epoch}')
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert response.get_json() == {'epoch': first.epoch, 'version': version, 'full': False, 'sections': {}}
+    assert client.get('/dashboard?since=abc').get_json()['full'] is True
+
+def test_publish_failure_does_not_fail_task(monkeypatch):
+    class BrokenDashboard:
+        def publish(self, sections):
+            raise OSError('read-only file system')
+    monkeypatch.setattr(app_module, 'dashboard', BrokenDashboard())
+    app_module.publish_dashboard(_completed_task())
@@ -0,0 +1,96 @@
+import pytest
+import requests
+
+from scraper.http_cache import ResponseCache, fetch_and_parse
+from scraper.military_scraper import parse_incursion_details
+
+URL = 'https://example.test/page'
+
+def make_response(status=200, body=b'', headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    response.url = URL
+    response.encoding = 'utf-8'
+    return response
+
+class FakeSession:
+    """依序回傳預先設定的回應，並記錄每次請求的標頭"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def request(self, method, url, headers=None, **kwargs):
+        self.sent_headers.append(headers or {})
+        return self.responses.pop(0)
+
+class CountingParser:
+    def __init__(self, parser=len):
+        self.parser = parser
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return self.parser(text)
+
+def test_not_modified_reuses_parsed_result():
+    cache = ResponseCache()
+    parser = CountingParser()
+    session = FakeSession(make_response(body=b'abc', headers={'ETag': '"v1"'}), make_response(status=304))
+
+    assert fetch_and_parse(URL, parser, session=session, cache=cache) == 3
+    assert fetch_and_parse(URL, parser, session=session, cache=cache) == 3
+    assert session.sent_headers[1]['If-None-Match'] == '"v1"'
+    assert parser.calls == 1
+    assert cache.stats['not_modified'] == 1
+
+def test_identical_body_skips_parsing():
+    cache = ResponseCache()
+    parser = CountingParser()
+    session = FakeSession(make_response(body=b'same'), make_response(body=b'same'), make_response(body=b'changed'))
+
+    for _ in range(3):
+        fetch_and_parse(URL, parser, session=session, cache=cache)
+    assert parser.calls == 2
+    assert cache.stats == {'not_modified': 0, 'hash_hit': 1, 'immutable_hit': 0, 'parsed': 2}
+
+def test_error_status_is_raised_and_not_cached():
+    cache = ResponseCache()
+    session = FakeSession(make_response(status=500, body=b'error'))
+    with pytest.raises(requests.HTTPError):
+        fetch_and_parse(URL, len, session=session, cache=cache)
+    assert cache.get(f"GET {URL}") is None
+
+def test_immutable_entry_skips_request(fixture_text):
+    cache = ResponseCache()
+    report = fixture_text('mnd_detail_report.html').encode('utf-8')
+    session = FakeSession(make_response(body=report))
+    options = dict(method='POST', session=session, cache=cache, cache_key='detail', immutable=True,
+                   complete=lambda parsed: parsed is not None)
+
+    first = fetch_and_parse(URL, parse_incursion_details, **options)
+    assert first[:2] == (14, 7)
+    # 第二次不會發送請求（FakeSession 已沒有回應可用）
+    assert fetch_and_parse(URL, parse_incursion_details, **options) is first
+    assert cache.stats['immutable_hit'] == 1
+
+def test_incomplete_result_is_not_cached_as_immutable(fixture_text):
+    cache = ResponseCache()
+    error_page = fixture_text('mnd_detail_error.html').encode('utf-8')
+    report = fixture_text('mnd_detail_report.html').encode('utf-8')
+    session = FakeSession(make_response(body=error_page), make_response(body=report))
+    options = dict(method='POST', session=session, cache=cache, cache_key='detail', immutable=True,
+                   complete=lambda parsed: parsed is not None)
+
+    assert fetch_and_parse(URL, parse_incursion_details, **options) is None
+    assert fetch_and_parse(URL, parse_incursion_details, **options)[:2] == (14, 7)
+    assert cache.stats['immutable_hit'] == 0 and cache.stats['parsed'] == 2
+
+def test_lru_eviction():
+    cache = ResponseCache(max_entries=2)
+    session = FakeSession(*(make_response(body=bytes([i])) for i in range(3)))
+    for i in range(3):
+        fetch_and_parse(URL, len, session=session, cache=cache, cache_key=f"k{i}")
+    assert cache.get('k0') is None and cache.get('k2') is not None
@@ -0,0 +1,93 @@
+import json
+import random
+
+import pytest
+
+from analyzer import indicator_calculator
+from analyzer.indicator_calculator import MILITARY_KEYWORD_MAX_BONUS, calculate_indicators
+from utils.keyword_matcher import THREAT_TERMS, KeywordMatcher, load_threat_terms, threat_matcher
+
+# 國防部每日動態的例行寫法與升溫時的寫法
+ROUTINE_REPORT = ('中共解放軍臺海周邊海、空域動態 偵獲共機22架次、共艦7艘及公務船1艘持續在臺海周邊活動，'
+                  '國軍運用聯合情監偵掌握，並派遣任務機、艦及岸置飛彈系統應處。')
+ESCALATION_REPORT = ('中共解放軍臺海周邊海、空域動態 偵獲共機22架次、共艦7艘持續在臺海周邊活動，'
+                     '共軍實施聯合戰備警巡並進行實彈演習，國軍運用聯合情監偵掌握，並派遣任務機、艦及岸置飛彈系統應處。')
+
+def _brute_force(terms, text):
+    """逐一位置比對（含重疊）的參考實作"""
+    text = text.lower()
+    counts = {}
+    for term in terms:
+        key = term.lower()
+        count = sum(text.startswith(key, i) for i in range(len(text)))
+        if count:
+            counts[key] = count
+    return counts
+
+def test_matches_brute_force_on_threat_terms():
+    matcher = KeywordMatcher(THREAT_TERMS)
+    texts = [ROUTINE_REPORT, ESCALATION_REPORT, 'PLA Blockade drills: live-fire MISSILE tests; missiles and sanctions']
+    for text in texts:
+        assert matcher.scan(text) == _brute_force(THREAT_TERMS, text)
+
+def test_matches_brute_force_on_overlapping_random_text():
+    terms = {'ab': 1, 'abab': 1, 'b': 1, 'bab': 1, 'aaa': 1, 'ca': 1}
+    matcher = KeywordMatcher(terms)
+    rng = random.Random(0)
+    for _ in range(200):
+        text = ''.join(rng.choice('abcx') for _ in range(rng.randint(0, 40)))
+        assert matcher.scan(text) == _brute_force(terms, text)
+        assert matcher.contains_any(text) == bool(_brute_force(terms, text))
+
+def test_scan_many_sums_texts_and_skips_empty():
+    matcher = KeywordMatcher({'演習': 3})
+    assert matcher.scan_many(['演習', None, '', '軍演演習演習']) == {'演習': 3}
+
+def test_zero_weight_and_duplicate_terms_are_ignored():
+    matcher = KeywordMatcher({'Missile': 4, 'missile': 1, '封鎖': 0})
+    assert matcher.terms == ['missile']
+    assert matcher.weights == {'missile': 4.0}
+    assert matcher.scan('封鎖 MISSILE') == {'missile': 1}
+
+def test_boilerplate_terms_do_not_score():
+    matcher = KeywordMatcher(THREAT_TERMS)
+    assert matcher.weighted_score(matcher.scan(ROUTINE_REPORT)) == 0
+    assert matcher.weighted_score(matcher.scan(ESCALATION_REPORT)) > 0
+
+def test_routine_week_scores_lower_than_escalation():
+    def military(report):
+        return {
+            'total_incursions_last_week': 0, 'latest_aircrafts': 0, 'latest_ships': 0,
+            'keyword_hits': threat_matcher().scan_many([report] * 7), 'keyword_reports': 7
+        }
+    routine = calculate_indicators(military(ROUTINE_REPORT), {}, {}, {})['military']
+    escalation = calculate_indicators(military(ESCALATION_REPORT), {}, {}, {})['military']
+    assert routine < escalation <= MILITARY_KEYWORD_MAX_BONUS
+
+def test_load_threat_terms_merges_json(tmp_path):
+    path = tmp_path / 'terms.json'
+    path.write_text(json.dumps({'斬首': 5, '演習': 0}), encoding='utf-8')
+    terms = load_threat_terms(str(path))
+    assert terms['斬首'] == 5.0
+    assert terms['演習'] == 0.0
+    assert terms['封鎖'] == THREAT_TERMS['封鎖']
+
+@pytest.mark.parametrize('content', ['["演習"]', '{"演習": "high"}', 'not json'])
+def test_invalid_threat_terms_fall_back_to_defaults(tmp_path, content):
+    path = tmp_path / 'terms.json'
+    path.write_text(content, encoding='utf-8')
+    assert load_threat_terms(str(path)) == THREAT_TERMS
+
+def test_negative_weights_never_lower_the_indicators(monkeypatch):
+    # 覆寫詞典拿掉「飛彈」後，「岸置飛彈」的負權重不能讓加分變成扣分
+    matcher = KeywordMatcher(dict(THREAT_TERMS, 飛彈=0))
+    monkeypatch.setattr(indicator_calculator, 'threat_matcher', lambda: matcher)
+    hits = matcher.scan(ROUTINE_REPORT)
+    assert matcher.weighted_score(hits) < 0
+
+    military = {'total_incursions_last_week': 0, 'latest_aircrafts': 1, 'latest_ships': 0,
+                'keyword_hits': hits, 'keyword_reports': 1}
+    news = {'keyword_hits': hits, 'total_articles': 3}
+    indicators = calculate_indicators(military, {}, {}, news)
+    assert indicators['military'] == 3
+    assert indicators['news'] == 0
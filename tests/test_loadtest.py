@@ -0,0 +1,42 @@
+from loadtest.__main__ import Metrics, parse_args, percentile, storage_environment
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([], 95) == 0.0
+
+def test_metrics_summary_counts_errors_per_session():
+    metrics = Metrics()
+    metrics.record('analyze', 0.01)
+    metrics.record('get_report', 0.02)
+    metrics.record_session(1.5)
+    metrics.record_error('task_failed')
+
+    summary = metrics.summary(elapsed=2.0)
+    assert summary['http_requests'] == 2
+    assert summary['sessions_completed'] == 1
+    assert summary['error_rate'] == 0.5
+    assert summary['latency_ms']['session']['p50'] == 1500.0
+
+def test_defaults_to_single_worker():
+    assert parse_args([]).workers == 1
+
+def test_allows_multiple_workers():
+    assert parse_args(['--workers', '4']).workers == 4
+
+def test_cross_worker_misses_are_reported_as_not_found_rate():
+    metrics = Metrics()
+    for _ in range(3):
+        metrics.record_session(1.0)
+    metrics.record_error('task_not_found')
+
+    summary = metrics.summary(elapsed=2.0)
+    assert summary['not_found_rate'] == 0.25
+    assert summary['error_rate'] == 0.25
+
+def test_storage_environment_stays_inside_the_given_directory(tmp_path):
+    env = storage_environment(str(tmp_path))
+    assert {'RAW_ARCHIVE_DIR', 'DASHBOARD_DB_PATH', 'INCURSION_DB_PATH', 'PDF_CACHE_DIR'} <= set(env)
+    assert all(path.startswith(str(tmp_path)) for path in env.values())
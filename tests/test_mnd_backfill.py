@@ -0,0 +1,193 @@
+import json
+
+import pytest
+import requests
+from bs4 import BeautifulSoup
+
+from scraper.military_scraper import (
+    match_incursion_counts, parse_incursion_counts, parse_postback, postback_data
+)
+from scraper import mnd_backfill
+from scraper.mnd_backfill import MndBackfill, find_page_link, parse_listing_date, parse_listing_rows
+from utils.incursion_store import IncursionStore
+
+NOTICE_TARGET = 'ctl00$ContentPlaceHolder1$gvList$ctl03$lnkTitle'
+
+@pytest.fixture
+def store(tmp_path):
+    store = IncursionStore(str(tmp_path / 'incursions.db'))
+    yield store
+    store.close()
+
+def test_parse_listing_rows_keeps_dated_incursion_rows(fixture_text):
+    rows = parse_listing_rows(BeautifulSoup(fixture_text('mnd_listing_page1.html'), 'html.parser'))
+    assert [(row['date'], row['event_target'].rsplit('$', 2)[1]) for row in rows] == [
+        ('2025-01-10', 'ctl02'),
+        ('2025-01-10', 'ctl03'),
+        ('2025-01-09', 'ctl05'),
+    ]
+    assert rows[0]['title'] == '中共解放軍臺海周邊海、空域動態'
+
+def test_find_page_link(fixture_text):
+    soup = BeautifulSoup(fixture_text('mnd_listing_page1.html'), 'html.parser')
+    assert find_page_link(soup, 2) == ('ctl00$ContentPlaceHolder1$gvList', 'Page$2')
+    assert find_page_link(soup, 3) is None
+
+@pytest.mark.parametrize('href, expected', [
+    ("javascript:__doPostBack('ctl00$gvList$ctl02$lnkTitle','')", ('ctl00$gvList$ctl02$lnkTitle', '')),
+    ("javascript:__doPostBack('ctl00$gvList', 'Page$2')", ('ctl00$gvList', 'Page$2')),
+    ("javascript:__doPostBack('ctl00$gvList')", ('ctl00$gvList', '')),
+    ('/News.aspx?id=1', None),
+])
+def test_parse_postback(href, expected):
+    assert parse_postback(href) == expected
+
+def test_postback_data_keeps_form_state():
+    form_state = {'__VIEWSTATE': 'vs', '__VIEWSTATEGENERATOR': 'gen', '__EVENTVALIDATION': 'ev'}
+    data = postback_data(form_state, 'ctl00$gvList', 'Page$2')
+    assert data == dict(form_state, __EVENTTARGET='ctl00$gvList', __EVENTARGUMENT='Page$2')
+    assert '__EVENTTARGET' not in form_state
+
+@pytest.mark.parametrize('text, expected', [
+    ('114.01.10', '2025-01-10'),
+    ('114年1月9日', '2025-01-09'),
+    ('2025/01/09', '2025-01-09'),
+    ('2025-1-9', '2025-01-09'),
+    ('114.02.30', None),
+    ('日期未定', None),
+])
+def test_parse_listing_date(text, expected):
+    assert parse_listing_date(text) == expected
+
+def test_parse_incursion_counts(fixture_text):
+    assert parse_incursion_counts(fixture_text('mnd_detail_report.html')) == (14, 7)
+    assert parse_incursion_counts('<p>偵獲共機3架次及共艦5艘</p>') == (3, 5)
+    # 沒有數量的頁面仍回傳 0，需要區分時使用 match_incursion_counts
+    assert parse_incursion_counts(fixture_text('mnd_detail_notice.html')) == (0, 0)
+
+@pytest.mark.parametrize('name', ['mnd_detail_notice.html', 'mnd_detail_error.html'])
+def test_match_incursion_counts_rejects_pages_without_counts(fixture_text, name):
+    assert match_incursion_counts(fixture_text(name)) is None
+
+def test_store_does_not_replace_counts_with_zeros(store):
+    store.bulk_upsert([('2025-01-10', 14, 7, '每日動態')])
+    store.bulk_upsert([('2025-01-10', 0, 0, '其他公告')])
+    assert store.get('2025-01-10') == ('2025-01-10', 14, 7, '每日動態')
+
+    store.bulk_upsert([('2025-01-10', 20, 3, '更正')])
+    assert store.get('2025-01-10') == ('2025-01-10', 20, 3, '更正')
+
+    store.bulk_upsert([('2025-01-11', 0, 0, '無共機'), ('2025-01-11', 0, 1, '每日動態')])
+    assert store.get('2025-01-11') == ('2025-01-11', 0, 1, '每日動態')
+
+class FakeMnd:
+    """依請求內容回傳已存檔的頁面，記錄列表頁的請求"""
+
+    def __init__(self, fixture_text):
+        self.pages = {
+            None: fixture_text('mnd_listing_page1.html'),
+            'Page$2': fixture_text('mnd_listing_page2.html'),
+        }
+        self.report = fixture_text('mnd_detail_report.html')
+        self.notice = fixture_text('mnd_detail_notice.html')
+        self.listing_requests = []
+
+    def __call__(self, session, method, data=None):
+        if data and data['__EVENTTARGET'].endswith('lnkTitle'):
+            return self.notice if data['__EVENTTARGET'] == NOTICE_TARGET else self.report
+        argument = data['__EVENTARGUMENT'] if data else None
+        self.listing_requests.append(argument)
+        return self.pages[argument]
+
+def test_backfill_resumes_from_checkpoint(tmp_path, store, fixture_text):
+    checkpoint_path = str(tmp_path / 'checkpoint.json')
+    fake = FakeMnd(fixture_text)
+
+    first = MndBackfill(store, checkpoint_path, concurrency=2, min_interval=0)
+    first._request = fake
+    stats = first.run(max_pages=1)
+    assert stats['pages'] == 1 and stats['records'] == 2 and stats['skipped_rows'] == 1
+    assert store.get('2025-01-10')[1:3] == (14, 7)
+    with open(checkpoint_path, encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    assert checkpoint['next_page'] == 2 and not checkpoint['finished']
+
+    second = MndBackfill(store, checkpoint_path, concurrency=2, min_interval=0)
+    second._request = fake
+    stats = second.run()
+    assert stats['resumed_from_page'] == 2 and stats['pages'] == 1
+    # 繼續時直接以檢查點的表單狀態翻到第 2 頁，不重新讀取第 1 頁
+    assert fake.listing_requests == [None, 'Page$2']
+    assert [row[0] for row in store.get_range('2025-01-01', '2025-01-31')] == [
+        '2025-01-07', '2025-01-08', '2025-01-09', '2025-01-10'
+    ]
+
+    with open(checkpoint_path, encoding='utf-8') as f:
+        assert json.load(f)['finished']
+    third = MndBackfill(store, checkpoint_path, min_interval=0)
+    third._request = fake
+    assert third.run()['pages'] == 0
+
+class FlakyMnd(FakeMnd):
+    """第一次請求指定詳情頁時失敗"""
+
+    def __init__(self, fixture_text, failing_target):
+        super().__init__(fixture_text)
+        self.failing_target = failing_target
+
+    def __call__(self, session, method, data=None):
+        if data and data['__EVENTTARGET'] == self.failing_target:
+            self.failing_target = None
+            raise requests.ConnectionError('reset')
+        return super().__call__(session, method, data)
+
+def test_failed_details_are_kept_in_checkpoint_and_retried(tmp_path, store, fixture_text):
+    checkpoint_path = str(tmp_path / 'checkpoint.json')
+    rows = parse_listing_rows(BeautifulSoup(fixture_text('mnd_listing_page1.html'), 'html.parser'))
+    failing = next(row for row in rows if row['date'] == '2025-01-09')
+    fake = FlakyMnd(fixture_text, failing['event_target'])
+
+    first = MndBackfill(store, checkpoint_path, concurrency=2, min_interval=0)
+    first._request = fake
+    stats = first.run(max_pages=1)
+    assert stats['failed_details'] == 1
+    assert store.get('2025-01-09') is None
+    with open(checkpoint_path, encoding='utf-8') as f:
+        failed = json.load(f)['failed']
+    assert [row['date'] for group in failed for row in group['rows']] == ['2025-01-09']
+
+    second = MndBackfill(store, checkpoint_path, concurrency=2, min_interval=0)
+    second._request = fake
+    stats = second.run()
+    assert stats['retried_details'] == 1 and stats['failed_details'] == 0
+    assert store.get('2025-01-09')[1:3] == (14, 7)
+    with open(checkpoint_path, encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    assert checkpoint['finished'] and checkpoint['failed'] == []
+
+def test_finished_backfill_still_retries_failed_details(tmp_path, store, fixture_text):
+    checkpoint_path = str(tmp_path / 'checkpoint.json')
+    rows = parse_listing_rows(BeautifulSoup(fixture_text('mnd_listing_page1.html'), 'html.parser'))
+    fake = FlakyMnd(fixture_text, rows[0]['event_target'])
+    first = MndBackfill(store, checkpoint_path, concurrency=1, min_interval=0)
+    first._request = fake
+    assert first.run()['failed_details'] == 1
+
+    second = MndBackfill(store, checkpoint_path, min_interval=0)
+    second._request = fake
+    stats = second.run()
+    assert stats['pages'] == 0 and stats['retried_details'] == 1 and stats['failed_details'] == 0
+    assert store.get(rows[0]['date']) is not None
+
+def test_request_does_not_sleep_after_the_last_attempt(store, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(mnd_backfill.time, 'sleep', sleeps.append)
+
+    class FailingSession:
+        def request(self, *args, **kwargs):
+            raise requests.ConnectionError('down')
+
+    backfill = MndBackfill(store, min_interval=0, retries=2)
+    with pytest.raises(requests.ConnectionError):
+        backfill._request(FailingSession(), 'GET')
+    assert sleeps == [1, 2]
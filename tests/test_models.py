@@ -0,0 +1,81 @@
+import pytest
+
+from utils import json_codec
+from utils.models import (
+    _SlotsModel, CommodityQuote, Indicators, MilitaryData, ModelValidationError,
+    NewsData, SourceError, TaskRecord, parse_source
+)
+
+MILITARY = {
+    'total_incursions_last_week': 42,
+    'latest_aircrafts': 12,
+    'latest_ships': 6,
+    'daily_incursions_chart_data': {'labels': ['10/01', '10/02'], 'data': [8, 10]},
+    'keyword_hits': {'演習': 2},
+    'keyword_reports': 7,
+    'source_url': 'https://www.mnd.gov.tw/'
+}
+
+NEWS = {
+    'economic_news': [{'title': '經濟', 'url': 'https://a', 'published_date': '', 'source': 'A', 'snippet': '摘要'}],
+    'diplomatic_news': [],
+    'public_opinion_news': [],
+    'sources': ['A'],
+    'total_articles': 1,
+    'keyword_hits': {}
+}
+
+GOLD = {
+    'current_price': 2000.5, 'previous_close': 1990.0, 'daily_change': 10.5,
+    'daily_change_percent': 0.53, 'week_change': 0.0, 'week_change_percent': 0.0,
+    'currency': 'USD', 'last_updated': '2025-01-01T00:00:00', 'source': 'Yahoo Finance'
+}
+
+@pytest.mark.parametrize('source, data', [('military', MILITARY), ('news', NEWS), ('gold', GOLD)])
+def test_source_round_trip(source, data):
+    model = parse_source(source, data)
+    assert model.to_dict() == data
+    assert parse_source(source, model.to_dict()) == model
+    assert json_codec.loads(json_codec.dumps(model)) == data
+
+def test_get_supports_json_aliases():
+    quote = CommodityQuote.from_dict(GOLD, 'gold')
+    assert quote.get('current_price') == 2000.5
+    assert quote.get('missing', 'default') == 'default'
+
+@pytest.mark.parametrize('source, data', [
+    ('military', dict(MILITARY, latest_aircrafts='12')),
+    ('military', dict(MILITARY, latest_ships=True)),
+    ('news', dict(NEWS, economic_news=[{'title': '', 'url': 'https://a'}])),
+    ('gold', dict(GOLD, current_price=None)),
+    ('food', []),
+])
+def test_invalid_source_data_is_rejected(source, data):
+    with pytest.raises(ModelValidationError):
+        parse_source(source, data)
+
+def test_task_record_serializes_nested_models():
+    task = TaskRecord('t1', status='completed')
+    task.indicators = Indicators(10, 20, 30)
+    task.raw_data = {'military': MilitaryData.from_dict(MILITARY), 'news': SourceError('boom')}
+    encoded = json_codec.loads(json_codec.dumps(task))
+    assert encoded['indicators'] == {'military': 10, 'economic': 20, 'news': 30}
+    assert encoded['raw_data']['news'] == {'error': 'boom'}
+    assert encoded['raw_data']['military'] == MILITARY
+
+def test_codec_without_orjson_matches(monkeypatch):
+    model = NewsData.from_dict(NEWS)
+    fast = json_codec.dumps(model)
+    monkeypatch.setattr(json_codec, 'ORJSON_AVAILABLE', False)
+    assert json_codec.loads(json_codec.dumps(model)) == json_codec.loads(fast)
+    assert json_codec.loads(json_codec.dumps({'tags': ('a', 'b')})) == {'tags': ['a', 'b']}
+    with pytest.raises(TypeError):
+        json_codec.dumps(object())
+
+def test_models_are_abstract_and_unhashable():
+    with pytest.raises(TypeError):
+        _SlotsModel()
+    with pytest.raises(TypeError):
+        hash(Indicators(1, 2, 3))
+    assert Indicators(1, 2, 3) == Indicators(1, 2, 3)
+    assert Indicators(1, 2, 3) != Indicators(1, 2, 4)
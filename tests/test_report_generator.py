@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from analyzer import report_generator
+from analyzer import pdf_exporter
+
+def test_bilingual_report_runs_languages_concurrently(monkeypatch):
+    barrier = threading.Barrier(len(report_generator.REPORT_LANGUAGES), timeout=5)
+
+    def fake_report(*args):
+        # 兩種語言必須同時執行才能通過 barrier
+        barrier.wait()
+        return f"report-{args[7]}"
+
+    monkeypatch.setattr(report_generator, 'generate_ai_report', fake_report)
+    reports = report_generator.generate_bilingual_report({}, {}, {}, {}, 10, 20, 30)
+    assert reports == {'zh': 'report-zh', 'en': 'report-en'}
+
+def test_missing_api_key_uses_fallback_report():
+    report = report_generator.generate_ai_report({}, {}, {}, {}, 10, 20, 30, 'en')
+    assert report == report_generator.generate_fallback_report(30, 10, 20, 'en')
+
+def test_report_digest_depends_on_content_only():
+    first = pdf_exporter.report_digest({'zh': '甲', 'en': 'a'})
+    assert first == pdf_exporter.report_digest({'en': 'a', 'zh': '甲'})
+    assert first != pdf_exporter.report_digest({'zh': '甲', 'en': 'b'})
+
+@pytest.mark.skipif(not pdf_exporter.REPORTLAB_AVAILABLE, reason='reportlab 未安裝')
+def test_render_pdf_writes_cached_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_exporter, 'PDF_CACHE_DIR', tmp_path)
+    reports = {'zh': '情勢概述\n風險評估', 'en': 'Overview\nRisk'}
+    digest = pdf_exporter.report_digest(reports)
+    pdf_exporter.render_pdf(reports, pdf_exporter.cached_pdf_path(digest))
+
+    path = pdf_exporter.get_cached_pdf(digest)
+    assert path is not None and path.read_bytes().startswith(b'%PDF')
+    assert list(tmp_path.iterdir()) == [path]
+
+def test_render_started_by_another_worker_is_reported_as_pending(tmp_path, monkeypatch):
+    import app as app_module
+    monkeypatch.setattr(pdf_exporter, 'PDF_CACHE_DIR', tmp_path)
+    digest = pdf_exporter.report_digest({'zh': '甲', 'en': 'a'})
+    client = app_module.app.test_client()
+    assert client.get(f'/report_pdf/{digest}').status_code == 404
+
+    # 其他 worker 建立的標記檔（本程序的 _pending 中沒有此雜湊值）
+    pdf_exporter.pending_marker_path(digest).touch()
+    response = client.get(f'/report_pdf/{digest}')
+    assert response.status_code == 202 and response.get_json() == {'status': 'rendering'}
+
+    # 渲染途中被終止的 worker 留下的過期標記不再視為渲染中
+    monkeypatch.setattr(pdf_exporter, 'PDF_PENDING_MAX_AGE', 0)
+    assert client.get(f'/report_pdf/{digest}').status_code == 404
+
+@pytest.mark.skipif(not pdf_exporter.REPORTLAB_AVAILABLE, reason='reportlab 未安裝')
+def test_background_render_clears_pending_marker(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_exporter, 'PDF_CACHE_DIR', tmp_path)
+    reports = {'zh': '情勢概述', 'en': 'Overview'}
+    digest = pdf_exporter.submit_pdf_render(reports)
+    with pdf_exporter._lock:
+        future = pdf_exporter._pending.get(digest)
+    if future is not None:
+        future.result(timeout=30)
+    # 完成回呼在渲染執行緒中執行，等待它移除標記
+    for _ in range(100):
+        if not pdf_exporter.is_render_pending(digest):
+            break
+        threading.Event().wait(0.01)
+    assert not pdf_exporter.is_render_pending(digest)
+    assert not pdf_exporter.pending_marker_path(digest).exists()
+    assert pdf_exporter.get_cached_pdf(digest) is not None
@@ -0,0 +1,132 @@
+import json
+import os
+import time
+
+import pytest
+import requests
+
+from scraper import response_archive
+from scraper.archive_reparse import reparse_archive
+from scraper.http_cache import ResponseCache, body_digest, fetch_and_parse
+from scraper.response_archive import ResponseArchive, iter_segment, read_record
+from scraper.yahoo_chart import parse_daily_quote
+
+def make_response(url, status=200, body=b''):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers['Content-Type'] = 'text/html; charset=utf-8'
+    response.url = url
+    response.encoding = 'utf-8'
+    return response
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+
+    def request(self, method, url, headers=None, **kwargs):
+        return self.response
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    archive = ResponseArchive(str(tmp_path / 'archive'))
+    monkeypatch.setattr(response_archive, 'get_archive', lambda: archive)
+    yield archive
+    archive.close()
+
+def _append(archive, source, body, status=200):
+    return archive.append(source, f'https://example.test/{source}', body, status=status,
+                          digest=body_digest(body), metadata={'encoding': 'utf-8'})
+
+def test_round_trip_through_index_and_segment(archive):
+    bodies = [b'<html>first</html>', '<p>偵獲共機3架次</p>'.encode('utf-8')]
+    ids = [_append(archive, 'mnd_detail', body) for body in bodies]
+
+    rows = archive.query('mnd_detail')
+    assert [row[0] for row in rows] == ids
+    records = [read_record(archive.segment_dir, row) for row in rows]
+    assert [record.content for record in records] == bodies
+    assert records[1].text == '<p>偵獲共機3架次</p>'
+    assert records[0].metadata['digest'] == body_digest(bodies[0])
+    assert archive.sources() == {'mnd_detail': 2}
+
+    # 即使沒有索引，也能從區段檔本身讀回
+    (segment,) = archive.segment_dir.glob('*.seg')
+    assert [content for _, _, _, content in iter_segment(segment)] == bodies
+
+def test_truncated_tail_is_skipped(archive):
+    _append(archive, 'google_news', b'complete')
+    (segment,) = archive.segment_dir.glob('*.seg')
+    with open(segment, 'ab') as f:
+        f.write(b'\x00\x00\x10\x00partial')
+    assert [content for _, _, _, content in iter_segment(segment)] == [b'complete']
+
+def test_error_responses_are_archived_before_raising(archive):
+    url = 'https://example.test/mnd'
+    session = FakeSession(make_response(url, status=503, body=b'<html>Service Unavailable</html>'))
+    with pytest.raises(requests.HTTPError):
+        fetch_and_parse(url, len, session=session, cache=ResponseCache(), archive_source='mnd_listing')
+
+    (row,) = archive.query('mnd_listing')
+    record = read_record(archive.segment_dir, row)
+    assert record.metadata['status'] == 503
+    assert record.content == b'<html>Service Unavailable</html>'
+    assert archive.query('mnd_listing', successful_only=True) == []
+
+def test_reparse_counts_empty_results_and_skips_http_errors(archive, fixture_text, tmp_path):
+    _append(archive, 'mnd_detail', fixture_text('mnd_detail_report.html').encode('utf-8'))
+    _append(archive, 'mnd_detail', fixture_text('mnd_detail_notice.html').encode('utf-8'))
+    _append(archive, 'mnd_detail', b'<html>Bad Gateway</html>', status=502)
+    chart = {'chart': {'result': [{'indicators': {'quote': [{'close': [100.0, None, 104.0, 102.0]}]}}]}}
+    _append(archive, 'yahoo_gold', json.dumps(chart).encode('utf-8'))
+
+    output = tmp_path / 'reparsed.jsonl'
+    stats = reparse_archive(archive, ['mnd_detail', 'yahoo_gold'], workers=1, output=str(output))
+
+    assert stats == {
+        'mnd_detail': {'records': 2, 'errors': 0, 'empty': 1},
+        'yahoo_gold': {'records': 1, 'errors': 0, 'empty': 0}
+    }
+    lines = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    results = {line['id']: line['result'] for line in lines}
+    assert sorted(tuple(r[:2]) for r in results.values() if r and 'price' not in r) == [(14, 7)]
+    assert parse_daily_quote(json.dumps(chart)) in results.values()
+
+def test_reparse_rejects_unknown_sources(archive):
+    with pytest.raises(ValueError):
+        reparse_archive(archive, ['openai'])
+
+def test_prune_drops_oldest_segments_and_index_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(response_archive, 'SEGMENT_MAX_BYTES', 1)
+    archive = ResponseArchive(str(tmp_path / 'archive'), max_bytes=0, max_days=0)
+    try:
+        body = os.urandom(4096)
+        for _ in range(4):
+            _append(archive, 'google_news', body)
+        segments = sorted(archive.segment_dir.glob('*.seg'))
+        assert len(segments) == 4
+
+        archive.max_bytes = 2 * 5000
+        removed = archive.prune()
+        assert removed == [path.name for path in segments[:2]]
+        remaining = {row[4] for row in archive.query('google_news')}
+        assert remaining == {path.name for path in segments[2:]}
+
+        # 依天數過期；目前寫入中的區段檔不會被刪除
+        archive.max_bytes = 0
+        archive.max_days = 1
+        old = time.time() - 2 * 86400
+        for path in segments[2:]:
+            os.utime(path, (old, old))
+        assert archive.prune() == [segments[2].name]
+        assert {row[4] for row in archive.query('google_news')} == {segments[3].name}
+    finally:
+        archive.close()
+
+def test_writer_recovers_when_its_segment_was_pruned(archive):
+    _append(archive, 'google_news', b'one')
+    (segment,) = archive.segment_dir.glob('*.seg')
+    segment.unlink()
+    _append(archive, 'google_news', b'two')
+    (row,) = [row for row in archive.query('google_news') if row[4] != segment.name]
+    assert read_record(archive.segment_dir, row).content == b'two'
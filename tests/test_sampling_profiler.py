@@ -0,0 +1,102 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils import sampling_profiler
+
+def _busy_worker(seconds):
+    stop_at = time.perf_counter() + seconds
+    while time.perf_counter() < stop_at:
+        pass
+
+def _quiet_thread(stop):
+    stop.wait()
+
+@pytest.fixture(autouse=True)
+def reset_profiler():
+    sampling_profiler.arm_tasks(0)
+    yield
+    sampling_profiler.arm_tasks(0)
+
+def test_window_samples_all_threads_and_is_listed():
+    session = sampling_profiler.start_window(0.2, interval=0.002, trace_memory=False)
+    _busy_worker(0.3)
+    session._sampler.join(timeout=5)
+    assert session.status == 'completed'
+    assert session.samples > 0
+    assert any('_busy_worker' in entry['function'] for entry in session.top_functions())
+    assert sampling_profiler.get_session(session.session_id) is session
+    assert sampling_profiler.list_sessions()[0]['session_id'] == session.session_id
+
+def test_collapsed_output_is_root_to_leaf_with_counts():
+    session = sampling_profiler.ProfileSession('test', 'window', threads=set())
+    session.stacks.update({'main (a.py:1);leaf (a.py:5)': 3, 'main (a.py:1)': 1})
+    lines = session.collapsed().splitlines()
+    assert lines == ['main (a.py:1);leaf (a.py:5) 3', 'main (a.py:1) 1']
+    assert session.top_functions()[0] == {'function': 'leaf (a.py:5)', 'samples': 3, 'percent': 75.0}
+
+def test_unarmed_task_scope_is_a_no_op():
+    with sampling_profiler.task_scope('idle') as session:
+        assert session is None
+
+def test_task_scope_samples_only_task_and_propagated_threads():
+    stop = threading.Event()
+    bystander = threading.Thread(target=_quiet_thread, args=(stop,))
+    bystander.start()
+    assert sampling_profiler.arm_tasks(1, interval=0.002, trace_memory=True, top_n=5) == 1
+    try:
+        with sampling_profiler.task_scope('t1') as session:
+            assert sampling_profiler.armed_task_count() == 0
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(sampling_profiler.propagate(_busy_worker), 0.2).result()
+    finally:
+        stop.set()
+        bystander.join()
+
+    assert session.status == 'completed'
+    assert session.threads == set()
+    stacks = session.collapsed()
+    assert '_busy_worker' in stacks
+    assert '_quiet_thread' not in stacks
+    assert session.allocations is not None and len(session.allocations) <= 5
+    # 下一個任務不再取樣
+    with sampling_profiler.task_scope('t2') as session:
+        assert session is None
+
+def test_propagate_returns_original_function_outside_a_task():
+    assert sampling_profiler.propagate(_busy_worker) is _busy_worker
+
+@pytest.mark.parametrize('duration, interval', [
+    (float('nan'), 0.01), (float('inf'), 0.01), (1.0, float('nan')), (1.0, float('inf'))
+])
+def test_window_rejects_non_finite_values(duration, interval):
+    with pytest.raises(ValueError):
+        sampling_profiler.start_window(duration, interval, trace_memory=False)
+
+def test_arm_tasks_rejects_non_finite_interval():
+    with pytest.raises(ValueError):
+        sampling_profiler.arm_tasks(1, float('nan'))
+    assert sampling_profiler.armed_task_count() == 0
+
+def test_results_can_be_read_while_sampling():
+    session = sampling_profiler.start_window(0.3, interval=0.001, trace_memory=False)
+    try:
+        while session.status != 'completed':
+            session.to_dict()
+            session.collapsed()
+    finally:
+        session._sampler.join(timeout=5)
+
+def test_news_search_workers_join_the_task_profile(monkeypatch):
+    from scraper import news_scraper
+
+    def slow_search(query):
+        _busy_worker(0.1)
+        return []
+    monkeypatch.setattr(news_scraper, '_search_google_news', slow_search)
+    sampling_profiler.arm_tasks(1, interval=0.002, trace_memory=False)
+    with sampling_profiler.task_scope('news') as session:
+        assert news_scraper.fetch_news_results(['a', 'b']) == {'a': [], 'b': []}
+    assert 'slow_search' in session.collapsed()
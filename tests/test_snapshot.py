@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+from analyzer import snapshot as snapshot_cli
+from utils.models import SourceError
+
+ALL_OK = {'military': 'ok', 'news': 'ok', 'gold': 'ok', 'food': 'ok'}
+
+def fake_snapshot(statuses, task_id='snapshot-abc123def456', timestamp='2026-01-02T03:04:05.123456'):
+    return {'status': 'completed', 'task_id': task_id, 'timestamp': timestamp,
+            'threat_level': 12.5, 'sources': dict(statuses), 'elapsed_ms': 10}
+
+@pytest.fixture
+def run_cli(monkeypatch, tmp_path):
+    """以指定的來源狀態執行命令列，回傳 (結束代碼, 輸出目錄)"""
+    def run(statuses, *args):
+        monkeypatch.setattr(snapshot_cli, 'build_snapshot', lambda *a, **k: fake_snapshot(statuses))
+        monkeypatch.setattr(snapshot_cli, 'load_dotenv', lambda: None)
+
+        def fake_exit(code):
+            raise SystemExit(code)
+        monkeypatch.setattr(snapshot_cli.os, '_exit', fake_exit)
+        monkeypatch.setattr('sys.argv', ['snapshot', '--output', str(tmp_path), *args])
+        with pytest.raises(SystemExit) as exc:
+            snapshot_cli.main()
+        return exc.value.code, tmp_path
+    return run
+
+def test_source_status_and_exit_code():
+    assert snapshot_cli.source_status({'value': 1}) == 'ok'
+    assert snapshot_cli.source_status({'error': 'Using fallback data'}) == 'error'
+    assert snapshot_cli.source_status(SourceError('timeout')) == 'timeout'
+    assert snapshot_cli.source_status(SourceError('boom')) == 'error'
+    assert snapshot_cli.exit_code(ALL_OK) == 0
+    assert snapshot_cli.exit_code(dict(ALL_OK, news='error', food='timeout')) == 2 | 8
+
+def test_snapshots_in_the_same_second_do_not_overwrite(tmp_path):
+    first = snapshot_cli.write_snapshot(fake_snapshot(ALL_OK, 'snapshot-aaaaaa'), str(tmp_path))
+    second = snapshot_cli.write_snapshot(fake_snapshot(ALL_OK, 'snapshot-bbbbbb'), str(tmp_path))
+    third = snapshot_cli.write_snapshot(
+        fake_snapshot(ALL_OK, 'snapshot-aaaaaa', '2026-01-02T03:04:05.654321'), str(tmp_path))
+    assert len({first, second, third}) == 3
+    assert first.name == 'threat-20260102-030405-123456-aaaaaa.json'
+    assert json.loads((tmp_path / 'latest.json').read_text())['timestamp'].endswith('654321')
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('.tmp-')]
+
+def test_successful_run_updates_latest(run_cli):
+    code, output = run_cli(ALL_OK)
+    assert code == 0
+    assert json.loads((output / 'latest.json').read_text())['task_id'] == 'snapshot-abc123def456'
+
+def test_partial_failure_still_updates_latest(run_cli):
+    code, output = run_cli(dict(ALL_OK, gold='error'))
+    assert code == 4
+    assert (output / 'latest.json').exists()
+
+def test_all_sources_failed_keeps_previous_latest(run_cli):
+    code, output = run_cli({source: 'error' for source in ALL_OK})
+    assert code == 15
+    assert not (output / 'latest.json').exists()
+    assert len(list(output.glob('threat-*.json'))) == 1
+
+def test_source_subset_does_not_replace_latest_unless_forced(run_cli):
+    code, output = run_cli({'military': 'ok'}, '--source', 'military')
+    assert code == 0
+    assert not (output / 'latest.json').exists()
+
+    code, output = run_cli({'military': 'ok'}, '--source', 'military', '--force-latest')
+    assert (output / 'latest.json').exists()
+
+def test_timeout_exits_immediately_with_source_bits(run_cli):
+    code, output = run_cli(dict(ALL_OK, military='timeout'))
+    assert code == 1
+    assert (output / 'latest.json').exists()
+
+def test_write_failure_adds_exit_bit(run_cli, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+    monkeypatch.setattr(snapshot_cli, 'write_snapshot', fail)
+    code, _ = run_cli(dict(ALL_OK, news='error'))
+    assert code == 2 | snapshot_cli.EXIT_WRITE_FAILED
@@ -0,0 +1,58 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+import app as app_module
+from utils import static_assets
+
+def test_committed_bundles_match_sources():
+    """Vercel 部署沒有建置步驟，static/dist 必須隨原始檔一起提交；修改 JS/CSS 後請重新執行 python -m utils.static_assets"""
+    if not static_assets.MINIFIER_AVAILABLE:
+        pytest.skip('rjsmin/rcssmin 未安裝，無法重現提交的壓縮結果')
+    manifest = json.loads(static_assets.MANIFEST_PATH.read_text(encoding='utf-8'))
+    assert set(manifest) == set(static_assets.BUNDLES)
+    for name, sources in static_assets.BUNDLES.items():
+        content = static_assets.build_bundle(name, sources)
+        stem, ext = os.path.splitext(name)
+        assert manifest[name] == f"dist/{stem}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+        assert (static_assets.STATIC_DIR / manifest[name]).read_bytes() == content
+
+def test_build_assets_writes_manifest_and_prunes_old_generations(tmp_path, monkeypatch):
+    for source in ('css/style.css', 'css/font-fix.css', 'js/main.js', 'js/cyber-effects.js', 'js/percentage-fix.js'):
+        (tmp_path / source).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / source).write_text(f"/* {source} */\nvar a = 1;\n", encoding='utf-8')
+    monkeypatch.setattr(static_assets, 'STATIC_DIR', tmp_path)
+    monkeypatch.setattr(static_assets, 'MANIFEST_PATH', tmp_path / 'dist' / 'manifest.json')
+    monkeypatch.setattr(static_assets, '_manifest_cache', {'mtime': None, 'entries': {}})
+
+    first = static_assets.build_assets()
+    assert static_assets.asset_paths('app.js') == [first['app.js']]
+    assert static_assets.build_assets() == first
+
+    (tmp_path / 'js/main.js').write_text('var b = 2;\n', encoding='utf-8')
+    second = static_assets.build_assets()
+    (tmp_path / 'js/main.js').write_text('var c = 3;\n', encoding='utf-8')
+    third = static_assets.build_assets()
+
+    remaining = {path.name for path in (tmp_path / 'dist').iterdir()}
+    # 保留目前與上一版供滾動部署使用，更早的版本會被刪除
+    assert os.path.basename(third['app.js']) in remaining
+    assert os.path.basename(second['app.js']) in remaining
+    assert os.path.basename(first['app.js']) not in remaining
+
+def test_missing_manifest_falls_back_to_sources(tmp_path, monkeypatch):
+    monkeypatch.setattr(static_assets, 'MANIFEST_PATH', tmp_path / 'missing.json')
+    assert static_assets.asset_paths('app.js') == static_assets.BUNDLES['app.js']
+
+def test_only_fingerprinted_files_get_immutable_cache():
+    manifest = static_assets.load_manifest()
+    client = app_module.app.test_client()
+    hashed = client.get(f"/static/{manifest['app.js']}")
+    assert hashed.headers['Cache-Control'] == static_assets.IMMUTABLE_CACHE_CONTROL
+    hashed.close()
+    for path in ('/static/dist/manifest.json', '/static/js/main.js'):
+        response = client.get(path)
+        assert response.headers.get('Cache-Control') != static_assets.IMMUTABLE_CACHE_CONTROL
+        response.close()
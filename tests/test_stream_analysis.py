@@ -0,0 +1,86 @@
+import json
+import threading
+
+import pytest
+
+import app as app_module
+from analyzer import pipeline
+
+MILITARY = {
+    'total_incursions_last_week': 20, 'latest_aircrafts': 5, 'latest_ships': 2,
+    'daily_incursions_chart_data': {'labels': [], 'data': []}, 'keyword_hits': {}
+}
+NEWS = {
+    'economic_news': [], 'diplomatic_news': [], 'public_opinion_news': [],
+    'sources': [], 'total_articles': 0, 'keyword_hits': {}
+}
+QUOTE = {'previous_close': 100.0, 'daily_change_percent': 0.5}
+
+@pytest.fixture
+def release():
+    """讓模擬的慢速爬蟲在測試結束時立即返回"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+@pytest.fixture
+def scrapers(monkeypatch, release):
+    def slow_gold():
+        release.wait(5)
+        return dict(QUOTE, current_price=2000.0)
+
+    fake = {
+        'military': lambda: MILITARY,
+        'news': lambda: NEWS,
+        'gold': slow_gold,
+        'food': lambda: dict(QUOTE, wheat_price=6.0)
+    }
+    monkeypatch.setattr(pipeline, 'SOURCE_SCRAPERS', fake)
+    return fake
+
+def _events(response):
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def test_stream_emits_events_in_order(scrapers):
+    client = app_module.app.test_client()
+    events = _events(client.get('/analyze/stream?budget=1&simulate=1&language=en'))
+    names = [event['event'] for event in events]
+
+    assert names[0] == 'start'
+    assert names[1:5] == ['source'] * 4
+    assert names[5:7] == ['indicators', 'distribution']
+    assert names[-2:] == ['report', 'done']
+    assert set(names[7:-2]) == {'report_chunk'}
+
+    sources = {event['source']: event['data'] for event in events if event['event'] == 'source'}
+    assert set(sources) == {'military', 'news', 'gold', 'food'}
+    # 慢速來源在爬蟲預算（六成）到期後以逾時回報，且排在已完成的來源之後
+    assert [event['source'] for event in events[1:5]][-1] == 'gold'
+    assert sources['gold'] == {'error': pipeline.SOURCE_TIMEOUT_ERROR}
+    assert events[-1]['timed_out_sources'] == ['gold']
+    assert events[5]['indicators']['military'] > 0
+    assert events[-2]['report'] == ''.join(event['text'] for event in events if event['event'] == 'report_chunk')
+
+def test_stream_skips_llm_when_budget_is_too_short(scrapers, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('預算不足時不應呼叫 OpenAI')
+    monkeypatch.setattr(pipeline, 'stream_ai_report', fail)
+    events = list(pipeline.stream_analysis(0.5))
+    assert [event['event'] for event in events][-3:] == ['report_chunk', 'report', 'done']
+
+@pytest.mark.parametrize('budget', ['nan', 'inf', '-1', '0', 'abc'])
+def test_invalid_budget_is_rejected(budget):
+    response = app_module.app.test_client().get(f'/analyze/stream?budget={budget}')
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('body', [[1], 'budget', 5])
+def test_non_object_json_body_is_rejected(body):
+    response = app_module.app.test_client().post('/analyze/stream', json=body)
+    assert response.status_code == 400
+
+def test_budget_is_capped(scrapers, monkeypatch):
+    monkeypatch.setattr(pipeline, 'SOURCE_SCRAPERS', dict(scrapers, gold=lambda: dict(QUOTE, current_price=1.0)))
+    events = _events(app_module.app.test_client().post('/analyze/stream', json={'budget': 1e9}))
+    assert events[0] == {'event': 'start', 'budget_seconds': app_module.ANALYZE_STREAM_MAX_BUDGET}
+    assert events[-1]['timed_out_sources'] == []
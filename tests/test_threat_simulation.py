@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from analyzer.indicator_calculator import calculate_threat_probability
+from analyzer.threat_simulation import PERCENTILES, _weighted_percentiles, simulate_threat_distribution
+
+INDICATORS = {'military': 60.0, 'economic': 30.0, 'news': 45.0}
+RELIABLE = {source: {'value': 1} for source in ('military', 'gold', 'food', 'news')}
+
+def test_histogram_percentiles_match_numpy():
+    levels = np.random.default_rng(0).uniform(0, 100, 100_000).astype(np.float32)
+    rounded = np.rint(levels * 100) / 100
+    expected = np.percentile(rounded, PERCENTILES, method='inverted_cdf')
+    assert _weighted_percentiles(levels, PERCENTILES) == pytest.approx(expected, abs=0.01)
+
+def test_seeded_simulation_is_reproducible():
+    first = simulate_threat_distribution(INDICATORS, RELIABLE, samples=50_000, seed=7)
+    assert first == simulate_threat_distribution(INDICATORS, RELIABLE, samples=50_000, seed=7)
+    assert first['samples'] == 50_000
+    assert list(first['percentiles']) == [f"p{p}" for p in PERCENTILES]
+
+def test_distribution_is_centered_on_point_estimate():
+    result = simulate_threat_distribution(INDICATORS, RELIABLE, samples=200_000, seed=1)
+    point = calculate_threat_probability(INDICATORS)
+    assert result['mean'] == pytest.approx(point, abs=0.5)
+    percentiles = list(result['percentiles'].values())
+    assert percentiles == sorted(percentiles)
+    assert percentiles[0] < point < percentiles[-1]
+
+def test_fallback_sources_widen_the_band():
+    reliable = simulate_threat_distribution(INDICATORS, RELIABLE, samples=100_000, seed=2)
+    raw_data = dict(RELIABLE, news={'error': 'Using fallback data'})
+    uncertain = simulate_threat_distribution(INDICATORS, raw_data, samples=100_000, seed=2)
+    assert uncertain['uncertain_indicators'] == ['news']
+    assert uncertain['std'] > reliable['std']
+
+def test_odd_sample_count_drops_the_unpaired_antithetic_sample():
+    result = simulate_threat_distribution(INDICATORS, RELIABLE, samples=10_001, seed=3)
+    assert result['samples'] == 10_001
+    assert result['mean'] == pytest.approx(calculate_threat_probability(INDICATORS), abs=0.5)
+
+def test_analyze_rejects_non_object_json_without_creating_a_task():
+    import app as app_module
+    before = len(app_module.tasks)
+    response = app_module.app.test_client().post('/analyze', json=[1])
+    assert response.status_code == 400
+    assert len(app_module.tasks) == before
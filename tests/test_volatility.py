@@ -0,0 +1,79 @@
+import math
+from array import array
+
+import numpy as np
+import pytest
+
+from analyzer.volatility import (
+    JUMP_THRESHOLD, REFERENCE_VOLATILITY, TRADING_DAYS_PER_YEAR, TRADING_SECONDS_PER_DAY,
+    compute_volatility_metrics, intraday_economic_score, stack_series, volatility_scores
+)
+
+INTERVAL = 300
+
+def reference_metrics(closes, interval_seconds):
+    """逐筆計算的參考實作"""
+    returns = [math.log(b / a) for a, b in zip(closes, closes[1:])]
+    variance = sum(r * r for r in returns) / len(returns)
+    volatility = math.sqrt(variance * TRADING_DAYS_PER_YEAR * TRADING_SECONDS_PER_DAY / interval_seconds)
+    peak, drawdown = closes[0], 0.0
+    for price in closes:
+        peak = max(peak, price)
+        drawdown = max(drawdown, 1 - price / peak)
+    return volatility, drawdown
+
+def test_matches_reference_implementation():
+    rng = np.random.default_rng(0)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, size=(3, 200)), axis=1))
+    metrics = compute_volatility_metrics(closes, INTERVAL)
+    for row in range(3):
+        volatility, drawdown = reference_metrics(list(closes[row]), INTERVAL)
+        assert metrics['realized_volatility'][row] == pytest.approx(volatility)
+        assert metrics['max_drawdown'][row] == pytest.approx(drawdown)
+
+def test_detects_single_jump():
+    rng = np.random.default_rng(1)
+    returns = rng.normal(0, 0.001, 100)
+    returns[50] = 0.05
+    closes = 100 * np.exp(np.concatenate([[0], np.cumsum(returns)]))
+    metrics = compute_volatility_metrics(closes, INTERVAL)
+    assert metrics['jump_count'][0] == 1
+    assert metrics['max_jump_z'][0] > JUMP_THRESHOLD
+
+def test_nan_gaps_are_ignored():
+    closes = np.array([[100.0, 101.0, np.nan, 101.0, 102.0]])
+    metrics = compute_volatility_metrics(closes, INTERVAL)
+    # 跨越缺值的兩個報酬率被忽略，只剩 100→101 與 101→102
+    variance = (math.log(101 / 100) ** 2 + math.log(102 / 101) ** 2) / 2
+    expected = math.sqrt(variance * TRADING_DAYS_PER_YEAR * TRADING_SECONDS_PER_DAY / INTERVAL)
+    assert metrics['realized_volatility'][0] == pytest.approx(expected)
+    assert metrics['jump_count'][0] == 0
+
+def test_stack_series_pads_with_nan():
+    matrix = stack_series([array('d', [1.0, 2.0, 3.0]), [4.0]])
+    assert matrix.shape == (2, 3)
+    assert np.isnan(matrix[1, 1:]).all()
+
+def test_insufficient_data_scores_zero():
+    metrics = compute_volatility_metrics(stack_series([[100.0, 101.0], [np.nan]]), INTERVAL)
+    assert metrics['realized_volatility'].tolist() == [0.0, 0.0]
+    assert metrics['max_drawdown'].tolist() == [0.0, 0.0]
+
+def test_scores_are_clipped_and_reference_volatility_scores_30():
+    metrics = {
+        'realized_volatility': np.array([REFERENCE_VOLATILITY['gold'], 10.0]),
+        'max_drawdown': np.array([0.0, 0.0]),
+        'jump_count': np.array([0, 0])
+    }
+    scores = volatility_scores(metrics, np.array([REFERENCE_VOLATILITY['gold']] * 2))
+    assert scores.tolist() == [pytest.approx(30.0), 100.0]
+
+def test_intraday_economic_score_is_weighted_and_finite():
+    flat = {'closes': array('d', [100.0] * 50), 'interval_seconds': INTERVAL}
+    assert intraday_economic_score({'gold': flat, 'food': flat}) == 0.0
+
+    crash = {'closes': array('d', [100.0 - i for i in range(50)]), 'interval_seconds': INTERVAL}
+    only_food = intraday_economic_score({'gold': flat, 'food': crash})
+    only_gold = intraday_economic_score({'gold': crash, 'food': flat})
+    # 糧食權重 15、黃金權重 10
+    assert only_food > only_gold > 0
@@ -0,0 +1,180 @@
+"""
+儀表板狀態的版本化差異同步
+
+每個儀表板區塊（各指標、各資料來源、威脅等級、報告）各自記錄最後變動的版本號，
+用戶端帶著已知版本查詢時只回傳之後變動過的區塊。區塊內容在發布時即編碼為 JSON 片段，
+查詢時直接拼接，不必每次重新序列化整份報告。
+
+狀態保存在 SQLite（預設 data/dashboard.db），同一台主機上的所有 worker 共用同一組版本號；
+epoch 為資料庫建立時產生的識別碼，用戶端的 epoch 不符（資料庫被清除或換了主機）時回傳完整狀態。
+多台主機各自有獨立的資料庫，負載平衡跨主機時仍會收到完整狀態。
+"""
+import os
+import uuid
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from utils.json_codec import dumps
+from utils.models import NEWS_CATEGORIES, TaskRecord
+
+def _source_error(data: Any) -> Optional[str]:
+    return data.get('error') if data is not None else '無資料'
+
+def build_sections(task: TaskRecord) -> Dict[str, Any]:
+    """將完成的任務轉換為儀表板區塊，只保留前端顯示所需的欄位"""
+    raw_data = task.raw_data or {}
+    sections: Dict[str, Any] = {}
+
+    if task.indicators is not None:
+        for name in ('military', 'economic', 'news'):
+            sections[f"indicators.{name}"] = task.indicators.get(name, 0)
+
+    if task.threat_level is not None:
+        distribution = task.threat_distribution or {}
+        sections['threat_level'] = {
+            'level': task.threat_level,
+            'percentiles': distribution.get('percentiles')
+        }
+
+    if task.report is not None:
+        sections['report'] = {'zh': task.report, 'en': task.report_en, 'pdf': task.report_pdf}
+
+    military = raw_data.get('military')
+    if military is not None:
+        sections['source.military'] = {
+            'total_incursions_last_week': military.get('total_incursions_last_week', 0),
+            'latest_aircrafts': military.get('latest_aircrafts', 0),
+            'latest_ships': military.get('latest_ships', 0),
+            'error': _source_error(military)
+        }
+
+    for kind, price_key in (('gold', 'current_price'), ('food', 'wheat_price')):
+        quote = raw_data.get(kind)
+        if quote is not None:
+            sections[f"source.{kind}"] = {
+                price_key: quote.get(price_key),
+                'daily_change_percent': quote.get('daily_change_percent', 0),
+                'error': _source_error(quote)
+            }
+
+    news = raw_data.get('news')
+    if news is not None:
+        summary = {category: len(news.get(category, ())) for category in NEWS_CATEGORIES}
+        summary['total_articles'] = news.get('total_articles', 0)
+        summary['error'] = _source_error(news)
+        sections['source.news'] = summary
+
+    return sections
+
+class DashboardState:
+    """
+    各區塊的最新內容與版本號，保存在 SQLite 中，同一台主機上的所有 worker 共用同一份狀態；
+    版本號在資料庫內單調遞增，epoch 在資料庫建立時產生
+    """
+
+    def __init__(self, file_path: Optional[str] = None):
+        self.file_path = Path(file_path or os.getenv('DASHBOARD_DB_PATH', 'data/dashboard.db'))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """第一次使用時才連線；fork 後（例如 gunicorn --preload）各 worker 重新建立連線"""
+        if self._conn is None or self._pid != os.getpid():
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            # 自行管理交易，publish 以 BEGIN IMMEDIATE 在程序間序列化版本遞增
+            conn = sqlite3.connect(str(self.file_path), check_same_thread=False, timeout=10,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS dashboard_meta (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    epoch TEXT NOT NULL,
+                    version INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS dashboard_sections (
+                    name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    digest BLOB NOT NULL,
+                    fragment BLOB NOT NULL
+                );
+                """
+            )
+            conn.execute("INSERT OR IGNORE INTO dashboard_meta (id, epoch, version) VALUES (1, ?, 0)",
+                         (uuid.uuid4().hex[:12],))
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    @property
+    def epoch(self) -> str:
+        with self._lock:
+            return self._connection().execute("SELECT epoch FROM dashboard_meta").fetchone()[0]
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT version FROM dashboard_meta").fetchone()[0]
+
+    def publish(self, sections: Dict[str, Any]) -> int:
+        """更新區塊內容；內容未變的區塊保留原版本號。回傳目前版本"""
+        encoded = {name: dumps(value) for name, value in sections.items()}
+        digests = {name: hashlib.blake2b(fragment, digest_size=16).digest() for name, fragment in encoded.items()}
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = dict(conn.execute("SELECT name, digest FROM dashboard_sections"))
+                version = conn.execute("SELECT version FROM dashboard_meta").fetchone()[0]
+                changed = [name for name in encoded if current.get(name) != digests[name]]
+                if changed:
+                    version += 1
+                    conn.execute("UPDATE dashboard_meta SET version = ?", (version,))
+                    conn.executemany(
+                        """
+                        INSERT INTO dashboard_sections (name, version, digest, fragment) VALUES (?, ?, ?, ?)
+                        ON CONFLICT (name) DO UPDATE SET
+                            version = excluded.version, digest = excluded.digest, fragment = excluded.fragment
+                        """,
+                        [(name, version, digests[name], encoded[name]) for name in changed]
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return version
+
+    def changes_since(self, since: int = 0, epoch: Optional[str] = None) -> bytes:
+        """
+        回傳 JSON 編碼的差異：{"epoch", "version", "full", "sections": {名稱: 內容}}。
+        full 為 true 時 sections 為完整狀態，用戶端應以此取代本地狀態（包含移除不在其中的區塊）。
+        """
+        with self._lock:
+            conn = self._connection()
+            # 在同一個讀取交易中取得版本與區塊，避免與其他 worker 的 publish 交錯
+            conn.execute("BEGIN")
+            try:
+                current_epoch, version = conn.execute("SELECT epoch, version FROM dashboard_meta").fetchone()
+                full = epoch != current_epoch or since < 0 or since > version
+                rows = conn.execute(
+                    "SELECT name, fragment FROM dashboard_sections WHERE version > ? ORDER BY name",
+                    (0 if full else since,)
+                ).fetchall()
+            finally:
+                conn.execute("COMMIT")
+        fragments = [dumps(name) + b':' + bytes(fragment) for name, fragment in rows]
+        header = dumps({'epoch': current_epoch, 'version': version, 'full': full})
+        return header[:-1] + b',"sections":{' + b','.join(fragments) + b'}}'
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+# 所有 worker 共用的儀表板狀態（DASHBOARD_DB_PATH 指定 SQLite 路徑）
+dashboard = DashboardState()
@@ -0,0 +1,77 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Iterable, List, Tuple, Optional
+
+class IncursionStore:
+    """
+    以 SQLite 保存每日共機/共艦數量，供長期基準線使用
+    """
+
+    def __init__(self, file_path: Optional[str] = None):
+        self.file_path = Path(file_path or os.getenv('INCURSION_DB_PATH', 'data/incursions.db'))
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.file_path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS incursions (
+                date TEXT PRIMARY KEY,
+                aircrafts INTEGER NOT NULL,
+                ships INTEGER NOT NULL,
+                title TEXT,
+                fetched_at TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def bulk_upsert(self, records: Iterable[Tuple[str, int, int, str]]) -> int:
+        """
+        批次寫入 (date, aircrafts, ships, title)，同日期以新資料覆蓋；
+        但 0 架次/0 艘的資料不會覆蓋已有非零數量的紀錄（同日可能有多則公告）
+        """
+        fetched_at = datetime.now().isoformat()
+        rows = [(date, aircrafts, ships, title, fetched_at) for date, aircrafts, ships, title in records]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO incursions (date, aircrafts, ships, title, fetched_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (date) DO UPDATE SET
+                    aircrafts = excluded.aircrafts,
+                    ships = excluded.ships,
+                    title = excluded.title,
+                    fetched_at = excluded.fetched_at
+                WHERE excluded.aircrafts + excluded.ships > 0
+                   OR incursions.aircrafts + incursions.ships = 0
+                """,
+                rows
+            )
+        return len(rows)
+
+    def get(self, date: str) -> Optional[Tuple[str, int, int, str]]:
+        """取得單日紀錄 (date, aircrafts, ships, title)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT date, aircrafts, ships, title FROM incursions WHERE date = ?", (date,)
+            ).fetchone()
+
+    def get_range(self, start_date: str, end_date: str) -> List[Tuple[str, int, int]]:
+        """取得日期區間內（含端點，YYYY-MM-DD）的每日數量"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT date, aircrafts, ships FROM incursions WHERE date BETWEEN ? AND ? ORDER BY date",
+                (start_date, end_date)
+            )
+            return cursor.fetchall()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM incursions").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,38 @@
+"""
+JSON 編碼：有安裝 orjson 時使用其快速路徑，否則退回標準庫 json。
+模型物件（具備 to_dict() 者）會自動轉換。
+"""
+import json
+import logging
+from typing import Any
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logging.info("orjson 未安裝，JSON 編碼使用標準庫。")
+
+def _default(obj: Any) -> Any:
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"無法序列化型別 {type(obj).__name__}")
+
+def dumps(obj: Any) -> bytes:
+    """將物件編碼為 UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def loads(data: Any) -> Any:
+    """解碼 JSON（bytes 或 str）"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_response(obj: Any, status: int = 200):
+    """建立 Flask JSON 回應，取代 jsonify 以使用快速編碼路徑"""
+    from flask import current_app
+    return current_app.response_class(dumps(obj), status=status, mimetype='application/json')
@@ -0,0 +1,170 @@
+"""
+多關鍵字比對：以 Aho-Corasick 自動機一次掃描文字，回傳每個詞條的命中次數。
+自動機只在建立時編譯一次，掃描時間與文字長度成正比，不隨詞條數量增加。
+
+預設的威脅詞典為 THREAT_TERMS（詞條 → 權重）；可用環境變數 THREAT_TERMS_PATH
+指向 JSON 檔（{"詞條": 權重}）覆寫或新增詞條，權重設為 0 即停用該詞條；
+負權重用來抵銷例行用語中內含的詞條（例如「岸置飛彈」內含「飛彈」）。
+"""
+import os
+import json
+import logging
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional
+
+# 預設威脅詞典：權重代表單次出現的嚴重程度
+THREAT_TERMS: Dict[str, float] = {
+    # 軍事行動
+    '聯合戰備警巡': 5.0,
+    '封鎖': 5.0,
+    '實彈': 4.0,
+    '演習': 3.0,
+    '軍演': 3.0,
+    '戰備': 3.0,
+    '逾越中線': 4.0,
+    '海峽中線': 2.0,
+    '飛彈': 4.0,
+    '導彈': 4.0,
+    '航艦': 3.0,
+    '航母': 3.0,
+    '登陸': 3.0,
+    '無人機': 2.0,
+    '海警': 2.0,
+    '空飄氣球': 1.0,
+    '擾台': 2.0,
+    # 國防部每日動態的固定寫法（偵獲共機/共艦、國軍以岸置飛彈系統應處）不列入計分，
+    # 否則例行公告就會把軍事詞條加分推到上限，無法反映真正的升溫
+    '岸置飛彈': -4.0,
+    # 政治與經濟施壓
+    '武統': 4.0,
+    '制裁': 2.0,
+    '禁運': 3.0,
+    '斷交': 3.0,
+    '關稅': 1.0,
+    '灰色地帶': 2.0,
+    '統戰': 1.0,
+    # 英文報導
+    'blockade': 5.0,
+    'live-fire': 4.0,
+    'military drill': 3.0,
+    'missile': 4.0,
+    'sanctions': 2.0,
+}
+
+class KeywordMatcher:
+    """
+    Aho-Corasick 自動機。英文詞條不分大小寫；重疊的詞條會分別計數
+    （例如「聯合戰備警巡」同時計入「聯合戰備警巡」與「戰備」）。
+    """
+
+    def __init__(self, terms: Mapping[str, float]):
+        self.terms: List[str] = []
+        self.weights: Dict[str, float] = {}
+        # goto[狀態] = {字元: 下一狀態}；fail 為失敗連結；output 為該狀態結束的詞條索引（含失敗鏈上的詞條）
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[tuple] = [()]
+        for term, weight in terms.items():
+            key = term.strip().lower()
+            if not key or not weight or key in self.weights:
+                continue
+            self._insert(key, len(self.terms))
+            self.terms.append(key)
+            self.weights[key] = float(weight)
+        self._alphabet = frozenset(ch for transitions in self._goto for ch in transitions)
+        self._build_failure_links()
+
+    def _insert(self, term: str, index: int) -> None:
+        state = 0
+        for ch in term:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = self._output[state] + (index,)
+
+    def _build_failure_links(self) -> None:
+        """廣度優先建立失敗連結，並把失敗鏈上的輸出合併進來，掃描時不必再沿鏈尋找"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                # 第一層節點的失敗連結指向根節點
+                self._fail[child] = 0 if target == child else target
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+                queue.append(child)
+
+    def _scan_into(self, text: str, counts: List[int]) -> None:
+        goto, fail, output, alphabet = self._goto, self._fail, self._output, self._alphabet
+        state = 0
+        for ch in text.lower():
+            if ch not in alphabet:
+                # 不在任何詞條中的字元必定回到根節點
+                state = 0
+                continue
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in output[state]:
+                counts[index] += 1
+
+    def scan(self, text: str) -> Dict[str, int]:
+        """單段文字的各詞條命中次數（只列出命中的詞條）"""
+        return self.scan_many((text,))
+
+    def scan_many(self, texts: Iterable[Optional[str]]) -> Dict[str, int]:
+        """多段文字的命中次數總和"""
+        counts = [0] * len(self.terms)
+        for text in texts:
+            if text:
+                self._scan_into(text, counts)
+        return {term: count for term, count in zip(self.terms, counts) if count}
+
+    def contains_any(self, text: str) -> bool:
+        """是否命中任一詞條（命中即停止掃描）"""
+        goto, fail, output, alphabet = self._goto, self._fail, self._output, self._alphabet
+        state = 0
+        for ch in text.lower():
+            if ch not in alphabet:
+                state = 0
+                continue
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                return True
+        return False
+
+    def weighted_score(self, hits: Mapping[str, int]) -> float:
+        """依詞條權重加總命中次數；不在詞典中的詞條忽略"""
+        return sum(self.weights.get(term.lower(), 0.0) * count for term, count in hits.items())
+
+def load_threat_terms(path: Optional[str] = None) -> Dict[str, float]:
+    """預設詞典，並合併 THREAT_TERMS_PATH 指定的 JSON 詞典"""
+    terms = dict(THREAT_TERMS)
+    path = path or os.getenv('THREAT_TERMS_PATH')
+    if not path:
+        return terms
+    try:
+        with open(path, encoding='utf-8') as f:
+            extra = json.load(f)
+        if not isinstance(extra, dict):
+            raise ValueError("詞典應為 {詞條: 權重} 格式")
+        terms.update({str(term): float(weight) for term, weight in extra.items()})
+    except (OSError, ValueError, TypeError) as e:
+        logging.error(f"載入威脅詞典 {path} 失敗，使用預設詞典: {e}")
+    return terms
+
+@lru_cache(maxsize=1)
+def threat_matcher() -> KeywordMatcher:
+    """程序內共用的威脅詞典自動機（只編譯一次）"""
+    return KeywordMatcher(load_threat_terms())
@@ -0,0 +1,479 @@
+"""
+精簡的型別化結果模型
+
+爬蟲、指標與任務原本皆以巢狀 dict 傳遞；這裡改用 __slots__ 類別保存，
+在爬蟲邊界進行結構驗證，並透過 to_dict() 輸出與原本相同的 JSON 結構。
+各模型也提供與 dict 相容的 get()，既有的分析函數可以直接使用。
+"""
+import math
+from abc import ABC, abstractmethod
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+class ModelValidationError(ValueError):
+    """爬蟲輸出不符合預期結構"""
+
+_NUMBER_TYPES = (int, float)
+
+def _number(model: str, data: Dict[str, Any], key: str, default: Optional[float] = None) -> float:
+    value = data.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, _NUMBER_TYPES):
+        raise ModelValidationError(f"{model}.{key} 應為數值，實際為 {type(value).__name__}")
+    return value
+
+def _integer(model: str, data: Dict[str, Any], key: str, default: Optional[int] = None) -> int:
+    value = data.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ModelValidationError(f"{model}.{key} 應為整數，實際為 {type(value).__name__}")
+    return value
+
+def _text(model: str, data: Dict[str, Any], key: str, default: Optional[str] = None) -> Optional[str]:
+    value = data.get(key, default)
+    if value is not None and not isinstance(value, str):
+        raise ModelValidationError(f"{model}.{key} 應為字串，實際為 {type(value).__name__}")
+    return value
+
+def _mapping(model: str, data: Any) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        raise ModelValidationError(f"{model} 應為 dict，實際為 {type(data).__name__}")
+    return data
+
+def _keyword_hits(model: str, data: Dict[str, Any]) -> Dict[str, int]:
+    hits = _mapping(f"{model}.keyword_hits", data.get('keyword_hits', {}))
+    if not all(isinstance(term, str) and isinstance(count, int) and not isinstance(count, bool)
+               for term, count in hits.items()):
+        raise ModelValidationError(f"{model}.keyword_hits 應為 {{詞條: 次數}}")
+    return dict(hits)
+
+class _SlotsModel(ABC):
+    """共用的 get()/相等比較，子類別需定義 __slots__ 與 to_dict()"""
+    __slots__ = ()
+
+    # 模型為可變物件，依內容比較相等，因此不可雜湊
+    __hash__ = None  # type: ignore[assignment]
+
+    # 對外 JSON 欄位名稱與內部屬性名稱不同時的對照
+    _aliases: Dict[str, str] = {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        attr = self._aliases.get(key, key)
+        if attr in self.__slots__:
+            value = getattr(self, attr)
+            return default if value is None else value
+        return self.to_dict().get(key, default)
+
+    @abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        """輸出與原本 dict 結構相同的 JSON 相容資料"""
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, s) == getattr(other, s) for s in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{s}={getattr(self, s)!r}" for s in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+class SourceError(_SlotsModel):
+    """爬蟲執行失敗時的佔位結果"""
+    __slots__ = ('error',)
+
+    def __init__(self, error: str):
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"error": self.error}
+
+class MilitaryData(_SlotsModel):
+    __slots__ = ('total_incursions_last_week', 'latest_aircrafts', 'latest_ships',
+                 'chart_labels', 'chart_data', 'keyword_hits', 'keyword_reports', 'source_url', 'error')
+
+    def __init__(self, total_incursions_last_week: int, latest_aircrafts: int, latest_ships: int,
+                 chart_labels: Tuple[str, ...] = (), chart_data: Tuple[int, ...] = (),
+                 keyword_hits: Optional[Dict[str, int]] = None, keyword_reports: int = 0,
+                 source_url: Optional[str] = None, error: Optional[str] = None):
+        self.total_incursions_last_week = total_incursions_last_week
+        self.latest_aircrafts = latest_aircrafts
+        self.latest_ships = latest_ships
+        self.chart_labels = chart_labels
+        self.chart_data = chart_data
+        self.keyword_hits = keyword_hits or {}
+        # keyword_hits 涵蓋的公告數量，用來換算每則公告的平均命中
+        self.keyword_reports = keyword_reports
+        self.source_url = source_url
+        self.error = error
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MilitaryData':
+        name = cls.__name__
+        data = _mapping(name, data)
+        chart = _mapping(f"{name}.daily_incursions_chart_data", data.get('daily_incursions_chart_data', {}))
+        labels = chart.get('labels', [])
+        values = chart.get('data', [])
+        if not all(isinstance(label, str) for label in labels):
+            raise ModelValidationError(f"{name}.daily_incursions_chart_data.labels 應為字串列表")
+        if not all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+            raise ModelValidationError(f"{name}.daily_incursions_chart_data.data 應為整數列表")
+        return cls(
+            total_incursions_last_week=_integer(name, data, 'total_incursions_last_week'),
+            latest_aircrafts=_integer(name, data, 'latest_aircrafts'),
+            latest_ships=_integer(name, data, 'latest_ships'),
+            chart_labels=tuple(labels),
+            chart_data=tuple(values),
+            keyword_hits=_keyword_hits(name, data),
+            keyword_reports=_integer(name, data, 'keyword_reports', 0),
+            source_url=_text(name, data, 'source_url'),
+            error=_text(name, data, 'error')
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "total_incursions_last_week": self.total_incursions_last_week,
+            "latest_aircrafts": self.latest_aircrafts,
+            "latest_ships": self.latest_ships,
+            "daily_incursions_chart_data": {
+                "labels": list(self.chart_labels),
+                "data": list(self.chart_data)
+            },
+            "keyword_hits": self.keyword_hits,
+            "source_url": self.source_url
+        }
+        if self.keyword_reports:
+            result["keyword_reports"] = self.keyword_reports
+        if self.error:
+            result["error"] = self.error
+        return result
+
+class NewsArticle(_SlotsModel):
+    __slots__ = ('title', 'url', 'published_date', 'source', 'snippet')
+
+    def __init__(self, title: str, url: str, published_date: str = '', source: str = '', snippet: str = ''):
+        self.title = title
+        self.url = url
+        self.published_date = published_date
+        self.source = source
+        self.snippet = snippet
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'NewsArticle':
+        name = cls.__name__
+        data = _mapping(name, data)
+        title = _text(name, data, 'title')
+        url = _text(name, data, 'url')
+        if not title or url is None:
+            raise ModelValidationError(f"{name} 缺少 title 或 url")
+        return cls(
+            title=title,
+            url=url,
+            published_date=_text(name, data, 'published_date', '') or '',
+            source=_text(name, data, 'source', '') or '',
+            snippet=_text(name, data, 'snippet', '') or ''
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'title': self.title,
+            'url': self.url,
+            'published_date': self.published_date,
+            'source': self.source,
+            'snippet': self.snippet
+        }
+
+NEWS_CATEGORIES = ('economic_news', 'diplomatic_news', 'public_opinion_news')
+
+class NewsData(_SlotsModel):
+    __slots__ = ('economic_news', 'diplomatic_news', 'public_opinion_news',
+                 'sources', 'total_articles', 'keyword_hits', 'error')
+
+    def __init__(self, economic_news: Tuple[NewsArticle, ...] = (),
+                 diplomatic_news: Tuple[NewsArticle, ...] = (),
+                 public_opinion_news: Tuple[NewsArticle, ...] = (),
+                 sources: Tuple[str, ...] = (), total_articles: int = 0,
+                 keyword_hits: Optional[Dict[str, int]] = None, error: Optional[str] = None):
+        self.economic_news = economic_news
+        self.diplomatic_news = diplomatic_news
+        self.public_opinion_news = public_opinion_news
+        self.sources = sources
+        self.total_articles = total_articles
+        self.keyword_hits = keyword_hits or {}
+        self.error = error
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'NewsData':
+        name = cls.__name__
+        data = _mapping(name, data)
+        categories = {}
+        for category in NEWS_CATEGORIES:
+            articles = data.get(category, [])
+            if not isinstance(articles, list):
+                raise ModelValidationError(f"{name}.{category} 應為列表")
+            categories[category] = tuple(NewsArticle.from_dict(a) for a in articles)
+        sources = data.get('sources', [])
+        if not isinstance(sources, list) or not all(isinstance(s, str) for s in sources):
+            raise ModelValidationError(f"{name}.sources 應為字串列表")
+        return cls(
+            sources=tuple(sources),
+            total_articles=_integer(name, data, 'total_articles', 0),
+            keyword_hits=_keyword_hits(name, data),
+            error=_text(name, data, 'error'),
+            **categories
+        )
+
+    def articles(self) -> Iterable[NewsArticle]:
+        for category in NEWS_CATEGORIES:
+            yield from getattr(self, category)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            category: [article.to_dict() for article in getattr(self, category)]
+            for category in NEWS_CATEGORIES
+        }
+        result["sources"] = list(self.sources)
+        result["total_articles"] = self.total_articles
+        result["keyword_hits"] = self.keyword_hits
+        if self.error:
+            result["error"] = self.error
+        return result
+
+# 各商品在 JSON 中使用的價格欄位名稱
+PRICE_KEYS = {
+    'gold': 'current_price',
+    'food': 'wheat_price'
+}
+
+class CommodityQuote(_SlotsModel):
+    __slots__ = ('kind', 'price', 'previous_close', 'daily_change', 'daily_change_percent',
+                 'week_change', 'week_change_percent', 'currency', 'unit',
+                 'last_updated', 'source', 'error', 'intraday')
+
+    _aliases = {'current_price': 'price', 'wheat_price': 'price'}
+
+    def __init__(self, kind: str, price: float, previous_close: float,
+                 daily_change: float, daily_change_percent: float,
+                 week_change: float = 0.0, week_change_percent: float = 0.0,
+                 currency: str = 'USD', unit: Optional[str] = None,
+                 last_updated: Optional[str] = None, source: Optional[str] = None,
+                 error: Optional[str] = None, intraday: Optional[Dict[str, Any]] = None):
+        self.kind = kind
+        self.price = price
+        self.previous_close = previous_close
+        self.daily_change = daily_change
+        self.daily_change_percent = daily_change_percent
+        self.week_change = week_change
+        self.week_change_percent = week_change_percent
+        self.currency = currency
+        self.unit = unit
+        self.last_updated = last_updated
+        self.source = source
+        self.error = error
+        # 日內K線：{'interval', 'interval_seconds', 'closes': array('d')}，僅供指標計算，不輸出至前端
+        self.intraday = intraday
+
+    @staticmethod
+    def _parse_intraday(name: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        intraday = data.get('intraday')
+        if intraday is None:
+            return None
+        intraday = _mapping(f"{name}.intraday", intraday)
+        closes = intraday.get('closes')
+        if not isinstance(closes, (list, tuple, array)):
+            raise ModelValidationError(f"{name}.intraday.closes 應為數值列表")
+        try:
+            compact = array('d', closes)
+        except TypeError:
+            raise ModelValidationError(f"{name}.intraday.closes 應為數值列表")
+        return {
+            'interval': _text(f"{name}.intraday", intraday, 'interval'),
+            'interval_seconds': _integer(f"{name}.intraday", intraday, 'interval_seconds'),
+            'closes': compact
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], kind: str) -> 'CommodityQuote':
+        name = f"{cls.__name__}[{kind}]"
+        data = _mapping(name, data)
+        if kind not in PRICE_KEYS:
+            raise ModelValidationError(f"未知的商品類型: {kind}")
+        return cls(
+            kind=kind,
+            price=_number(name, data, PRICE_KEYS[kind]),
+            previous_close=_number(name, data, 'previous_close'),
+            daily_change=_number(name, data, 'daily_change', 0.0),
+            daily_change_percent=_number(name, data, 'daily_change_percent'),
+            week_change=_number(name, data, 'week_change', 0.0),
+            week_change_percent=_number(name, data, 'week_change_percent', 0.0),
+            currency=_text(name, data, 'currency', 'USD'),
+            unit=_text(name, data, 'unit'),
+            last_updated=_text(name, data, 'last_updated'),
+            source=_text(name, data, 'source'),
+            error=_text(name, data, 'error'),
+            intraday=cls._parse_intraday(name, data)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            PRICE_KEYS[self.kind]: self.price,
+            "previous_close": self.previous_close,
+            "daily_change": self.daily_change,
+            "daily_change_percent": self.daily_change_percent,
+            "week_change": self.week_change,
+            "week_change_percent": self.week_change_percent,
+            "currency": self.currency,
+            "last_updated": self.last_updated,
+            "source": self.source
+        }
+        if self.unit is not None:
+            result["unit"] = self.unit
+        if self.intraday is not None:
+            result["intraday"] = {
+                "interval": self.intraday['interval'],
+                "bars": len(self.intraday['closes'])
+            }
+        if self.error:
+            result["error"] = self.error
+        return result
+
+class Indicators(_SlotsModel):
+    __slots__ = ('military', 'economic', 'news')
+
+    def __init__(self, military: float = 0.0, economic: float = 0.0, news: float = 0.0):
+        self.military = military
+        self.economic = economic
+        self.news = news
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Indicators':
+        name = cls.__name__
+        data = _mapping(name, data)
+        return cls(
+            military=_number(name, data, 'military', 0.0),
+            economic=_number(name, data, 'economic', 0.0),
+            news=_number(name, data, 'news', 0.0)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'military': self.military, 'economic': self.economic, 'news': self.news}
+
+# 各資料來源在爬蟲邊界使用的驗證函數
+SOURCE_PARSERS = {
+    'military': MilitaryData.from_dict,
+    'news': NewsData.from_dict,
+    'gold': lambda data: CommodityQuote.from_dict(data, 'gold'),
+    'food': lambda data: CommodityQuote.from_dict(data, 'food')
+}
+
+def parse_source(source: str, data: Any) -> _SlotsModel:
+    """驗證爬蟲輸出並轉為模型；結構不符時拋出 ModelValidationError"""
+    return SOURCE_PARSERS[source](data)
+
+class AnalysisProfile(_SlotsModel):
+    """批次分析中單一團隊的關注設定：新聞關鍵字與指標權重"""
+    __slots__ = ('name', 'news_keywords', 'weights')
+
+    def __init__(self, name: str, news_keywords: Dict[str, Tuple[str, ...]], weights: Dict[str, float]):
+        self.name = name
+        self.news_keywords = news_keywords
+        self.weights = weights
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], default_keywords: Dict[str, Any],
+                  default_weights: Dict[str, float]) -> 'AnalysisProfile':
+        data = _mapping(cls.__name__, data)
+        name = _text(cls.__name__, data, 'name')
+        if not name:
+            raise ModelValidationError(f"{cls.__name__} 缺少 name")
+        model = f"{cls.__name__}[{name}]"
+
+        # 只覆寫有指定的類別與權重，其餘沿用預設值
+        keywords = _mapping(f"{model}.news_keywords", data.get('news_keywords', {}))
+        unknown = set(keywords) - set(NEWS_CATEGORIES)
+        if unknown:
+            raise ModelValidationError(f"{model}.news_keywords 含未知類別: {sorted(unknown)}")
+        news_keywords = {}
+        for category in NEWS_CATEGORIES:
+            terms = keywords.get(category, default_keywords.get(category, []))
+            if not isinstance(terms, (list, tuple)) or not all(isinstance(t, str) and t.strip() for t in terms):
+                raise ModelValidationError(f"{model}.news_keywords.{category} 應為字串列表，且每個關鍵字不可為空白")
+            news_keywords[category] = tuple(t.strip() for t in terms)
+
+        raw_weights = _mapping(f"{model}.weights", data.get('weights', {}))
+        if set(raw_weights) - set(default_weights):
+            raise ModelValidationError(f"{model}.weights 僅能包含 {sorted(default_weights)}")
+        merged_weights = {**default_weights, **raw_weights}
+        weights = {key: _number(f"{model}.weights", merged_weights, key, 0.0) for key in default_weights}
+        if any(not math.isfinite(w) or w < 0 for w in weights.values()) or sum(weights.values()) <= 0:
+            raise ModelValidationError(f"{model}.weights 須為非負有限數值且總和大於 0")
+        total = sum(weights.values())
+        return cls(name, news_keywords, {key: w / total for key, w in weights.items()})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'news_keywords': {category: list(terms) for category, terms in self.news_keywords.items()},
+            'weights': dict(self.weights)
+        }
+
+class ProfileResult(_SlotsModel):
+    """批次分析中單一設定檔的結果"""
+    __slots__ = ('profile', 'indicators', 'threat_level', 'news', 'report')
+
+    def __init__(self, profile: AnalysisProfile, indicators: Indicators, threat_level: float,
+                 news: _SlotsModel, report: Optional[str] = None):
+        self.profile = profile
+        self.indicators = indicators
+        self.threat_level = threat_level
+        self.news = news
+        self.report = report
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = self.profile.to_dict()
+        result['indicators'] = self.indicators.to_dict()
+        result['threat_level'] = self.threat_level
+        result['news'] = self.news.to_dict()
+        if self.report is not None:
+            result['report'] = self.report
+        return result
+
+class TaskRecord(_SlotsModel):
+    """背景分析任務的狀態與結果"""
+    __slots__ = ('task_id', 'status', 'phase', 'threat_level', 'threat_distribution', 'indicators',
+                 'raw_data', 'profiles', 'report', 'report_en', 'report_pdf', 'timestamp')
+
+    def __init__(self, task_id: str, status: str = 'pending'):
+        self.task_id = task_id
+        self.status = status
+        self.phase: Optional[str] = None
+        self.threat_level: Optional[float] = None
+        self.threat_distribution: Optional[Dict[str, Any]] = None
+        self.indicators: Optional[Indicators] = None
+        self.raw_data: Dict[str, _SlotsModel] = {}
+        self.profiles: Optional[List[ProfileResult]] = None
+        self.report: Optional[str] = None
+        self.report_en: Optional[str] = None
+        self.report_pdf: Optional[str] = None
+        self.timestamp: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {'status': self.status, 'task_id': self.task_id}
+        if self.phase is not None:
+            result['phase'] = self.phase
+        if self.threat_level is not None:
+            result['threat_level'] = self.threat_level
+        if self.threat_distribution is not None:
+            result['threat_distribution'] = self.threat_distribution
+        if self.indicators is not None:
+            result['indicators'] = self.indicators.to_dict()
+        if self.raw_data:
+            result['raw_data'] = {source: model.to_dict() for source, model in self.raw_data.items()}
+        if self.profiles is not None:
+            result['profiles'] = [profile.to_dict() for profile in self.profiles]
+        if self.report is not None:
+            result['report'] = self.report
+        if self.report_en is not None:
+            result['report_en'] = self.report_en
+        if self.report_pdf is not None:
+            result['report_pdf'] = self.report_pdf
+        if self.timestamp is not None:
+            result['timestamp'] = self.timestamp
+        return result
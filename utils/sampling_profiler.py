@@ -0,0 +1,310 @@
+"""
+程序內取樣分析器：以固定間隔擷取執行緒堆疊（sys._current_frames），
+輸出 collapsed stacks（可直接餵給 flamegraph.pl / speedscope）與 tracemalloc 配置排行。
+
+兩種模式：
+- 時間窗：在指定秒數內取樣所有執行緒
+- 任務：預先登記接下來 N 個分析任務，只取樣該任務的執行緒與透過 propagate() 提交的工作執行緒
+"""
+import os
+import sys
+import math
+import time
+import uuid
+import threading
+import tracemalloc
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# 預設取樣間隔（秒）；100 Hz 對請求延遲的影響可忽略
+DEFAULT_INTERVAL = float(os.getenv('PROFILER_INTERVAL', '0.01'))
+MIN_INTERVAL = 0.001
+MAX_WINDOW_SECONDS = 300
+MAX_ARMED_TASKS = 20
+
+# tracemalloc 每筆配置保留的堆疊深度與輸出筆數
+TRACEMALLOC_FRAMES = 10
+DEFAULT_TOP_N = 20
+
+# 記憶體中最多保留的分析結果數
+MAX_SESSIONS = 20
+
+_lock = threading.Lock()
+_sessions: "OrderedDict[str, ProfileSession]" = OrderedDict()
+_thread_sessions: Dict[int, Set["ProfileSession"]] = {}
+_armed_tasks = {'remaining': 0, 'interval': DEFAULT_INTERVAL, 'trace_memory': True, 'top_n': DEFAULT_TOP_N}
+_tracemalloc_users = 0
+
+# code 物件 → 堆疊標籤的快取，避免每次取樣重新組字串
+_labels: Dict[Any, str] = {}
+
+def _frame_label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        _labels[code] = label
+    return label
+
+def _collapse(frame) -> str:
+    """將堆疊由根到葉串成 collapsed stack 格式"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return ';'.join(labels)
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            _tracemalloc_users = 1
+        elif _tracemalloc_users > 0:
+            _tracemalloc_users += 1
+
+def _stop_tracemalloc() -> Optional[tracemalloc.Snapshot]:
+    """取得快照；最後一個使用者結束時才停止追蹤（非本模組啟動的追蹤不會被停止）"""
+    global _tracemalloc_users
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot()
+    with _lock:
+        if _tracemalloc_users > 0:
+            _tracemalloc_users -= 1
+            if _tracemalloc_users == 0:
+                tracemalloc.stop()
+    return snapshot
+
+def _top_allocations(snapshot: tracemalloc.Snapshot, top_n: int) -> List[Dict[str, Any]]:
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, __file__),
+    ))
+    return [
+        {
+            'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            'size_kib': round(stat.size / 1024, 1),
+            'count': stat.count
+        }
+        for stat in snapshot.statistics('lineno')[:top_n]
+    ]
+
+class ProfileSession:
+    """單次取樣；threads 為 None 時取樣所有執行緒"""
+
+    def __init__(self, label: str, mode: str, interval: float = DEFAULT_INTERVAL,
+                 duration: Optional[float] = None, trace_memory: bool = True,
+                 top_n: int = DEFAULT_TOP_N, threads: Optional[Set[int]] = None):
+        self.session_id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.mode = mode
+        self.interval = max(interval, MIN_INTERVAL)
+        self.duration = duration
+        self.trace_memory = trace_memory
+        self.top_n = top_n
+        self.threads = threads
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.status = 'pending'
+        self.started_at: Optional[str] = None
+        self.elapsed = 0.0
+        self.allocations: Optional[List[Dict[str, Any]]] = None
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self) -> "ProfileSession":
+        if self.trace_memory:
+            _start_tracemalloc()
+        self.status = 'running'
+        self.started_at = datetime.now().isoformat()
+        self._sampler = threading.Thread(target=self._run, name=f"profiler-{self.session_id}", daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler and self._sampler is not threading.current_thread():
+            self._sampler.join()
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        start = time.perf_counter()
+        deadline = start + self.duration if self.duration else None
+        try:
+            while not self._stop.wait(self.interval):
+                self._sample(own_ident)
+                if deadline and time.perf_counter() >= deadline:
+                    break
+        finally:
+            self.elapsed = time.perf_counter() - start
+            if self.trace_memory:
+                snapshot = _stop_tracemalloc()
+                if snapshot is not None:
+                    self.allocations = _top_allocations(snapshot, self.top_n)
+            self.status = 'completed'
+
+    def _sample(self, own_ident: int) -> None:
+        frames = sys._current_frames()
+        if self.threads is None:
+            idents = [ident for ident in frames if ident != own_ident]
+        else:
+            with _lock:
+                idents = list(self.threads)
+        for ident in idents:
+            frame = frames.get(ident)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+        self.samples += 1
+
+    def _stack_counts(self) -> List[Tuple[str, int]]:
+        """取樣執行緒仍在寫入 stacks，先複製一份再逐項處理"""
+        return list(self.stacks.items())
+
+    def collapsed(self) -> str:
+        """collapsed stack 文字格式：每行「frame;frame;... 次數」"""
+        stacks = sorted(self._stack_counts(), key=lambda item: item[1], reverse=True)
+        return '\n'.join(f"{stack} {count}" for stack, count in stacks) + '\n'
+
+    def top_functions(self, limit: int = DEFAULT_TOP_N) -> List[Dict[str, Any]]:
+        """以葉節點（自身時間）統計最常出現的函式"""
+        leaves: Counter = Counter()
+        for stack, count in self._stack_counts():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [
+            {'function': name, 'samples': count, 'percent': round(100 * count / total, 1)}
+            for name, count in leaves.most_common(limit)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'session_id': self.session_id,
+            'label': self.label,
+            'mode': self.mode,
+            'status': self.status,
+            'started_at': self.started_at,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'interval_ms': round(self.interval * 1000, 2),
+            'samples': self.samples,
+            'distinct_stacks': len(self.stacks),
+            'top_functions': self.top_functions(self.top_n),
+            'allocations': self.allocations
+        }
+
+def _register(session: ProfileSession) -> ProfileSession:
+    with _lock:
+        _sessions[session.session_id] = session
+        while len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
+    return session
+
+def _require_finite(name: str, value: float) -> None:
+    """NaN 會讓 min/max 的範圍限制失效（取樣永不結束），無限大同樣無意義"""
+    if not math.isfinite(value):
+        raise ValueError(f"{name} 必須為有限數值")
+
+def start_window(duration: float, interval: float = DEFAULT_INTERVAL,
+                 trace_memory: bool = True, top_n: int = DEFAULT_TOP_N) -> ProfileSession:
+    """在接下來 duration 秒內取樣所有執行緒；duration 或 interval 非有限數值時拋出 ValueError"""
+    _require_finite('duration', duration)
+    _require_finite('interval', interval)
+    duration = min(max(duration, interval), MAX_WINDOW_SECONDS)
+    return _register(ProfileSession(
+        label=f"window {duration:g}s", mode='window', interval=interval,
+        duration=duration, trace_memory=trace_memory, top_n=top_n
+    )).start()
+
+def arm_tasks(count: int, interval: float = DEFAULT_INTERVAL,
+              trace_memory: bool = True, top_n: int = DEFAULT_TOP_N) -> int:
+    """登記接下來 count 個分析任務進行取樣，回傳目前待取樣的任務數"""
+    _require_finite('interval', interval)
+    with _lock:
+        _armed_tasks.update(
+            remaining=min(max(count, 0), MAX_ARMED_TASKS),
+            interval=interval, trace_memory=trace_memory, top_n=top_n
+        )
+        return _armed_tasks['remaining']
+
+def get_session(session_id: str) -> Optional[ProfileSession]:
+    with _lock:
+        return _sessions.get(session_id)
+
+def list_sessions() -> List[Dict[str, Any]]:
+    with _lock:
+        sessions = list(_sessions.values())
+    return [
+        {'session_id': s.session_id, 'label': s.label, 'mode': s.mode, 'status': s.status, 'samples': s.samples}
+        for s in reversed(sessions)
+    ]
+
+def armed_task_count() -> int:
+    with _lock:
+        return _armed_tasks['remaining']
+
+def _attach(ident: int, sessions: Set[ProfileSession]) -> None:
+    with _lock:
+        _thread_sessions.setdefault(ident, set()).update(sessions)
+        for session in sessions:
+            session.threads.add(ident)
+
+def _detach(ident: int, sessions: Set[ProfileSession]) -> None:
+    with _lock:
+        attached = _thread_sessions.get(ident)
+        if attached is not None:
+            attached.difference_update(sessions)
+            if not attached:
+                del _thread_sessions[ident]
+        for session in sessions:
+            session.threads.discard(ident)
+
+@contextmanager
+def task_scope(task_id: str):
+    """
+    包住整個分析任務：若已登記取樣，建立任務專屬的取樣並追蹤目前執行緒。
+    未登記時幾乎沒有額外成本。
+    """
+    with _lock:
+        armed = _armed_tasks['remaining'] > 0
+        if armed:
+            _armed_tasks['remaining'] -= 1
+            options = dict(_armed_tasks)
+    if not armed:
+        yield None
+        return
+
+    session = _register(ProfileSession(
+        label=f"task {task_id}", mode='task', interval=options['interval'],
+        trace_memory=options['trace_memory'], top_n=options['top_n'], threads=set()
+    ))
+    ident = threading.get_ident()
+    _attach(ident, {session})
+    session.start()
+    try:
+        yield session
+    finally:
+        _detach(ident, {session})
+        session.stop()
+
+def propagate(fn: Callable) -> Callable:
+    """
+    若目前執行緒正被取樣，回傳的函式在工作執行緒中執行時也會加入同一取樣；
+    用於提交到 ThreadPoolExecutor 的工作。未取樣時直接回傳原函式。
+    """
+    with _lock:
+        sessions = set(_thread_sessions.get(threading.get_ident(), ()))
+    if not sessions:
+        return fn
+
+    def wrapper(*args, **kwargs):
+        ident = threading.get_ident()
+        _attach(ident, sessions)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _detach(ident, sessions)
+    return wrapper
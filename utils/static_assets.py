@@ -0,0 +1,126 @@
+"""
+靜態資源打包：將 JS / CSS 依序合併、壓縮，並以內容雜湊命名輸出到 static/dist/，
+同時寫入 manifest.json 供模板查詢實際檔名。雜湊檔名的內容永不改變，
+因此可以設定一年且 immutable 的快取，重複載入頁面時不會再發出資源請求。
+
+執行方式：python -m utils.static_assets
+尚未打包（找不到 manifest）時模板會退回載入原始檔案。
+"""
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+try:
+    import rjsmin
+    import rcssmin
+    MINIFIER_AVAILABLE = True
+except ImportError:
+    # 只有打包時需要；執行期僅讀取 manifest
+    MINIFIER_AVAILABLE = False
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / 'static'
+DIST_DIRNAME = 'dist'
+MANIFEST_PATH = STATIC_DIR / DIST_DIRNAME / 'manifest.json'
+
+# 打包名稱 → 依載入順序排列的原始檔（相對於 static/）
+BUNDLES = {
+    'app.css': ['css/style.css', 'css/font-fix.css'],
+    'app.js': ['js/main.js', 'js/cyber-effects.js', 'js/percentage-fix.js']
+}
+
+# 雜湊檔名的快取標頭
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_manifest_cache = {'mtime': None, 'entries': {}}
+
+def _minify(kind: str, source: str) -> str:
+    if not MINIFIER_AVAILABLE:
+        return source
+    if kind == '.js':
+        return rjsmin.jsmin(source)
+    return rcssmin.cssmin(source)
+
+def build_bundle(name: str, sources: List[str]) -> bytes:
+    """依序合併並壓縮原始檔；JS 之間以分號分隔，避免自動插入分號失效"""
+    kind = os.path.splitext(name)[1]
+    separator = ';\n' if kind == '.js' else '\n'
+    parts = [_minify(kind, (STATIC_DIR / source).read_text(encoding='utf-8')) for source in sources]
+    return separator.join(parts).encode('utf-8')
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def load_manifest() -> Dict[str, str]:
+    """讀取 manifest；檔案更新（重新打包）後自動重新載入"""
+    try:
+        mtime = MANIFEST_PATH.stat().st_mtime
+    except OSError:
+        return {}
+    if _manifest_cache['mtime'] != mtime:
+        try:
+            entries = json.loads(MANIFEST_PATH.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logging.error(f"讀取靜態資源 manifest 失敗: {e}")
+            return {}
+        _manifest_cache.update(mtime=mtime, entries=entries)
+    return _manifest_cache['entries']
+
+def asset_paths(name: str) -> List[str]:
+    """模板使用的路徑（相對於 static/）：已打包時為雜湊檔，否則為原始檔列表"""
+    hashed = load_manifest().get(name)
+    if hashed:
+        return [hashed]
+    return list(BUNDLES[name])
+
+def is_fingerprinted(filename: str) -> bool:
+    """是否為 dist/ 中的雜湊檔（manifest 本身除外）"""
+    return filename.startswith(f"{DIST_DIRNAME}/") and filename != f"{DIST_DIRNAME}/manifest.json"
+
+def build_assets(keep_previous: bool = True) -> Dict[str, str]:
+    """
+    產生所有打包檔與 manifest；保留上一版的雜湊檔，
+    讓滾動部署期間仍使用舊頁面的用戶端可以載入資源。
+    """
+    if not MINIFIER_AVAILABLE:
+        logging.warning("rjsmin/rcssmin 未安裝，靜態資源只會合併而不壓縮。")
+    dist_dir = STATIC_DIR / DIST_DIRNAME
+    dist_dir.mkdir(parents=True, exist_ok=True)
+    previous = load_manifest() if keep_previous else {}
+
+    manifest = {}
+    for name, sources in BUNDLES.items():
+        content = build_bundle(name, sources)
+        stem, ext = os.path.splitext(name)
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        filename = f"{stem}.{digest}{ext}"
+        target = dist_dir / filename
+        if not target.exists():
+            _write_atomic(target, content)
+        manifest[name] = f"{DIST_DIRNAME}/{filename}"
+        original = sum((STATIC_DIR / source).stat().st_size for source in sources)
+        print(f"{name}: {len(sources)} 個檔案 {original:,} bytes → {filename} {len(content):,} bytes")
+
+    # manifest 最後寫入，確保其中引用的檔案都已存在
+    _write_atomic(MANIFEST_PATH, json.dumps(manifest, indent=2).encode('utf-8'))
+
+    keep = {os.path.basename(path) for path in list(manifest.values()) + list(previous.values())}
+    keep.add(MANIFEST_PATH.name)
+    for stale in dist_dir.iterdir():
+        if stale.is_file() and stale.name not in keep:
+            stale.unlink()
+    return manifest
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(build_assets(), indent=2))